@@ -16,6 +16,7 @@ from app.bot import filters, middlewares, routers, services, tasks
 from app.bot.middlewares import MaintenanceMiddleware
 from app.bot.models import ServicesContainer
 from app.bot.payment_gateways import GatewayFactory
+from app.bot.services.catalog import DatabaseCatalog
 from app.bot.utils import commands
 from app.bot.utils.constants import (
     BOT_STARTED_TAG,
@@ -32,6 +33,13 @@ async def on_shutdown(db: Database, bot: Bot, services: ServicesContainer) -> No
     await services.notification.notify_developer(BOT_STOPPED_TAG)
     await commands.delete(bot)
     await bot.delete_webhook()
+    await services.delivery.stop()
+    await services.expiry.stop()
+    await services.writes.stop()
+    await services.promocodes.stop()
+    await services.invites.stop()
+    if services.catalog_sync:
+        await services.catalog_sync.stop()
     await bot.session.close()
     await db.close()
     logging.info("Bot stopped.")
@@ -49,7 +57,20 @@ async def on_startup(config: Config, bot: Bot, services: ServicesContainer, db:
     await services.notification.notify_developer(BOT_STARTED_TAG)
     logging.info("Bot started.")
 
+    if services.catalog_sync:
+        await services.catalog_sync.start()
+    if isinstance(services.product.catalog, DatabaseCatalog):
+        # With Redis propagation in place polling is only a safety net
+        interval = 300 if services.catalog_sync else 30
+        tasks.catalog.start_scheduler(services.product.catalog, interval=interval)
+
     tasks.transactions.start_scheduler(db.session)
+    tasks.stock.start_scheduler(services.stock)
+    await services.delivery.start()
+    await services.expiry.start()
+    await services.writes.start()
+    await services.promocodes.start()
+    await services.invites.start()
     if config.shop.REFERRER_REWARD_ENABLED:
         tasks.referral.start_scheduler(
             session_factory=db.session, referral_service=services.referral
@@ -95,10 +116,15 @@ async def main() -> None:
         logging.error(f"❌ Translation test failed: {e}")
 
     # Initialize services
-    services_container = await services.initialize(config=config, session=db.session, bot=bot)
+    services_container = await services.initialize(
+        config=config,
+        session=db.session,
+        bot=bot,
+        redis=storage.redis,
+        read_session=db.read_session,
+    )
 
-    # TODO: Initialize product catalog or inventory sync
-    # await services_container.product.sync_products()
+    await services_container.product.initialize_catalog()
 
     # Register payment gateways
     gateway_factory = GatewayFactory()
@@ -130,7 +156,12 @@ async def main() -> None:
     MaintenanceMiddleware.set_mode(False)
 
     # Register middlewares
-    middlewares.register(dispatcher=dispatcher, i18n=i18n, session=db.session)
+    middlewares.register(
+        dispatcher=dispatcher,
+        i18n=i18n,
+        session=db.session,
+        user_cache=services_container.users,
+    )
 
     # Register filters
     filters.register(
@@ -2,20 +2,31 @@ from aiogram import Dispatcher
 from aiogram.utils.i18n import I18n, SimpleI18nMiddleware
 from sqlalchemy.ext.asyncio import async_sessionmaker
 
+from app.bot.services.user_cache import UserCache
+
 from .database import DBSessionMiddleware
 from .garbage import GarbageMiddleware
 from .maintenance import MaintenanceMiddleware
 from .throttling import ThrottlingMiddleware
 
 
-def register(dispatcher: Dispatcher, i18n: I18n, session: async_sessionmaker) -> None:
+def register(
+    dispatcher: Dispatcher,
+    i18n: I18n,
+    session: async_sessionmaker,
+    user_cache: UserCache | None = None,
+) -> None:
     middlewares = [
         ThrottlingMiddleware(),
         GarbageMiddleware(),
         SimpleI18nMiddleware(i18n),
         MaintenanceMiddleware(),
-        DBSessionMiddleware(session),
     ]
 
     for middleware in middlewares:
         dispatcher.update.middleware.register(middleware)
+
+    # Inner middleware: only updates that matched a handler resolve the user.
+    db_session = DBSessionMiddleware(session, user_cache)
+    for observer in (dispatcher.message, dispatcher.callback_query, dispatcher.pre_checkout_query):
+        observer.middleware.register(db_session)
@@ -4,16 +4,29 @@ from typing import Any, Awaitable, Callable
 from aiogram import BaseMiddleware
 from aiogram.types import TelegramObject
 from aiogram.types import User as TelegramUser
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker
 
+from app.bot.models.user_profile import UserProfile
+from app.bot.services.user_cache import UserCache
+from app.bot.utils.routing import is_sessionless
+from app.db.database import LazySession
 from app.db.models import User
 
 logger = logging.getLogger(__name__)
 
 
 class DBSessionMiddleware(BaseMiddleware):
-    def __init__(self, session: async_sessionmaker) -> None:
+    """
+    Resolves the user of an update and hands the handler a lazy session.
+
+    Registered as an inner middleware, so it only runs for updates that reached a
+    handler. The user is looked up through the cache in a short-lived session; the
+    handler's `session` opens a connection only when it is first used.
+    """
+
+    def __init__(self, session: async_sessionmaker, user_cache: UserCache | None = None) -> None:
         self.session = session
+        self.user_cache = user_cache or UserCache()
         logger.debug("Database Session Middleware initialized.")
 
     async def __call__(
@@ -22,29 +35,45 @@ class DBSessionMiddleware(BaseMiddleware):
         event: TelegramObject,
         data: dict[str, Any],
     ) -> Any:
-        session: AsyncSession
-        async with self.session() as session:
-            tg_user: TelegramUser | None = event.event.from_user
-
-            if tg_user is not None and not tg_user.is_bot:
-                user = await User.get(session=session, tg_id=tg_user.id)
-                is_new_user = False
-
-                if not user:
-                    is_new_user = True
-                    user = await User.create(
-                        session=session,
-                        tg_id=tg_user.id,
-                        first_name=tg_user.first_name,
-                        username=tg_user.username,
-                        language_code=tg_user.language_code,
-                    )
-                    logger.info(f"New user {user.tg_id} created.")
-
-                data["user"] = user
-                data["session"] = session
-                data["is_new_user"] = is_new_user
-            else:
-                logger.debug("No user found in event data.")
+        tg_user: TelegramUser | None = data.get("event_from_user") or getattr(
+            getattr(event, "event", None), "from_user", None
+        )
+
+        if tg_user is None or tg_user.is_bot:
+            logger.debug("No user found in event data.")
+            return await handler(event, data)
+
+        data["user"], data["is_new_user"] = await self._resolve_user(tg_user)
+        if is_sessionless(data.get("event_router")):
+            return await handler(event, data)
 
+        session = LazySession(self.session)
+        data["session"] = session
+        try:
             return await handler(event, data)
+        finally:
+            await session.close()
+
+    async def _resolve_user(self, tg_user: TelegramUser) -> tuple[UserProfile, bool]:
+        user = await self.user_cache.get(tg_user.id)
+        if user is not None:
+            return user, False
+
+        async with self.session() as session:
+            user = await self.user_cache.load(session=session, tg_id=tg_user.id)
+            if user is not None:
+                return user, False
+
+            created, is_new_user = await User.upsert(
+                session=session,
+                tg_id=tg_user.id,
+                first_name=tg_user.first_name,
+                username=tg_user.username,
+                language_code=tg_user.language_code,
+            )
+            if is_new_user:
+                logger.info(f"New user {created.tg_id} created.")
+            user = UserProfile.from_user(created)
+
+        await self.user_cache.put(user)
+        return user, is_new_user
@@ -1,5 +1,8 @@
+from .catalog_page_data import CatalogPageData
 from .client_data import ClientData
+from .invite_link import InviteLink
 from .invite_stats import InviteStats
 from .plan import Plan
 from .services_container import ServicesContainer
 from .subscription_data import SubscriptionData
+from .user_profile import UserProfile
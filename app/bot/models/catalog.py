@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+from base64 import urlsafe_b64encode
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
+from functools import cached_property
+from hashlib import blake2b
+from typing import Any, Sequence
+
+from .price_matrix import PriceKey, PriceMatrix, iter_price_keys
+
+SORT_ORDERS = ("popularity", "price", "name")
+DEFAULT_SORT = SORT_ORDERS[0]
+
+
+def cursor_key(product_id: Any) -> str:
+    """
+    Short, stable page cursor for a product id.
+
+    Product ids can be up to 64 characters, which does not fit Telegram's 64-byte
+    callback data; the cursor is an 8-character digest resolved against the listing.
+    """
+    digest = blake2b(str(product_id).encode(), digest_size=6).digest()
+    return urlsafe_b64encode(digest).decode()
+
+
+def min_price(product: dict[str, Any]) -> float:
+    amounts = [amount for _, _, amount in iter_price_keys(product)]
+    return min(amounts) if amounts else float("inf")
+
+
+def _sort_key(order: str):
+    if order == "price":
+        return lambda product: min_price(product)
+    if order == "name":
+        return lambda product: str(product.get("name", "")).casefold()
+    # Products may carry a `popularity` score; higher comes first.
+    return lambda product: -float(product.get("popularity", 0) or 0)
+
+
+@dataclass(frozen=True)
+class CategoryPage:
+    category: str
+    sort: str
+    items: tuple[dict[str, Any], ...]
+    number: int
+    total_pages: int
+    prev_cursor: str | None
+    next_cursor: str | None
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """
+    Immutable view of the product catalog at a given version, with lookup indexes.
+
+    `products` may be any sequence, including a lazily decoded one (see
+    `MappedProducts`). Indexes are built on first use; lookups by id or category
+    only materialize the products they return when the sequence can list ids and
+    categories without decoding whole products.
+    """
+    version: str
+    products: Sequence[dict[str, Any]] = ()
+    mtime_ns: int = 0
+    size: int = 0
+    loaded_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+    @classmethod
+    def empty(cls) -> "CatalogSnapshot":
+        return cls(version="")
+
+    @classmethod
+    def build(cls, version: str, products: Sequence[dict[str, Any]], **kwargs: Any) -> "CatalogSnapshot":
+        return cls(version=version, products=products, **kwargs)
+
+    def with_stat(self, mtime_ns: int, size: int) -> "CatalogSnapshot":
+        """Copy with new file metadata, keeping the already built indexes."""
+        snapshot = replace(self, mtime_ns=mtime_ns, size=size)
+        snapshot.__dict__.update(
+            {name: value for name, value in self.__dict__.items() if name in _INDEXES}
+        )
+        return snapshot
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    @cached_property
+    def _id_positions(self) -> dict[str, int]:
+        ids = getattr(self.products, "ids", None)
+        ids = ids() if ids else (str(product.get("id")) for product in self.products)
+        positions: dict[str, int] = {}
+        for index, product_id in enumerate(ids):
+            positions.setdefault(product_id, index)
+        return positions
+
+    @cached_property
+    def _category_positions(self) -> dict[str, tuple[int, ...]]:
+        categories = getattr(self.products, "categories", None)
+        categories = (
+            categories()
+            if categories
+            else (str(product.get("category", "")).lower() for product in self.products)
+        )
+        positions: dict[str, list[int]] = {}
+        for index, category in enumerate(categories):
+            positions.setdefault(category, []).append(index)
+        return {category: tuple(items) for category, items in positions.items()}
+
+    @cached_property
+    def by_id(self) -> dict[str, dict[str, Any]]:
+        return {product_id: self.products[index] for product_id, index in self._id_positions.items()}
+
+    @cached_property
+    def by_price(self) -> dict[PriceKey, dict[str, Any]]:
+        by_price: dict[PriceKey, dict[str, Any]] = {}
+        for product in self.products:
+            for key in iter_price_keys(product):
+                by_price.setdefault(key, product)
+        return by_price
+
+    @cached_property
+    def _undated_by_price(self) -> dict[tuple[str, float], dict[str, Any]]:
+        # A single-price product without duration_days is sold for any plan duration
+        undated: dict[tuple[str, float], dict[str, Any]] = {}
+        for product in self.products:
+            price = product.get("price")
+            if "duration_days" not in product and isinstance(price, dict) and "amount" in price:
+                currency = str(price.get("currency", "")).upper()
+                undated.setdefault((currency, price["amount"]), product)
+        return undated
+
+    @cached_property
+    def prices(self) -> PriceMatrix:
+        return PriceMatrix.from_products(self.products)
+
+    @cached_property
+    def currencies(self) -> frozenset[str]:
+        return frozenset(currency for currency, _, _ in self.by_price)
+
+    @cached_property
+    def _orders(self) -> dict[tuple[str, str], tuple[tuple[dict[str, Any], ...], dict[str, int]]]:
+        # Filled per (category, sort order) on first request
+        return {}
+
+    def get(self, product_id: Any) -> dict[str, Any] | None:
+        index = self._id_positions.get(str(product_id))
+        return self.products[index] if index is not None else None
+
+    def in_category(self, category: str) -> tuple[dict[str, Any], ...]:
+        return tuple(
+            self.products[index] for index in self._category_positions.get(category.lower(), ())
+        )
+
+    def sorted_category(
+        self, category: str, sort: str
+    ) -> tuple[tuple[dict[str, Any], ...], dict[str, int]]:
+        """Category products in the given order, with page cursor -> position."""
+        key = (category, sort)
+        order = self._orders.get(key)
+        if order is None:
+            # sorted() is stable, so ties keep catalog order
+            ordered = tuple(sorted(self.in_category(category), key=_sort_key(sort)))
+            positions = {
+                cursor_key(product.get("id")): index for index, product in enumerate(ordered)
+            }
+            order = self._orders[key] = (ordered, positions)
+        return order
+
+    def find_by_price(
+        self, duration: int, amount: float, currency: str | None = None
+    ) -> dict[str, Any] | None:
+        currencies = [currency.upper()] if currency else sorted(self.currencies)
+        for code in currencies:
+            product = self.by_price.get((code, duration, amount))
+            if product is None:
+                product = self._undated_by_price.get((code, amount))
+            if product is not None:
+                return product
+        return None
+
+    def page(
+        self, category: str, sort: str = DEFAULT_SORT, cursor: str | None = None, size: int = 8
+    ) -> CategoryPage:
+        """
+        Slice a category listing starting at the product whose `cursor_key` is `cursor`.
+
+        Cursors identify products rather than offsets, so a page stays anchored to the
+        same product across catalog reloads; an unknown cursor starts from the top.
+        """
+        category = category.lower()
+        sort = sort if sort in SORT_ORDERS else DEFAULT_SORT
+        size = max(size, 1)
+        ordered, positions = self.sorted_category(category, sort)
+        start = positions.get(cursor or "", 0)
+        end = start + size
+        total_pages = max(1, -(-len(ordered) // size))
+
+        # After a reload the cursor product may sit between page boundaries; a page that
+        # starts past a boundary counts as the next page, and one reaching the end is last.
+        number = -(-start // size) + 1 if end < len(ordered) else total_pages
+
+        return CategoryPage(
+            category=category,
+            sort=sort,
+            items=ordered[start:end],
+            number=min(number, total_pages),
+            total_pages=total_pages,
+            prev_cursor=cursor_key(ordered[max(start - size, 0)].get("id")) if start > 0 else None,
+            next_cursor=cursor_key(ordered[end].get("id")) if end < len(ordered) else None,
+        )
+
+
+_INDEXES = frozenset(
+    name for name, value in vars(CatalogSnapshot).items() if isinstance(value, cached_property)
+)
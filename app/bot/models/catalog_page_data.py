@@ -0,0 +1,7 @@
+from aiogram.filters.callback_data import CallbackData
+
+
+class CatalogPageData(CallbackData, prefix="catalog_page"):
+    category: str
+    sort: str
+    cursor: str = ""
@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from app.db.models import Invite
+
+
+@dataclass(frozen=True)
+class InviteLink:
+    """Cacheable view of an invite, enough to attribute a user to it."""
+
+    id: int
+    name: str
+    is_active: bool
+
+    @classmethod
+    def from_invite(cls, invite: Invite) -> InviteLink:
+        return cls(id=invite.id, name=invite.name, is_active=invite.is_active)
@@ -3,6 +3,8 @@ from typing import Any
 
 from app.bot.utils.constants import Currency
 
+from .price_matrix import currency_code
+
 
 @dataclass
 class Plan:
@@ -23,7 +25,4 @@ class Plan:
         }
 
     def get_price(self, currency: Currency | str, duration: int) -> float:
-        if isinstance(currency, str):
-            currency = Currency.from_code(currency)
-
-        return self.prices[currency.code][duration]
+        return self.prices[currency_code(currency)][duration]
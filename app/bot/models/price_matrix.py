@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from typing import Any, Hashable, Iterable, Iterator
+
+from app.bot.utils.constants import Currency
+
+logger = logging.getLogger(__name__)
+
+_SYMBOLS = {currency.code: currency.symbol for currency in Currency}
+
+PriceKey = tuple[str, int, float]
+
+
+def currency_code(currency: Currency | str) -> str:
+    return currency.code if isinstance(currency, Currency) else currency.upper()
+
+
+def iter_price_keys(product: dict[str, Any]) -> Iterator[PriceKey]:
+    """Yield (currency, duration, amount) for every price a product is sold at."""
+    price = product.get("price")
+    if isinstance(price, dict) and "amount" in price:
+        yield (
+            str(price.get("currency", "")).upper(),
+            int(product.get("duration_days", 0)),
+            price["amount"],
+        )
+
+    for currency, durations in (product.get("prices") or {}).items():
+        for duration, amount in durations.items():
+            yield currency.upper(), int(duration), amount
+
+
+@dataclass(frozen=True)
+class Price:
+    amount: Decimal
+    currency: str
+    duration: int
+
+    @property
+    def symbol(self) -> str:
+        return _SYMBOLS.get(self.currency, self.currency)
+
+
+class PriceMatrix:
+    """
+    Precomputed (subject, currency, duration) -> Decimal price table.
+
+    A subject is whatever a price belongs to: the device count of a plan or the id of
+    a catalog product. The table and the cheapest offer per subject and currency are
+    built once, so keyboards only do dictionary lookups.
+    """
+
+    def __init__(self, entries: Iterable[tuple[Hashable, str, int, Any]] = ()) -> None:
+        self._prices: dict[tuple[Hashable, str, int], Decimal] = {}
+        self._offers: dict[Hashable, list[Price]] = {}
+        self._cheapest: dict[tuple[Hashable, str | None], Price] = {}
+        for subject, currency, duration, amount in entries:
+            self.add(subject, currency, duration, amount)
+
+    @classmethod
+    def from_plans(cls, plans: Iterable[Any]) -> PriceMatrix:
+        return cls(
+            (plan.devices, currency, duration, amount)
+            for plan in plans
+            for currency, durations in plan.prices.items()
+            for duration, amount in durations.items()
+        )
+
+    @classmethod
+    def from_products(cls, products: Iterable[dict[str, Any]]) -> PriceMatrix:
+        return cls(
+            (str(product.get("id")), currency, duration, amount)
+            for product in products
+            for currency, duration, amount in iter_price_keys(product)
+        )
+
+    def __len__(self) -> int:
+        return len(self._prices)
+
+    def add(self, subject: Hashable, currency: Currency | str, duration: int, amount: Any) -> None:
+        try:
+            price = Price(Decimal(str(amount)), currency_code(currency), int(duration))
+        except (InvalidOperation, TypeError, ValueError):
+            logger.warning(f"Ignoring invalid price {amount!r} of {subject} in {currency}.")
+            return
+
+        key = (subject, price.currency, price.duration)
+        if key in self._prices:
+            return
+        self._prices[key] = price.amount
+        self._offers.setdefault(subject, []).append(price)
+
+        for cheapest_key in ((subject, price.currency), (subject, None)):
+            cheapest = self._cheapest.get(cheapest_key)
+            if cheapest is None or price.amount < cheapest.amount:
+                self._cheapest[cheapest_key] = price
+
+    def get(self, subject: Hashable, currency: Currency | str, duration: int) -> Decimal | None:
+        return self._prices.get((subject, currency_code(currency), duration))
+
+    def offers(self, subject: Hashable) -> tuple[Price, ...]:
+        return tuple(self._offers.get(subject, ()))
+
+    def cheapest(self, subject: Hashable, currency: Currency | str | None = None) -> Price | None:
+        """Cheapest offer in `currency`, falling back to the cheapest in any currency."""
+        if currency is not None:
+            price = self._cheapest.get((subject, currency_code(currency)))
+            if price is not None:
+                return price
+        return self._cheapest.get((subject, None))
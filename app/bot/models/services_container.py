@@ -6,11 +6,21 @@ if TYPE_CHECKING:
     from app.bot.services import (
         NotificationService,
         PlanService,
+        PriceService,
         ProductService,
         ReferralService,
         SubscriptionService,
+        StockService,
         PaymentStatsService,
         InviteStatsService,
+        LicenseKeyService,
+        DeliveryQueue,
+        ExpiryScheduler,
+        CatalogSync,
+        UserCache,
+        WriteBuffer,
+        PromocodeFilter,
+        InviteTracker,
     )
 
 from dataclasses import dataclass
@@ -19,9 +29,19 @@ from dataclasses import dataclass
 @dataclass
 class ServicesContainer:
     plan: PlanService
+    prices: PriceService
     product: ProductService
     notification: NotificationService
     referral: ReferralService
     subscription: SubscriptionService
+    users: UserCache
+    writes: WriteBuffer
+    promocodes: PromocodeFilter
+    invites: InviteTracker
+    stock: StockService
+    license_keys: LicenseKeyService
+    delivery: DeliveryQueue
+    expiry: ExpiryScheduler
+    catalog_sync: CatalogSync | None
     payment_stats: PaymentStatsService
     invite_stats: InviteStatsService
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import User
+
+
+@dataclass(frozen=True)
+class UserProfile:
+    """Slim, cacheable view of a user that handlers receive instead of the ORM object."""
+
+    id: int
+    tg_id: int
+    first_name: str
+    username: str | None
+    language_code: str
+    is_trial_used: bool
+    source_invite_name: str | None
+    created_at: datetime | None = None
+
+    @classmethod
+    def from_user(cls, user: User) -> UserProfile:
+        return cls(
+            id=user.id,
+            tg_id=user.tg_id,
+            first_name=user.first_name,
+            username=user.username,
+            language_code=user.language_code,
+            is_trial_used=user.is_trial_used,
+            source_invite_name=user.source_invite_name,
+            created_at=user.created_at,
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> UserProfile:
+        created_at = data.get("created_at")
+        return cls(
+            **{**data, "created_at": datetime.fromisoformat(created_at) if created_at else None}
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        data["created_at"] = self.created_at.isoformat() if self.created_at else None
+        return data
+
+    async def load(self, session: AsyncSession) -> User | None:
+        """Full user with transactions and activated promocodes, for handlers that need them."""
+        return await User.get(session=session, tg_id=self.tg_id, load_relations=True)
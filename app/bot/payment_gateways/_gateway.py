@@ -14,6 +14,7 @@ from app.bot.routers.main_menu.handler import redirect_to_main_menu
 from app.bot.utils.constants import (
     DEFAULT_LANGUAGE,
     EVENT_PAYMENT_CANCELED_TAG,
+    EVENT_PAYMENT_REFUND_REQUIRED_TAG,
     EVENT_PAYMENT_SUCCEEDED_TAG,
     Currency,
     TransactionStatus,
@@ -63,20 +64,35 @@ class PaymentGateway(ABC):
     async def handle_payment_canceled(self, payment_id: str) -> None:
         pass
 
+    async def handle_payment_created(self, data: SubscriptionData, payment_id: str) -> None:
+        # The payment outcome commits or releases the stock held for the invoiced product.
+        product = await self.services.product.get_checkout_product(data, self.currency)
+        if product:
+            await self.services.stock.attach_payment(
+                user_id=data.user_id, payment_id=payment_id, product_id=str(product["id"])
+            )
+
     async def _on_payment_succeeded(self, payment_id: str) -> None:
         logger.info(f"Payment succeeded {payment_id}")
 
         async with self.session() as session:
-            transaction = await Transaction.get_by_id(session=session, payment_id=payment_id)
-            data = SubscriptionData.unpack(transaction.subscription)
-            logger.debug(f"Subscription data unpacked: {data}")
-            user = await User.get(session=session, tg_id=data.user_id)
-
-            await Transaction.update(
+            transaction = await Transaction.update(
                 session=session,
                 payment_id=payment_id,
                 status=TransactionStatus.COMPLETED,
             )
+            data = SubscriptionData.unpack(transaction.subscription)
+            logger.debug(f"Subscription data unpacked: {data}")
+            user = await User.get(session=session, tg_id=data.user_id)
+
+        product = None
+        if not data.is_extend and not data.is_change:
+            product = await self.services.product.get_checkout_product(data, self.currency)
+            if product and not await self.services.stock.purchase(
+                user_id=data.user_id, product=product, payment_id=payment_id
+            ):
+                await self._on_payment_out_of_stock(payment_id, data, user, product)
+                return
 
         if self.config.shop.REFERRER_REWARD_ENABLED:
             await self.services.referral.add_referrers_rewards_on_payment(
@@ -132,33 +148,57 @@ class PaymentGateway(ABC):
                     devices=data.devices
                 )
                 
-                subscription_data = await self.services.subscription.create_subscription(
-                    user_id=user.id,
-                    plan=plan,
-                    transaction_id=transaction.id
-                )
-                
-                logger.info(f"Subscription created for user {user.tg_id}")
-                
-                # Get product delivery key/info for notification
-                product_key = getattr(subscription_data, 'delivery_info', {}).get('key', 'N/A')
-                
-                await self.services.notification.notify_purchase_success(
+                # Delivery runs in the queue; the buyer is notified once it completes
+                await self.services.subscription.create_subscription(
                     user_id=user.tg_id,
-                    key=product_key,
+                    plan=plan,
+                    transaction_id=transaction.id,
+                    product=product,
                 )
 
+                logger.info(f"Product delivery queued for user {user.tg_id}")
+
+    async def _on_payment_out_of_stock(
+        self, payment_id: str, data: SubscriptionData, user: User, product: dict
+    ) -> None:
+        # Paid after the last unit was sold: nothing is delivered and the payment is
+        # flagged for a manual refund.
+        async with self.session() as session:
+            await Transaction.update(
+                session=session,
+                payment_id=payment_id,
+                status=TransactionStatus.REFUND_PENDING,
+            )
+        logger.warning(f"Payment {payment_id} flagged for refund: {product['id']} is sold out.")
+
+        await self.services.notification.notify_developer(
+            text=EVENT_PAYMENT_REFUND_REQUIRED_TAG
+            + "\n\n"
+            + _("payment:event:payment_refund_required").format(
+                payment_id=payment_id,
+                user_id=data.user_id,
+                product=product["name"],
+            ),
+        )
+
+        locale = user.language_code if user else DEFAULT_LANGUAGE
+        with self.i18n.use_locale(locale):
+            await self.services.notification.notify_by_id(
+                chat_id=data.user_id,
+                text=_("payment:ntf:out_of_stock_refund").format(product=product["name"]),
+            )
+
     async def _on_payment_canceled(self, payment_id: str) -> None:
         logger.info(f"Payment canceled {payment_id}")
         async with self.session() as session:
-            transaction = await Transaction.get_by_id(session=session, payment_id=payment_id)
-            data = SubscriptionData.unpack(transaction.subscription)
-
-            await Transaction.update(
+            transaction = await Transaction.update(
                 session=session,
                 payment_id=payment_id,
                 status=TransactionStatus.CANCELED,
             )
+            data = SubscriptionData.unpack(transaction.subscription)
+
+        await self.services.stock.release(payment_id=payment_id)
 
         await self.services.notification.notify_developer(
             text=EVENT_PAYMENT_CANCELED_TAG
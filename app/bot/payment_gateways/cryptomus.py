@@ -90,6 +90,7 @@ class Cryptomus(PaymentGateway):
                 payment_id=result["result"]["order_id"],
                 status=TransactionStatus.PENDING,
             )
+        await self.handle_payment_created(data=data, payment_id=result["result"]["order_id"])
 
         logger.info(f"Payment link created for user {data.user_id}: {pay_url}")
         return pay_url
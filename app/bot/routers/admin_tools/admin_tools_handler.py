@@ -5,9 +5,9 @@ from aiogram.types import CallbackQuery
 from aiogram.utils.i18n import gettext as _
 
 from app.bot.filters import IsAdmin, IsDev
+from app.bot.models import UserProfile
 from app.bot.services import ServicesContainer
 from app.bot.utils.navigation import NavAdminTools
-from app.db.models import User
 
 from .keyboard import admin_tools_keyboard
 
@@ -16,7 +16,7 @@ router = Router(name=__name__)
 
 
 @router.callback_query(F.data == NavAdminTools.MAIN, IsAdmin())
-async def callback_admin_tools(callback: CallbackQuery, user: User) -> None:
+async def callback_admin_tools(callback: CallbackQuery, user: UserProfile) -> None:
     logger.info(f"Admin {user.tg_id} opened admin tools.")
     is_dev = await IsDev()(user_id=user.tg_id)
     await callback.message.edit_text(
@@ -33,7 +33,7 @@ from app.db.models import Transaction
 @router.callback_query(F.data == NavAdminTools.TEST, IsAdmin())
 async def callback_admin_tools(
     callback: CallbackQuery,
-    user: User,
+    user: UserProfile,
     session: AsyncSession,
     services: ServicesContainer,
 ) -> None:
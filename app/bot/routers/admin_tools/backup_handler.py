@@ -7,11 +7,10 @@ from aiogram.types import CallbackQuery, FSInputFile
 from aiogram.utils.i18n import gettext as _
 
 from app.bot.filters import IsAdmin
-from app.bot.models import ServicesContainer
+from app.bot.models import ServicesContainer, UserProfile
 from app.bot.utils.constants import BACKUP_CREATED_TAG, DB_FORMAT
 from app.bot.utils.navigation import NavAdminTools
 from app.config import DEFAULT_DATA_DIR, Config
-from app.db.models import User
 
 logger = logging.getLogger(__name__)
 router = Router(name=__name__)
@@ -20,7 +19,7 @@ router = Router(name=__name__)
 @router.callback_query(F.data == NavAdminTools.CREATE_BACKUP, IsAdmin())
 async def callback_create_backup(
     callback: CallbackQuery,
-    user: User,
+    user: UserProfile,
     config: Config,
     services: ServicesContainer,
 ) -> None:
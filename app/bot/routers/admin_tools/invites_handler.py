@@ -8,12 +8,12 @@ from aiogram.utils.i18n import gettext as _
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.bot.filters import IsAdmin
-from app.bot.models import ServicesContainer
+from app.bot.models import ServicesContainer, UserProfile
 from app.bot.payment_gateways import GatewayFactory
 from app.bot.routers.misc.keyboard import back_keyboard
 from app.bot.utils.constants import MAIN_MESSAGE_ID_KEY, Currency
 from app.bot.utils.navigation import NavAdminTools
-from app.db.models import Invite, User
+from app.db.models import Invite
 
 from .keyboard import (
     confirm_delete_invite_keyboard,
@@ -31,7 +31,9 @@ class CreateInviteStates(StatesGroup):
 
 
 @router.callback_query(F.data == NavAdminTools.INVITE_EDITOR, IsAdmin())
-async def callback_invite_editor(callback: CallbackQuery, user: User, state: FSMContext) -> None:
+async def callback_invite_editor(
+    callback: CallbackQuery, user: UserProfile, state: FSMContext
+) -> None:
     logger.info(f"Admin {user.tg_id} opened invite editor.")
     await state.set_state(None)
     await callback.message.edit_text(
@@ -41,7 +43,9 @@ async def callback_invite_editor(callback: CallbackQuery, user: User, state: FSM
 
 
 @router.callback_query(F.data == NavAdminTools.CREATE_INVITE, IsAdmin())
-async def callback_create_invite(callback: CallbackQuery, user: User, state: FSMContext) -> None:
+async def callback_create_invite(
+    callback: CallbackQuery, user: UserProfile, state: FSMContext
+) -> None:
     logger.info(f"Admin {user.tg_id} started creating invite link.")
     await state.set_state(CreateInviteStates.invite_input)
     await state.update_data({MAIN_MESSAGE_ID_KEY: callback.message.message_id})
@@ -55,7 +59,7 @@ async def callback_create_invite(callback: CallbackQuery, user: User, state: FSM
 @router.message(CreateInviteStates.invite_input, IsAdmin())
 async def handle_invite_input(
     message: Message,
-    user: User,
+    user: UserProfile,
     session: AsyncSession,
     state: FSMContext,
     services: ServicesContainer,
@@ -68,6 +72,7 @@ async def handle_invite_input(
 
     try:
         invite = await Invite.create(session=session, name=invite_name)
+        services.invites.invalidate(invite.hash_code)
         bot_username = (await message.bot.get_me()).username
         invite_link = f"https://t.me/{bot_username}?start={invite.hash_code}"
 
@@ -92,7 +97,7 @@ async def handle_invite_input(
 
 @router.callback_query(F.data == NavAdminTools.LIST_INVITES, IsAdmin())
 async def callback_list_invites(
-    callback: CallbackQuery, user: User, session: AsyncSession, state: FSMContext
+    callback: CallbackQuery, user: UserProfile, session: AsyncSession, state: FSMContext
 ) -> None:
     logger.info(f"Admin {user.tg_id} is listing invites.")
 
@@ -111,7 +116,9 @@ async def callback_list_invites(
 
 
 @router.callback_query(F.data.startswith(NavAdminTools.SHOW_INVITE_PAGE), IsAdmin())
-async def callback_invite_page(callback: CallbackQuery, user: User, session: AsyncSession) -> None:
+async def callback_invite_page(
+    callback: CallbackQuery, user: UserProfile, session: AsyncSession
+) -> None:
     page = int(callback.data.split("_")[3])
     invites = await Invite.get_all(session=session)
 
@@ -126,7 +133,7 @@ async def callback_invite_page(callback: CallbackQuery, user: User, session: Asy
 @router.callback_query(F.data.startswith(NavAdminTools.SHOW_INVITE_DETAILS), IsAdmin())
 async def callback_invite_details(
     callback: CallbackQuery,
-    user: User,
+    user: UserProfile,
     session: AsyncSession,
     services: ServicesContainer,
     gateway_factory: GatewayFactory,
@@ -157,7 +164,6 @@ async def callback_invite_details(
     try:
         stats = await services.invite_stats.get_detailed_stats(
             invite_name=invite.name,
-            session=session,
             payment_method_currencies=payment_method_currencies,
         )
     except Exception as e:
@@ -197,7 +203,7 @@ async def callback_invite_details(
 @router.callback_query(F.data.startswith(NavAdminTools.TOGGLE_INVITE_STATUS), IsAdmin())
 async def callback_toggle_invite(
     callback: CallbackQuery,
-    user: User,
+    user: UserProfile,
     session: AsyncSession,
     services: ServicesContainer,
     gateway_factory: GatewayFactory,
@@ -214,6 +220,7 @@ async def callback_toggle_invite(
 
     invite.is_active = not invite.is_active
     await session.commit()
+    services.invites.invalidate(invite.hash_code)
 
     logger.info(
         f"Admin {user.tg_id} has changed invite {invite.name} status to {bool(invite.is_active)}."
@@ -240,7 +247,7 @@ async def callback_toggle_invite(
 @router.callback_query(F.data.startswith(NavAdminTools.CONFIRM_DELETE_INVITE), IsAdmin())
 async def callback_delete_invite_prompt(
     callback: CallbackQuery,
-    user: User,
+    user: UserProfile,
     session: AsyncSession,
     services: ServicesContainer,
 ) -> None:
@@ -267,7 +274,7 @@ async def callback_delete_invite_prompt(
 @router.callback_query(F.data.startswith(NavAdminTools.DELETE_INVITE), IsAdmin())
 async def callback_delete_invite(
     callback: CallbackQuery,
-    user: User,
+    user: UserProfile,
     session: AsyncSession,
     services: ServicesContainer,
 ) -> None:
@@ -287,6 +294,7 @@ async def callback_delete_invite(
 
     await session.delete(invite)
     await session.commit()
+    services.invites.invalidate(invite.hash_code)
 
     await services.notification.show_popup(
         callback=callback,
@@ -98,6 +98,12 @@ def promocode_editor_keyboard() -> InlineKeyboardMarkup:
             callback_data=NavAdminTools.CREATE_PROMOCODE,
         )
     )
+    builder.row(
+        InlineKeyboardButton(
+            text=_("promocode_editor:button:bulk_create"),
+            callback_data=NavAdminTools.BULK_CREATE_PROMOCODES,
+        )
+    )
     builder.row(
         InlineKeyboardButton(
             text=_("promocode_editor:button:delete"),
@@ -111,7 +117,7 @@ def promocode_editor_keyboard() -> InlineKeyboardMarkup:
         )
     )
 
-    builder.adjust(3)
+    builder.adjust(2)
     builder.row(back_button(NavAdminTools.MAIN))
     builder.row(back_to_main_menu_button())
     return builder.as_markup()
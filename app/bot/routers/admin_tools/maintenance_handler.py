@@ -5,9 +5,8 @@ from aiogram.types import CallbackQuery
 from aiogram.utils.i18n import gettext as _
 
 from app.bot.filters import IsAdmin
-from app.bot.models import ServicesContainer
+from app.bot.models import ServicesContainer, UserProfile
 from app.bot.utils.navigation import NavAdminTools
-from app.db.models import User
 
 from .keyboard import maintenance_mode_keyboard
 
@@ -16,7 +15,7 @@ router = Router(name=__name__)
 
 
 @router.callback_query(F.data == NavAdminTools.MAINTENANCE_MODE, IsAdmin())
-async def callback_maintenance_mode(callback: CallbackQuery, user: User) -> None:
+async def callback_maintenance_mode(callback: CallbackQuery, user: UserProfile) -> None:
     logger.info(f"Admin {user.tg_id} navigated to maintenance mode options.")
     from app.bot.middlewares import MaintenanceMiddleware
 
@@ -34,7 +33,7 @@ async def callback_maintenance_mode(callback: CallbackQuery, user: User) -> None
 @router.callback_query(F.data == NavAdminTools.MAINTENANCE_MODE_ENABLE, IsAdmin())
 async def callback_maintenance_mode_enable(
     callback: CallbackQuery,
-    user: User,
+    user: UserProfile,
     services: ServicesContainer,
 ) -> None:
     logger.info(f"Admin {user.tg_id} enabled maintenance mode.")
@@ -54,7 +53,7 @@ async def callback_maintenance_mode_enable(
 @router.callback_query(F.data == NavAdminTools.MAINTENANCE_MODE_DISABLE, IsAdmin())
 async def callback_maintenance_mode_disable(
     callback: CallbackQuery,
-    user: User,
+    user: UserProfile,
     services: ServicesContainer,
 ) -> None:
     logger.info(f"Admin {user.tg_id} disabled maintenance mode.")
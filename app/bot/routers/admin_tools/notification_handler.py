@@ -8,7 +8,7 @@ from aiogram.utils.i18n import gettext as _
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.bot.filters import IsAdmin
-from app.bot.models import ServicesContainer
+from app.bot.models import ServicesContainer, UserProfile
 from app.bot.routers.misc.keyboard import back_keyboard, close_notification_keyboard
 from app.bot.utils.constants import (
     MAIN_MESSAGE_ID_KEY,
@@ -19,6 +19,7 @@ from app.bot.utils.constants import (
 )
 from app.bot.utils.navigation import NavAdminTools
 from app.bot.utils.validation import is_valid_message_text, is_valid_user_id
+from app.db.database import Database
 from app.db.models import User
 
 from .keyboard import (
@@ -52,7 +53,7 @@ async def show_notification_main(message: Message, state: FSMContext) -> None:
 @router.callback_query(F.data == NavAdminTools.NOTIFICATION, IsAdmin())
 async def callback_send_notification(
     callback: CallbackQuery,
-    user: User,
+    user: UserProfile,
     state: FSMContext,
 ) -> None:
     logger.info(f"Admin {user.tg_id} opened send notification.")
@@ -62,7 +63,7 @@ async def callback_send_notification(
 @router.callback_query(F.data == NavAdminTools.SEND_NOTIFICATION_USER, IsAdmin())
 async def callback_send_notification_user(
     callback: CallbackQuery,
-    user: User,
+    user: UserProfile,
     state: FSMContext,
 ) -> None:
     logger.info(f"Admin {user.tg_id} opened send notification to user.")
@@ -76,7 +77,7 @@ async def callback_send_notification_user(
 @router.message(NotificationStates.user_id)
 async def message_user_id(
     message: Message,
-    user: User,
+    user: UserProfile,
     session: AsyncSession,
     state: FSMContext,
     services: ServicesContainer,
@@ -88,16 +89,16 @@ async def message_user_id(
     logger.info(f"Admin {user.tg_id} sent user id {user_id} for notification.")
 
     if is_valid_user_id(user_id):
-        user = await User.get(session=session, tg_id=user_id)
+        target_user = await User.get(session=session, tg_id=user_id)
 
-        if user:
+        if target_user:
             await state.update_data({NOTIFICATION_CHAT_IDS_KEY: [user_id]})
             main_message_id = await state.get_value(MAIN_MESSAGE_ID_KEY)
             await state.set_state(NotificationStates.message_to_user)
             await message.bot.edit_message_text(
                 text=_("notification:message:send_message_for_user").format(
                     user_id=user_id,
-                    first_name=user.first_name,
+                    first_name=target_user.first_name,
                 ),
                 chat_id=message.chat.id,
                 message_id=main_message_id,
@@ -120,7 +121,7 @@ async def message_user_id(
 @router.message(NotificationStates.message_to_user)
 async def message_to_user(
     message: Message,
-    user: User,
+    user: UserProfile,
     state: FSMContext,
     services: ServicesContainer,
 ) -> None:
@@ -153,7 +154,7 @@ async def message_to_user(
 )
 async def callback_confirm_send_notification(
     callback: CallbackQuery,
-    user: User,
+    user: UserProfile,
     state: FSMContext,
     services: ServicesContainer,
 ) -> None:
@@ -191,7 +192,7 @@ async def callback_confirm_send_notification(
 @router.callback_query(F.data == NavAdminTools.SEND_NOTIFICATION_ALL, IsAdmin())
 async def callback_send_notification_all(
     callback: CallbackQuery,
-    user: User,
+    user: UserProfile,
     state: FSMContext,
 ) -> None:
     logger.info(f"Admin {user.tg_id} opened send notification to all.")
@@ -205,7 +206,7 @@ async def callback_send_notification_all(
 @router.message(NotificationStates.message_to_all)
 async def message_to_all(
     message: Message,
-    user: User,
+    user: UserProfile,
     session: AsyncSession,
     state: FSMContext,
     services: ServicesContainer,
@@ -237,8 +238,8 @@ async def message_to_all(
 )
 async def callback_confirm_send_notification_all(
     callback: CallbackQuery,
-    user: User,
-    session: AsyncSession,
+    user: UserProfile,
+    db: Database,
     state: FSMContext,
     services: ServicesContainer,
 ) -> None:
@@ -254,7 +255,8 @@ async def callback_confirm_send_notification_all(
         return None
 
     await state.update_data({NOTIFICATION_MESSAGE_TEXT_KEY: text})
-    users = await User.get_all(session=session)
+    async with db.read_session() as session:
+        users = await User.get_all(session=session)
     await services.notification.notify_by_message(
         message=callback.message,
         text=_("notification:ntf:sending_to_all").format(
@@ -288,7 +290,7 @@ async def callback_confirm_send_notification_all(
 @router.callback_query(F.data == NavAdminTools.LAST_NOTIFICATION, IsAdmin())
 async def callback_last_notification(
     callback: CallbackQuery,
-    user: User,
+    user: UserProfile,
     state: FSMContext,
     services: ServicesContainer,
 ) -> None:
@@ -314,7 +316,7 @@ async def callback_last_notification(
 @router.callback_query(F.data == NavAdminTools.EDIT_NOTIFICATION, IsAdmin())
 async def callback_edit_notification(
     callback: CallbackQuery,
-    user: User,
+    user: UserProfile,
     state: FSMContext,
 ) -> None:
     logger.info(f"Admin {user.tg_id} opened edit notification.")
@@ -328,7 +330,7 @@ async def callback_edit_notification(
 @router.message(NotificationStates.message_edit)
 async def message_edit(
     message: Message,
-    user: User,
+    user: UserProfile,
     state: FSMContext,
     services: ServicesContainer,
 ) -> None:
@@ -359,7 +361,7 @@ async def message_edit(
 )
 async def callback_confirm_edit_notification(
     callback: CallbackQuery,
-    user: User,
+    user: UserProfile,
     state: FSMContext,
     services: ServicesContainer,
 ) -> None:
@@ -448,7 +450,7 @@ async def callback_confirm_edit_notification(
 @router.callback_query(F.data == NavAdminTools.DELETE_NOTIFICATION, IsAdmin())
 async def callback_delete_notification(
     callback: CallbackQuery,
-    user: User,
+    user: UserProfile,
     state: FSMContext,
     services: ServicesContainer,
 ) -> None:
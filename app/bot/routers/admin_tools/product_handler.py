@@ -1,13 +1,16 @@
 import logging
+import tempfile
+from pathlib import Path
 
-from aiogram import F, Router
-from aiogram.types import CallbackQuery
+from aiogram import Bot, F, Router
+from aiogram.filters import Command, CommandObject
+from aiogram.types import CallbackQuery, Message
 from aiogram.utils.i18n import gettext as _
 
 from app.bot.filters import IsAdmin
-from app.bot.models import ServicesContainer
+from app.bot.models import ServicesContainer, UserProfile
+from app.bot.services.catalog import DatabaseCatalog
 from app.bot.utils.navigation import NavAdminTools
-from app.db.models import User
 
 logger = logging.getLogger(__name__)
 router = Router(name=__name__)
@@ -16,7 +19,7 @@ router = Router(name=__name__)
 @router.callback_query(F.data == NavAdminTools.PRODUCT_MANAGEMENT, IsAdmin())
 async def callback_product_management(
     callback: CallbackQuery, 
-    user: User, 
+    user: UserProfile, 
     services: ServicesContainer
 ) -> None:
     """Product management main page."""
@@ -33,3 +36,80 @@ async def callback_product_management(
         text=f"📦 Product Management\n\nCurrently managing {product_count} products.\n\n🚧 Advanced product management features coming soon!",
         reply_markup=None,
     )
+
+
+@router.message(Command(NavAdminTools.IMPORT_KEYS), IsAdmin())
+async def command_import_license_keys(
+    message: Message,
+    user: UserProfile,
+    bot: Bot,
+    services: ServicesContainer,
+    command: CommandObject,
+) -> None:
+    """Import vendor license keys from an attached TXT/CSV file."""
+    product_id = (command.args or "").strip()
+    document = message.document
+
+    if not product_id or not document:
+        await message.answer(_("admin_tools:message:import_keys_usage"))
+        return
+
+    if not await services.product.get_product(product_id):
+        await message.answer(_("catalog:error:product_not_found"))
+        return
+
+    logger.info(f"Admin {user.tg_id} importing license keys for product {product_id}.")
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / Path(document.file_name or "keys.txt").name
+            await bot.download(document, destination=path)
+            result = await services.license_keys.import_file(product_id, path)
+    except Exception as exception:
+        logger.error(f"Failed to import license keys for product {product_id}: {exception}")
+        await message.answer(_("admin_tools:message:import_keys_failed"))
+        return
+
+    await message.answer(
+        _("admin_tools:message:import_keys_done").format(
+            product_id=product_id,
+            added=result.added,
+            duplicates=result.duplicates,
+            available=result.available,
+        )
+    )
+
+
+@router.message(Command(NavAdminTools.IMPORT_PRODUCTS), IsAdmin())
+async def command_import_products(
+    message: Message,
+    user: UserProfile,
+    bot: Bot,
+    services: ServicesContainer,
+) -> None:
+    """Re-import the database catalog from an attached JSON file or the products file."""
+    if not isinstance(services.product.catalog, DatabaseCatalog):
+        await message.answer(_("admin_tools:message:import_products_file_source"))
+        return
+
+    document = message.document
+    logger.info(f"Admin {user.tg_id} importing products.")
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = None
+            if document:
+                path = Path(tmp_dir) / "products.json"
+                await bot.download(document, destination=path)
+            result = await services.product.import_catalog(path)
+    except Exception as exception:
+        logger.error(f"Failed to import products: {exception}")
+        await message.answer(_("admin_tools:message:import_products_failed"))
+        return
+
+    await message.answer(
+        _("admin_tools:message:import_products_done").format(
+            added=result.added,
+            updated=result.updated,
+            skipped=result.skipped,
+            total=len(services.product.catalog.get_snapshot().products),
+        )
+    )
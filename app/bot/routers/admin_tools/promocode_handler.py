@@ -1,19 +1,27 @@
 import logging
+from datetime import datetime
 
 from aiogram import F, Router
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-from aiogram.types import CallbackQuery, Message
+from aiogram.types import BufferedInputFile, CallbackQuery, Message
 from aiogram.utils.i18n import gettext as _
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.bot.filters import IsAdmin
-from app.bot.models import ServicesContainer
+from app.bot.models import ServicesContainer, UserProfile
 from app.bot.routers.misc.keyboard import back_keyboard
-from app.bot.utils.constants import INPUT_PROMOCODE_KEY, MAIN_MESSAGE_ID_KEY
+from app.bot.utils.constants import (
+    INPUT_PROMOCODE_COUNT_KEY,
+    INPUT_PROMOCODE_KEY,
+    INPUT_PROMOCODE_MAX_USES_KEY,
+    MAIN_MESSAGE_ID_KEY,
+    MAX_BULK_PROMOCODES,
+    MAX_PROMOCODE_USES,
+)
 from app.bot.utils.formatting import format_subscription_period
 from app.bot.utils.navigation import NavAdminTools
-from app.db.models import Promocode, User
+from app.db.models import Promocode
 
 from .keyboard import promocode_duration_keyboard, promocode_editor_keyboard
 
@@ -25,6 +33,11 @@ class CreatePromocodeStates(StatesGroup):
     selecting_duration = State()
 
 
+class BulkCreatePromocodeStates(StatesGroup):
+    count_input = State()
+    selecting_duration = State()
+
+
 class DeletePromocodeStates(StatesGroup):
     promocode_input = State()
 
@@ -46,14 +59,18 @@ async def show_promocode_editor_main(message: Message, state: FSMContext) -> Non
 
 
 @router.callback_query(F.data == NavAdminTools.PROMOCODE_EDITOR, IsAdmin())
-async def callback_promocode_editor(callback: CallbackQuery, user: User, state: FSMContext) -> None:
+async def callback_promocode_editor(
+    callback: CallbackQuery, user: UserProfile, state: FSMContext
+) -> None:
     logger.info(f"Admin {user.tg_id} opened promocode editor.")
     await show_promocode_editor_main(message=callback.message, state=state)
 
 
 # region: Create Promocode
 @router.callback_query(F.data == NavAdminTools.CREATE_PROMOCODE, IsAdmin())
-async def callback_create_promocode(callback: CallbackQuery, user: User, state: FSMContext) -> None:
+async def callback_create_promocode(
+    callback: CallbackQuery, user: UserProfile, state: FSMContext
+) -> None:
     logger.info(f"Admin {user.tg_id} started creating promocode.")
     await state.set_state(CreatePromocodeStates.selecting_duration)
     await callback.message.edit_text(
@@ -65,7 +82,7 @@ async def callback_create_promocode(callback: CallbackQuery, user: User, state:
 @router.callback_query(CreatePromocodeStates.selecting_duration, IsAdmin())
 async def callback_duration_selected(
     callback: CallbackQuery,
-    user: User,
+    user: UserProfile,
     session: AsyncSession,
     state: FSMContext,
     services: ServicesContainer,
@@ -75,6 +92,7 @@ async def callback_duration_selected(
     await show_promocode_editor_main(message=callback.message, state=state)
 
     if promocode:
+        await services.promocodes.add([promocode.code])
         await services.notification.notify_by_message(
             message=callback.message,
             text=_("promocode_editor:ntf:created_success").format(
@@ -93,9 +111,107 @@ async def callback_duration_selected(
 # endregion
 
 
+# region: Bulk Create Promocodes
+@router.callback_query(F.data == NavAdminTools.BULK_CREATE_PROMOCODES, IsAdmin())
+async def callback_bulk_create_promocodes(
+    callback: CallbackQuery, user: UserProfile, state: FSMContext
+) -> None:
+    logger.info(f"Admin {user.tg_id} started bulk creating promocodes.")
+    await state.set_state(BulkCreatePromocodeStates.count_input)
+    await callback.message.edit_text(
+        text=_("promocode_editor:message:bulk_create").format(max=MAX_BULK_PROMOCODES),
+        reply_markup=back_keyboard(NavAdminTools.PROMOCODE_EDITOR),
+    )
+
+
+@router.message(BulkCreatePromocodeStates.count_input, IsAdmin())
+async def handle_promocode_count_input(
+    message: Message,
+    user: UserProfile,
+    state: FSMContext,
+    services: ServicesContainer,
+) -> None:
+    # "COUNT" or "COUNT USES", where USES is how many users can redeem each code.
+    values = message.text.split() if message.text else []
+    logger.info(f"Admin {user.tg_id} entered {values} promocodes to create.")
+
+    if 0 < len(values) <= 2 and all(value.isdigit() for value in values):
+        count, max_uses = int(values[0]), int(values[1]) if len(values) == 2 else 1
+    else:
+        count = max_uses = 0
+
+    if not 0 < count <= MAX_BULK_PROMOCODES or not 0 < max_uses <= MAX_PROMOCODE_USES:
+        await services.notification.notify_by_message(
+            message=message,
+            text=_("promocode_editor:ntf:bulk_invalid_count").format(
+                max=MAX_BULK_PROMOCODES, max_uses=MAX_PROMOCODE_USES
+            ),
+            duration=5,
+        )
+        return
+
+    await state.set_state(BulkCreatePromocodeStates.selecting_duration)
+    await state.update_data(
+        {INPUT_PROMOCODE_COUNT_KEY: count, INPUT_PROMOCODE_MAX_USES_KEY: max_uses}
+    )
+    main_message_id = await state.get_value(MAIN_MESSAGE_ID_KEY)
+    await message.bot.edit_message_text(
+        text=_("promocode_editor:message:bulk_duration").format(count=count, max_uses=max_uses),
+        chat_id=message.chat.id,
+        message_id=main_message_id,
+        reply_markup=promocode_duration_keyboard(),
+    )
+
+
+@router.callback_query(BulkCreatePromocodeStates.selecting_duration, IsAdmin())
+async def callback_bulk_duration_selected(
+    callback: CallbackQuery,
+    user: UserProfile,
+    session: AsyncSession,
+    state: FSMContext,
+    services: ServicesContainer,
+) -> None:
+    count = await state.get_value(INPUT_PROMOCODE_COUNT_KEY)
+    max_uses = await state.get_value(INPUT_PROMOCODE_MAX_USES_KEY, 1)
+    duration = int(callback.data)
+    logger.info(
+        f"Admin {user.tg_id} is creating {count} promocodes "
+        f"for {duration} days, {max_uses} uses each."
+    )
+    codes = await Promocode.create_batch(
+        session=session, count=count, duration=duration, max_uses=max_uses
+    )
+    await services.promocodes.add(codes)
+    await show_promocode_editor_main(message=callback.message, state=state)
+
+    if not codes:
+        await services.notification.notify_by_message(
+            message=callback.message,
+            text=_("promocode_editor:ntf:create_failed"),
+            duration=5,
+        )
+        return
+
+    await callback.message.answer_document(
+        document=BufferedInputFile(
+            file="\n".join(codes).encode(),
+            filename=f"promocodes_{duration}d_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.txt",
+        ),
+        caption=_("promocode_editor:ntf:bulk_created_success").format(
+            count=len(codes),
+            duration=format_subscription_period(duration),
+        ),
+    )
+
+
+# endregion
+
+
 # region: Delete Promocode
 @router.callback_query(F.data == NavAdminTools.DELETE_PROMOCODE, IsAdmin())
-async def callback_delete_promocode(callback: CallbackQuery, user: User, state: FSMContext) -> None:
+async def callback_delete_promocode(
+    callback: CallbackQuery, user: UserProfile, state: FSMContext
+) -> None:
     logger.info(f"Admin {user.tg_id} started deleting promocode.")
     await state.set_state(DeletePromocodeStates.promocode_input)
     await callback.message.edit_text(
@@ -107,7 +223,7 @@ async def callback_delete_promocode(callback: CallbackQuery, user: User, state:
 @router.message(DeletePromocodeStates.promocode_input, IsAdmin())
 async def handle_promocode_input(
     message: Message,
-    user: User,
+    user: UserProfile,
     session: AsyncSession,
     state: FSMContext,
     services: ServicesContainer,
@@ -135,7 +251,9 @@ async def handle_promocode_input(
 
 # region Edit Promocode
 @router.callback_query(F.data == NavAdminTools.EDIT_PROMOCODE, IsAdmin())
-async def callback_edit_promocode(callback: CallbackQuery, user: User, state: FSMContext) -> None:
+async def callback_edit_promocode(
+    callback: CallbackQuery, user: UserProfile, state: FSMContext
+) -> None:
     logger.info(f"Admin {user.tg_id} started deleting promocode.")
     await state.set_state(EditPromocodeStates.promocode_input)
     await callback.message.edit_text(
@@ -147,7 +265,7 @@ async def callback_edit_promocode(callback: CallbackQuery, user: User, state: FS
 @router.message(EditPromocodeStates.promocode_input, IsAdmin())
 async def handle_promocode_input(
     message: Message,
-    user: User,
+    user: UserProfile,
     session: AsyncSession,
     state: FSMContext,
     services: ServicesContainer,
@@ -180,7 +298,7 @@ async def handle_promocode_input(
 @router.callback_query(EditPromocodeStates.selecting_duration, IsAdmin())
 async def callback_duration_selected(
     callback: CallbackQuery,
-    user: User,
+    user: UserProfile,
     session: AsyncSession,
     state: FSMContext,
     services: ServicesContainer,
@@ -8,7 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from aiogram.utils.i18n import gettext as _
 
 from app.bot.filters import IsDev
-from app.bot.models import ServicesContainer
+from app.bot.models import ServicesContainer, UserProfile
 from app.bot.routers.misc.keyboard import back_keyboard
 from app.bot.utils.constants import (
     MAIN_MESSAGE_ID_KEY,
@@ -19,7 +19,6 @@ from app.bot.utils.constants import (
 from app.bot.utils.navigation import NavAdminTools
 from app.bot.utils.network import ping_url
 from app.bot.utils.validation import is_valid_client_count, is_valid_host
-from app.db.models import User
 # from app.db.models import Server  # Removed - no longer using VPN servers
 
 from .keyboard import confirm_add_server_keyboard, server_keyboard, servers_keyboard
@@ -34,7 +33,7 @@ async def callback_server_management(
     callback: CallbackQuery,
     state: FSMContext,
     session: AsyncSession,
-    user: User,
+    user: UserProfile,
 ) -> None:
     logger.info(f"Dev {user.tg_id} tried to access server management.")
     await state.set_state(None)
@@ -49,7 +48,7 @@ async def callback_server_management(
 
 @router.callback_query(F.data == NavAdminTools.SYNC_SERVERS, IsDev())
 async def callback_sync_servers(
-    callback: CallbackQuery, services: ServicesContainer, user: User
+    callback: CallbackQuery, services: ServicesContainer, user: UserProfile
 ) -> None:
     logger.info(f"Dev {user.tg_id} tried to sync servers.")
     
@@ -59,7 +58,7 @@ async def callback_sync_servers(
 
 @router.callback_query(F.data == NavAdminTools.ADD_SERVER, IsDev())
 async def callback_add_server(
-    callback: CallbackQuery, state: FSMContext, user: User
+    callback: CallbackQuery, state: FSMContext, user: UserProfile
 ) -> None:
     logger.info(f"Dev {user.tg_id} tried to add server.")
     
@@ -69,7 +68,7 @@ async def callback_add_server(
 
 @router.callback_query(F.data.startswith(NavAdminTools.SHOW_SERVER), IsDev())
 async def callback_show_server(
-    callback: CallbackQuery, state: FSMContext, session: AsyncSession, user: User
+    callback: CallbackQuery, state: FSMContext, session: AsyncSession, user: UserProfile
 ) -> None:
     logger.info(f"Dev {user.tg_id} tried to show server.")
     
@@ -79,7 +78,7 @@ async def callback_show_server(
 
 @router.callback_query(F.data.startswith(NavAdminTools.PING_SERVER), IsDev())
 async def callback_ping_server(
-    callback: CallbackQuery, state: FSMContext, session: AsyncSession, user: User
+    callback: CallbackQuery, state: FSMContext, session: AsyncSession, user: UserProfile
 ) -> None:
     logger.info(f"Dev {user.tg_id} tried to ping server.")
     
@@ -89,7 +88,7 @@ async def callback_ping_server(
 
 @router.callback_query(F.data.startswith(NavAdminTools.DELETE_SERVER), IsDev())
 async def callback_delete_server(
-    callback: CallbackQuery, state: FSMContext, session: AsyncSession, user: User
+    callback: CallbackQuery, state: FSMContext, session: AsyncSession, user: UserProfile
 ) -> None:
     logger.info(f"Dev {user.tg_id} tried to delete server.")
     
@@ -5,14 +5,28 @@ from aiogram.types import CallbackQuery
 from aiogram.utils.i18n import gettext as _
 
 from app.bot.filters import IsAdmin
+from app.bot.models import ServicesContainer, UserProfile
 from app.bot.utils.navigation import NavAdminTools
-from app.db.models import User
 
 logger = logging.getLogger(__name__)
 router = Router(name=__name__)
 
 
 @router.callback_query(F.data == NavAdminTools.STATISTICS, IsAdmin())
-async def callback_statistics(callback: CallbackQuery, user: User) -> None:
+async def callback_statistics(
+    callback: CallbackQuery, user: UserProfile, services: ServicesContainer
+) -> None:
     logger.info(f"Admin {user.tg_id} opened statistics.")
-    await callback.answer(text=_("global:popup:development"), show_alert=True)
+    stats = await services.delivery.stats()
+    latency = stats.average_latency_seconds
+    await callback.answer(
+        text=_("statistics:popup:delivery_queue").format(
+            pending=stats.pending,
+            processing=stats.processing,
+            completed=stats.completed,
+            dead=stats.dead,
+            oldest=round(stats.oldest_pending_seconds),
+            latency=round(latency) if latency is not None else "—",
+        ),
+        show_alert=True,
+    )
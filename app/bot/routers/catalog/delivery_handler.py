@@ -8,7 +8,7 @@ from aiogram import Bot
 from aiogram.types import Message
 from aiogram.utils.i18n import gettext as _
 
-from app.db.models import User
+from app.bot.models import UserProfile
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +21,7 @@ class ProductDeliveryHandler:
     
     async def send_product_delivery(
         self, 
-        user: User, 
+        user: UserProfile, 
         product: Dict[str, Any], 
         delivery_info: Dict[str, Any]
     ) -> bool:
@@ -89,7 +89,7 @@ class ProductDeliveryHandler:
     
     async def send_purchase_receipt(
         self, 
-        user: User, 
+        user: UserProfile, 
         product: Dict[str, Any], 
         transaction_info: Dict[str, Any]
     ) -> bool:
@@ -118,7 +118,7 @@ class ProductDeliveryHandler:
     
     async def send_delivery_error(
         self, 
-        user: User, 
+        user: UserProfile, 
         product: Dict[str, Any], 
         error_message: str
     ) -> bool:
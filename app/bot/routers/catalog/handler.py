@@ -1,24 +1,37 @@
+import html
 import logging
 
 from aiogram import F, Router
-from aiogram.types import CallbackQuery
+from aiogram.filters import Command, CommandObject
+from aiogram.types import CallbackQuery, InlineKeyboardMarkup, Message
+from aiogram.utils.i18n import get_i18n
 from aiogram.utils.i18n import gettext as _
 
-from app.bot.models import ServicesContainer
+from app.bot.models import CatalogPageData, ServicesContainer, UserProfile
+from app.bot.models.catalog import DEFAULT_SORT
+from app.bot.models.price_matrix import Price
+from app.bot.services.product_card import LOW_STOCK_THRESHOLD, ProductCard, stock_bucket
 from app.bot.utils.navigation import NavCatalog
-from app.db.models import User
+from app.config import Config
 
-from .keyboard import catalog_keyboard, category_products_keyboard, product_details_keyboard
+from .keyboard import (
+    catalog_keyboard,
+    category_page_keyboard,
+    category_products_keyboard,
+    product_details_keyboard,
+)
 from .purchase_keyboard import purchase_confirmation_keyboard
 
 logger = logging.getLogger(__name__)
 router = Router(name=__name__)
 
+SEARCH_RESULTS_LIMIT = 10
+
 
 @router.callback_query(F.data == NavCatalog.MAIN)
 async def callback_catalog(
     callback: CallbackQuery, 
-    user: User, 
+    user: UserProfile, 
     services: ServicesContainer
 ) -> None:
     """Show main catalog with product categories."""
@@ -34,25 +47,24 @@ async def callback_catalog(
     logger.debug(f"✅ Catalog main page displayed for user {user.tg_id}")
 
 
-@router.callback_query(F.data.startswith(NavCatalog.CATEGORY))
-async def callback_category(
-    callback: CallbackQuery, 
-    user: User, 
-    services: ServicesContainer
+async def show_category_page(
+    callback: CallbackQuery,
+    services: ServicesContainer,
+    config: Config,
+    category: str,
+    sort: str = DEFAULT_SORT,
+    cursor: str | None = None,
 ) -> None:
-    """Show products in a specific category."""
-    category = callback.data.split("_", 1)[1]
-    logger.info(f"User {user.tg_id} browsing category: {category}")
-    
-    # Get products from the service
-    products = await services.product.get_products_by_category(category)
-    
-    if products:
+    snapshot = services.product.catalog.get_snapshot()
+    count = len(snapshot.in_category(category))
+
+    if count:
+        page = snapshot.page(category, sort, cursor, size=config.product.CATALOG_PAGE_SIZE)
         text = _("catalog:message:category").format(
             category=_(f"catalog:category:{category}"),
-            count=len(products)
+            count=count
         )
-        keyboard = category_products_keyboard(category, products)
+        keyboard = category_page_keyboard(page, services.prices)
     else:
         text = _("catalog:message:no_products_in_category").format(
             category=_(f"catalog:category:{category}")
@@ -65,10 +77,74 @@ async def callback_category(
     )
 
 
+@router.callback_query(F.data.startswith(NavCatalog.CATEGORY))
+async def callback_category(
+    callback: CallbackQuery, 
+    user: UserProfile, 
+    services: ServicesContainer,
+    config: Config,
+) -> None:
+    """Show the first page of products in a specific category."""
+    category = callback.data.split("_", 1)[1]
+    logger.info(f"User {user.tg_id} browsing category: {category}")
+    await show_category_page(callback, services, config, category)
+
+
+@router.callback_query(CatalogPageData.filter())
+async def callback_category_page(
+    callback: CallbackQuery,
+    user: UserProfile,
+    services: ServicesContainer,
+    config: Config,
+    callback_data: CatalogPageData,
+) -> None:
+    """Show another page or sort order of a category listing."""
+    logger.info(
+        f"User {user.tg_id} browsing category {callback_data.category} "
+        f"sorted by {callback_data.sort} from {callback_data.cursor or 'start'}"
+    )
+    await show_category_page(
+        callback,
+        services,
+        config,
+        callback_data.category,
+        sort=callback_data.sort,
+        cursor=callback_data.cursor or None,
+    )
+
+
+@router.message(Command(NavCatalog.SEARCH))
+async def command_search(
+    message: Message,
+    user: UserProfile,
+    services: ServicesContainer,
+    command: CommandObject,
+) -> None:
+    """Search the catalog by product name, description or features."""
+    query = (command.args or "").strip()
+    if not query:
+        await message.answer(_("catalog:message:search_usage"))
+        return
+
+    logger.info(f"User {user.tg_id} searching products: {query}")
+    products = await services.product.search_products(query, limit=SEARCH_RESULTS_LIMIT)
+
+    if products:
+        text = _("catalog:message:search_results").format(
+            query=html.escape(query), count=len(products)
+        )
+        keyboard = category_products_keyboard(NavCatalog.SEARCH, products, services.prices)
+    else:
+        text = _("catalog:message:search_no_results").format(query=html.escape(query))
+        keyboard = catalog_keyboard()
+
+    await message.answer(text=text, reply_markup=keyboard)
+
+
 @router.callback_query(F.data.startswith(NavCatalog.BUY_PRODUCT))
 async def callback_buy_product(
     callback: CallbackQuery, 
-    user: User, 
+    user: UserProfile, 
     services: ServicesContainer
 ) -> None:
     """Handle direct product purchase."""
@@ -76,18 +152,17 @@ async def callback_buy_product(
     logger.info(f"User {user.tg_id} wants to buy product: {product_id}")
     
     # Get product details
-    products = await services.product.load_products_catalog()
-    product = next((p for p in products if p['id'] == product_id), None)
+    product = await services.product.get_product(product_id)
     
     if not product:
         await callback.answer(_("catalog:error:product_not_found"), show_alert=True)
         return
     
-    # Check if product is available
-    stock = product.get('stock', 0)
+    # Check if product is available and hold a unit for this checkout
     is_active = product.get('is_active', True)
+    price = services.prices.product_price(product)
     
-    if not is_active or stock <= 0:
+    if not is_active or not price or not await services.stock.reserve(user.tg_id, product):
         await callback.answer(_("catalog:error:product_unavailable"), show_alert=True)
         return
     
@@ -103,8 +178,8 @@ async def callback_buy_product(
     subscription_data = SubscriptionData(
         user_id=user.tg_id,
         devices=1,  # Products don't use device concept
-        duration=product.get('duration_days', 30),
-        price=product['price']['amount'],
+        duration=price.duration or product.get('duration_days', 30),
+        price=float(price.amount),
         state=NavSubscription.PAY,
         product_id=product['id'],
         product_name=product['name']
@@ -113,8 +188,8 @@ async def callback_buy_product(
     # Format purchase confirmation
     text = _("catalog:message:purchase_confirmation").format(
         name=product['name'],
-        price=product['price']['amount'],
-        currency=product['price']['currency'],
+        price=price.amount,
+        currency=price.currency,
         delivery_type=_(f"catalog:delivery:{product.get('delivery_type', 'digital')}")
     )
     
@@ -131,7 +206,7 @@ async def callback_buy_product(
 @router.callback_query(F.data.startswith(NavCatalog.ADD_TO_CART))
 async def callback_add_to_cart(
     callback: CallbackQuery, 
-    user: User, 
+    user: UserProfile, 
     services: ServicesContainer
 ) -> None:
     """Add product to shopping cart."""
@@ -139,8 +214,7 @@ async def callback_add_to_cart(
     logger.info(f"User {user.tg_id} adding product {product_id} to cart")
     
     # Get product details
-    products = await services.product.load_products_catalog()
-    product = next((p for p in products if p['id'] == product_id), None)
+    product = await services.product.get_product(product_id)
     
     if not product:
         await callback.answer(_("catalog:error:product_not_found"), show_alert=True)
@@ -155,10 +229,60 @@ async def callback_add_to_cart(
     )
 
 
+def render_product_card(
+    product: dict, stock: int | None, price: Price | None
+) -> tuple[str, InlineKeyboardMarkup]:
+    """Render product details text and keyboard in the current locale."""
+    features = "\n".join([f"• {feature}" for feature in product.get('features', [])])
+
+    # Format duration
+    duration_days = product.get('duration_days', 0)
+    if duration_days == 0:
+        duration_text = _("catalog:duration:lifetime")
+    elif duration_days >= 365:
+        years = duration_days // 365
+        duration_text = _("catalog:duration:years").format(years=years)
+    elif duration_days >= 30:
+        months = duration_days // 30
+        duration_text = _("catalog:duration:months").format(months=months)
+    else:
+        duration_text = _("catalog:duration:days").format(days=duration_days)
+
+    # Format stock status
+    if stock is None or stock > LOW_STOCK_THRESHOLD:
+        stock_text = _("catalog:stock:available")
+    elif stock > 0:
+        stock_text = _("catalog:stock:limited").format(count=stock)
+    else:
+        stock_text = _("catalog:stock:out_of_stock")
+
+    # Check if product is active
+    is_active = product.get('is_active', True)
+    status_emoji = "🟢" if is_active else "🔴"
+
+    text = _("catalog:message:product_details_enhanced").format(
+        status_emoji=status_emoji,
+        name=product['name'],
+        description=product['description'],
+        price=price.amount if price else "—",
+        currency=price.currency if price else "",
+        category=_(f"catalog:category:{product['category']}"),
+        duration=duration_text,
+        stock_status=stock_text,
+        delivery_type=_(f"catalog:delivery:{product.get('delivery_type', 'digital')}"),
+        features=features if features else _("catalog:message:no_features")
+    )
+
+    keyboard = product_details_keyboard(
+        str(product['id']), is_active and (stock is None or stock > 0)
+    )
+    return text, keyboard
+
+
 @router.callback_query(F.data.startswith(NavCatalog.PRODUCT))
 async def callback_product_details(
     callback: CallbackQuery, 
-    user: User, 
+    user: UserProfile, 
     services: ServicesContainer
 ) -> None:
     """Show details of a specific product."""
@@ -166,53 +290,25 @@ async def callback_product_details(
     logger.info(f"User {user.tg_id} viewing product: {product_id}")
     
     # Get product details
-    products = await services.product.load_products_catalog()
-    product = next((p for p in products if p['id'] == product_id), None)
+    snapshot = services.product.catalog.get_snapshot()
+    product = snapshot.get(product_id)
     
     if product:
-        # Format product details with enhanced display
-        features = "\n".join([f"• {feature}" for feature in product.get('features', [])])
-        
-        # Format duration
-        duration_days = product.get('duration_days', 0)
-        if duration_days == 0:
-            duration_text = _("catalog:duration:lifetime")
-        elif duration_days >= 365:
-            years = duration_days // 365
-            duration_text = _("catalog:duration:years").format(years=years)
-        elif duration_days >= 30:
-            months = duration_days // 30
-            duration_text = _("catalog:duration:months").format(months=months)
-        else:
-            duration_text = _("catalog:duration:days").format(days=duration_days)
-        
-        # Format stock status
-        stock = product.get('stock', 0)
-        if stock > 10:
-            stock_text = _("catalog:stock:available")
-        elif stock > 0:
-            stock_text = _("catalog:stock:limited").format(count=stock)
-        else:
-            stock_text = _("catalog:stock:out_of_stock")
-        
-        # Check if product is active
-        is_active = product.get('is_active', True)
-        status_emoji = "🟢" if is_active else "🔴"
-        
-        text = _("catalog:message:product_details_enhanced").format(
-            status_emoji=status_emoji,
-            name=product['name'],
-            description=product['description'],
-            price=product['price']['amount'],
-            currency=product['price']['currency'],
-            category=_(f"catalog:category:{product['category']}"),
-            duration=duration_text,
-            stock_status=stock_text,
-            delivery_type=_(f"catalog:delivery:{product.get('delivery_type', 'digital')}"),
-            features=features if features else _("catalog:message:no_features")
-        )
-        
-        keyboard = product_details_keyboard(product_id, is_active and stock > 0)
+        stock = await services.stock.get_available(product)
+        bucket = stock_bucket(stock)
+        locale = get_i18n().current_locale
+
+        card = services.product.cards.get(product_id, locale, snapshot.version, bucket)
+        if not card:
+            text, keyboard = render_product_card(
+                product, stock, services.prices.product_price(product)
+            )
+            card = ProductCard(
+                version=snapshot.version, bucket=bucket, text=text, reply_markup=keyboard
+            )
+            services.product.cards.put(product_id, locale, card)
+
+        text, keyboard = card.text, card.reply_markup
     else:
         text = _("catalog:message:product_not_found")
         keyboard = catalog_keyboard()
@@ -221,93 +317,3 @@ async def callback_product_details(
         text=text,
         reply_markup=keyboard,
     )
-
-
-@router.callback_query(F.data.startswith(NavCatalog.BUY_PRODUCT))
-async def callback_buy_product(
-    callback: CallbackQuery, 
-    user: User, 
-    services: ServicesContainer
-) -> None:
-    """Handle direct product purchase."""
-    product_id = callback.data.split("_", 2)[2]
-    logger.info(f"User {user.tg_id} wants to buy product: {product_id}")
-    
-    # Get product details
-    products = await services.product.load_products_catalog()
-    product = next((p for p in products if p['id'] == product_id), None)
-    
-    if not product:
-        await callback.answer(_("catalog:error:product_not_found"), show_alert=True)
-        return
-    
-    # Check if product is available
-    stock = product.get('stock', 0)
-    is_active = product.get('is_active', True)
-    
-    if not is_active or stock <= 0:
-        await callback.answer(_("catalog:error:product_unavailable"), show_alert=True)
-        return
-    
-    # Store product selection in user session
-    # You'll need to implement session storage, this is a placeholder
-    # await services.storage.set_data(user.tg_id, "selected_product", product)
-    
-    # Redirect to payment flow
-    from app.bot.models.subscription_data import SubscriptionData
-    from app.bot.utils.navigation import NavSubscription
-    
-    # Create subscription data for the product
-    subscription_data = SubscriptionData(
-        user_id=user.tg_id,
-        devices=1,  # Products don't use device concept
-        duration=product.get('duration_days', 30),
-        price=product['price']['amount'],
-        state=NavSubscription.PAY,
-        product_id=product['id'],
-        product_name=product['name']
-    )
-    
-    # Format purchase confirmation
-    text = _("catalog:message:purchase_confirmation").format(
-        name=product['name'],
-        price=product['price']['amount'],
-        currency=product['price']['currency'],
-        delivery_type=_(f"catalog:delivery:{product.get('delivery_type', 'digital')}")
-    )
-    
-    # Create purchase confirmation keyboard
-    from .keyboard import purchase_confirmation_keyboard
-    keyboard = purchase_confirmation_keyboard(product_id)
-    
-    await callback.message.edit_text(
-        text=text,
-        reply_markup=keyboard,
-    )
-
-
-@router.callback_query(F.data.startswith(NavCatalog.ADD_TO_CART))
-async def callback_add_to_cart(
-    callback: CallbackQuery, 
-    user: User, 
-    services: ServicesContainer
-) -> None:
-    """Add product to shopping cart."""
-    product_id = callback.data.split("_", 3)[3]
-    logger.info(f"User {user.tg_id} adding product {product_id} to cart")
-    
-    # Get product details
-    products = await services.product.load_products_catalog()
-    product = next((p for p in products if p['id'] == product_id), None)
-    
-    if not product:
-        await callback.answer(_("catalog:error:product_not_found"), show_alert=True)
-        return
-    
-    # Add to cart (implement cart service later)
-    # await services.cart.add_product(user.tg_id, product)
-    
-    await callback.answer(
-        _("catalog:success:added_to_cart").format(name=product['name']), 
-        show_alert=True
-    )
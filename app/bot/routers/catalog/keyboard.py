@@ -1,7 +1,16 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.bot.services import PriceService
+
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from aiogram.utils.i18n import gettext as _
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
+from app.bot.models import CatalogPageData
+from app.bot.models.catalog import SORT_ORDERS, CategoryPage
 from app.bot.routers.misc.keyboard import back_to_main_menu_button
 from app.bot.utils.navigation import NavCatalog, NavSubscription
 
@@ -52,17 +61,80 @@ def catalog_keyboard() -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
-def category_products_keyboard(category: str, products: list) -> InlineKeyboardMarkup:
+def category_products_keyboard(
+    category: str, products: list, price_service: PriceService
+) -> InlineKeyboardMarkup:
     """Keyboard showing products in a specific category."""
     builder = InlineKeyboardBuilder()
 
     for product in products:
-        builder.row(
+        builder.row(product_button(product, price_service))
+
+    builder.row(
+        InlineKeyboardButton(
+            text=_("misc:button:back"),
+            callback_data=NavCatalog.MAIN,
+        )
+    )
+    builder.row(back_to_main_menu_button())
+    return builder.as_markup()
+
+
+def product_button(product: dict, price_service: PriceService) -> InlineKeyboardButton:
+    price = price_service.product_price(product)
+    if price and len(price_service.product_offers(product)) == 1:
+        text = f"{product['name']} - {price.amount} {price.currency}"
+    elif price:
+        text = _("catalog:button:product_from").format(name=product['name'], price=price.amount)
+    else:
+        text = product['name']
+    return InlineKeyboardButton(text=text, callback_data=f"{NavCatalog.PRODUCT}_{product['id']}")
+
+
+def category_page_keyboard(page: CategoryPage, price_service: PriceService) -> InlineKeyboardMarkup:
+    """Keyboard showing one page of a category listing with sorting and paging."""
+    builder = InlineKeyboardBuilder()
+
+    builder.row(
+        *[
+            InlineKeyboardButton(
+                text=("• " if sort == page.sort else "") + _(f"catalog:button:sort_{sort}"),
+                callback_data=CatalogPageData(category=page.category, sort=sort).pack(),
+            )
+            for sort in SORT_ORDERS
+        ]
+    )
+
+    for product in page.items:
+        builder.row(product_button(product, price_service))
+
+    if page.total_pages > 1:
+        navigation = []
+        if page.prev_cursor is not None:
+            navigation.append(
+                InlineKeyboardButton(
+                    text=_("catalog:button:previous_page"),
+                    callback_data=CatalogPageData(
+                        category=page.category, sort=page.sort, cursor=page.prev_cursor
+                    ).pack(),
+                )
+            )
+        navigation.append(
             InlineKeyboardButton(
-                text=f"{product['name']} - {product['price']['amount']} {product['price']['currency']}",
-                callback_data=f"{NavCatalog.PRODUCT}_{product['id']}",
+                text=f"{page.number}/{page.total_pages}",
+                callback_data="disabled",
             )
         )
+        if page.next_cursor is not None:
+            navigation.append(
+                InlineKeyboardButton(
+                    text=_("catalog:button:next_page"),
+                    callback_data=CatalogPageData(
+                        category=page.category, sort=page.sort, cursor=page.next_cursor
+                    ).pack(),
+                )
+            )
+        builder.row(*navigation)
 
     builder.row(
         InlineKeyboardButton(
@@ -6,7 +6,8 @@ from aiogram.types import CallbackQuery
 from aiogram.utils.i18n import gettext as _
 from aiohttp.web import HTTPFound, Request, Response
 
-from app.bot.models import ServicesContainer
+from app.bot.utils.routing import skip_db_session
+from app.bot.models import ServicesContainer, UserProfile
 from app.bot.utils.constants import (
     APP_ANDROID_SCHEME,
     APP_IOS_SCHEME,
@@ -17,12 +18,11 @@ from app.bot.utils.constants import (
 from app.bot.utils.navigation import NavDownload, NavMain
 from app.bot.utils.network import parse_redirect_url
 from app.config import Config
-from app.db.models import User
 
 from .keyboard import download_keyboard, platforms_keyboard
 
 logger = logging.getLogger(__name__)
-router = Router(name=__name__)
+router = skip_db_session(Router(name=__name__))
 
 
 async def redirect_to_connection(request: Request) -> Response:
@@ -50,7 +50,7 @@ async def redirect_to_connection(request: Request) -> Response:
 
 
 @router.callback_query(F.data == NavDownload.MAIN)
-async def callback_download(callback: CallbackQuery, user: User, state: FSMContext) -> None:
+async def callback_download(callback: CallbackQuery, user: UserProfile, state: FSMContext) -> None:
     logger.info(f"User {user.tg_id} opened download apps page.")
 
     main_message_id = await state.get_value(MAIN_MESSAGE_ID_KEY)
@@ -80,7 +80,7 @@ async def callback_download(callback: CallbackQuery, user: User, state: FSMConte
 @router.callback_query(F.data.startswith(NavDownload.PLATFORM))
 async def callback_platform(
     callback: CallbackQuery,
-    user: User,
+    user: UserProfile,
     services: ServicesContainer,
     config: Config,
 ) -> None:
@@ -1,4 +1,5 @@
 import logging
+from dataclasses import replace
 
 from aiogram import Bot, F, Router
 from aiogram.filters import Command, CommandObject
@@ -10,11 +11,13 @@ from aiogram.utils.i18n import gettext as _
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.bot.filters import IsAdmin
-from app.bot.models import ServicesContainer
+from app.bot.models import InviteLink, ServicesContainer, UserProfile
+from app.bot.services.invite_tracker import InviteTracker
+from app.bot.services.write_buffer import WriteBuffer
 from app.bot.utils.constants import MAIN_MESSAGE_ID_KEY
 from app.bot.utils.navigation import NavMain
 from app.config import Config
-from app.db.models import Invite, Referral, User
+from app.db.models import Referral, User
 
 from .keyboard import main_menu_keyboard
 
@@ -22,27 +25,29 @@ logger = logging.getLogger(__name__)
 router = Router(name=__name__)
 
 
-async def process_invite_attribution(session: AsyncSession, user: User, invite_hash: str) -> bool:
+async def process_invite_attribution(
+    invites: InviteTracker, writes: WriteBuffer, user: UserProfile, invite_hash: str
+) -> InviteLink | None:
     logger.info(f"Checking invite {invite_hash} for user {user.tg_id}")
     try:
-        invite = await Invite.get_by_hash(session=session, hash_code=invite_hash)
+        invite = await invites.resolve(invite_hash)
         if not invite or not invite.is_active:
             logger.info(f"Invalid or inactive invite hash: {invite_hash}")
-            return False
-
-        user.source_invite_name = invite.name
-        await session.commit()
+            return None
 
-        await Invite.increment_clicks(session=session, invite_id=invite.id)
+        writes.update(User, user.tg_id, key_column="tg_id", source_invite_name=invite.name)
+        await invites.count_click(invite.id)
 
         logger.info(f"User {user.tg_id} attributed to invite {invite.name}")
-        return True
+        return invite
     except Exception as exception:
         logger.critical(f"Invite attribution error for user {user.tg_id}: {exception}")
-        return False
+        return None
 
 
-async def process_creating_referral(session: AsyncSession, user: User, referrer_id: int) -> bool:
+async def process_creating_referral(
+    session: AsyncSession, user: UserProfile, referrer_id: int
+) -> bool:
     logger.info(f"Assigning user {user.tg_id} as a referred to a referrer user {referrer_id}")
     try:
         referrer = await User.get(session=session, tg_id=referrer_id)
@@ -70,7 +75,7 @@ async def process_creating_referral(session: AsyncSession, user: User, referrer_
 @router.message(Command(NavMain.START))
 async def command_main_menu(
     message: Message,
-    user: User,
+    user: UserProfile,
     state: FSMContext,
     services: ServicesContainer,
     config: Config,
@@ -97,7 +102,16 @@ async def command_main_menu(
                 session=session, user=user, referrer_id=int(command.args)
             )
         else:
-            await process_invite_attribution(session=session, user=user, invite_hash=command.args)
+            invite = await process_invite_attribution(
+                invites=services.invites,
+                writes=services.writes,
+                user=user,
+                invite_hash=command.args,
+            )
+            if invite:
+                # The row is written behind, so cache the attributed profile directly.
+                user = replace(user, source_invite_name=invite.name)
+                await services.users.put(user)
 
     is_admin = await IsAdmin()(user_id=user.tg_id)
     logger.debug(f"🔐 User {user.tg_id} admin status: {is_admin}")
@@ -131,7 +145,7 @@ async def command_main_menu(
 @router.callback_query(F.data == NavMain.MAIN_MENU)
 async def callback_main_menu(
     callback: CallbackQuery,
-    user: User,
+    user: UserProfile,
     services: ServicesContainer,
     state: FSMContext,
     config: Config,
@@ -162,7 +176,7 @@ async def callback_main_menu(
 
 async def redirect_to_main_menu(
     bot: Bot,
-    user: User,
+    user: UserProfile,
     services: ServicesContainer,
     config: Config,
     storage: RedisStorage | None = None,
@@ -4,16 +4,17 @@ from aiogram import F, Router
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery
 
+from app.bot.models import UserProfile
+from app.bot.utils.routing import skip_db_session
 from app.bot.routers.download.handler import callback_download
 from app.bot.utils.navigation import NavMain
-from app.db.models import User
 
 logger = logging.getLogger(__name__)
-router = Router(name=__name__)
+router = skip_db_session(Router(name=__name__))
 
 
 @router.callback_query(F.data.startswith(NavMain.CLOSE_NOTIFICATION))
-async def callback_close_notification(callback: CallbackQuery, user: User) -> None:
+async def callback_close_notification(callback: CallbackQuery, user: UserProfile) -> None:
     logger.debug(f"User {user.tg_id} closed notification: {callback.message.message_id}")
     try:
         await callback.message.delete()
@@ -25,7 +26,7 @@ async def callback_close_notification(callback: CallbackQuery, user: User) -> No
 @router.callback_query(F.data.startswith(NavMain.REDIRECT_TO_DOWNLOAD))
 async def callback_redirect_to_download(
     callback: CallbackQuery,
-    user: User,
+    user: UserProfile,
     state: FSMContext,
 ) -> None:
     logger.debug(f"User {user.tg_id} redirected to download: {callback.message.message_id}")
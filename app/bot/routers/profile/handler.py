@@ -6,11 +6,10 @@ from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery
 from aiogram.utils.i18n import gettext as _
 
-from app.bot.models import ClientData
+from app.bot.models import ClientData, UserProfile
 from app.bot.services import ServicesContainer
 from app.bot.utils.constants import PREVIOUS_CALLBACK_KEY
 from app.bot.utils.navigation import NavProfile
-from app.db.models import User
 
 from .keyboard import buy_subscription_keyboard, profile_keyboard
 
@@ -18,7 +17,7 @@ logger = logging.getLogger(__name__)
 router = Router(name=__name__)
 
 
-async def prepare_message(user: User, client_data: ClientData | None) -> str:
+async def prepare_message(user: UserProfile, client_data: ClientData | None) -> str:
     profile = _("profile:message:main").format(name=user.first_name, id=user.tg_id)
 
     if not client_data:
@@ -45,7 +44,7 @@ async def prepare_message(user: User, client_data: ClientData | None) -> str:
 @router.callback_query(F.data == NavProfile.MAIN)
 async def callback_profile(
     callback: CallbackQuery,
-    user: User,
+    user: UserProfile,
     services: ServicesContainer,
     state: FSMContext,
 ) -> None:
@@ -85,7 +84,7 @@ async def callback_profile(
 @router.callback_query(F.data == NavProfile.SHOW_KEY)
 async def callback_show_key(
     callback: CallbackQuery,
-    user: User,
+    user: UserProfile,
     services: ServicesContainer,
 ) -> None:
     logger.info(f"User {user.tg_id} looked key.")
@@ -116,7 +115,7 @@ async def callback_show_key(
 @router.callback_query(F.data == NavProfile.SHOW_ORDERS)
 async def callback_show_orders(
     callback: CallbackQuery,
-    user: User,
+    user: UserProfile,
     services: ServicesContainer,
 ) -> None:
     """Show user's order history."""
@@ -145,7 +144,7 @@ async def callback_show_orders(
 @router.callback_query(F.data == NavProfile.SHOW_PURCHASED_PRODUCTS)
 async def callback_show_purchased_products(
     callback: CallbackQuery,
-    user: User,
+    user: UserProfile,
     services: ServicesContainer,
 ) -> None:
     """Show user's purchased products."""
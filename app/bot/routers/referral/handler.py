@@ -6,7 +6,7 @@ from aiogram.types import CallbackQuery
 from aiogram.utils.i18n import gettext as _
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.bot.models import ServicesContainer
+from app.bot.models import ServicesContainer, UserProfile
 from app.bot.utils.constants import (
     MAIN_MESSAGE_ID_KEY,
     PREVIOUS_CALLBACK_KEY,
@@ -16,7 +16,7 @@ from app.bot.utils.constants import (
 from app.bot.utils.formatting import format_subscription_period
 from app.bot.utils.navigation import NavMain, NavReferral
 from app.config import Config
-from app.db.models import Referral, ReferrerReward, User
+from app.db.models import Referral, ReferrerReward
 
 from .keyboard import referral_keyboard
 
@@ -26,7 +26,7 @@ router = Router(name=__name__)
 
 async def generate_referral_summary_text(
     session: AsyncSession,
-    user: User,
+    user: UserProfile,
     config: Config,
     bot_username: str,
 ) -> str:
@@ -102,7 +102,7 @@ async def generate_referral_summary_text(
 @router.callback_query(F.data == NavReferral.MAIN)
 async def callback_referral(
     callback: CallbackQuery,
-    user: User,
+    user: UserProfile,
     state: FSMContext,
     session: AsyncSession,
     config: Config,
@@ -127,7 +127,7 @@ async def callback_referral(
 @router.callback_query(F.data == NavReferral.GET_REFERRED_TRIAL)
 async def callback_get_referred_trial(
     callback: CallbackQuery,
-    user: User,
+    user: UserProfile,
     state: FSMContext,
     services: ServicesContainer,
     config: Config,
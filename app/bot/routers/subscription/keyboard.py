@@ -3,14 +3,13 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from app.bot.services import PlanService
+    from app.bot.services import PriceService
 
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from aiogram.utils.i18n import gettext as _
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
 from app.bot.models import SubscriptionData
-from app.bot.models.plan import Plan
 from app.bot.payment_gateways import PaymentGateway
 from app.bot.routers.misc.keyboard import (
     back_button,
@@ -81,19 +80,20 @@ def devices_keyboard(
 
 
 def duration_keyboard(
-    plan_service: PlanService,
+    price_service: PriceService,
     callback_data: SubscriptionData,
     currency: str,
 ) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
-    durations = plan_service.get_durations()
     currency: Currency = Currency.from_code(currency)
 
-    for duration in durations:
+    for duration in price_service.durations:
+        price = price_service.plan_price(callback_data.devices, currency, duration)
+        if price is None:
+            continue
+
         callback_data.duration = duration
         period = format_subscription_period(duration)
-        plan = plan_service.get_plan(callback_data.devices)
-        price = plan.get_price(currency=currency, duration=duration)
         builder.button(
             text=f"{period} | {price} {currency.symbol}",
             callback_data=callback_data,
@@ -133,13 +133,15 @@ def pay_keyboard(pay_url: str, callback_data: SubscriptionData) -> InlineKeyboar
 
 
 def payment_method_keyboard(
-    plan: Plan,
+    price_service: PriceService,
     callback_data: SubscriptionData,
     gateways: list[PaymentGateway],
 ) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     for gateway in gateways:
-        price = plan.get_price(currency=gateway.currency, duration=callback_data.duration)
+        price = price_service.plan_price(
+            callback_data.devices, gateway.currency, callback_data.duration
+        )
         if price is None:
             continue
 
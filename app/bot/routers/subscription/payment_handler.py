@@ -8,12 +8,12 @@ from aiogram.utils.i18n import gettext as _
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.bot.filters.is_dev import IsDev
-from app.bot.models import ServicesContainer, SubscriptionData
+from app.bot.models import ServicesContainer, SubscriptionData, UserProfile
 from app.bot.payment_gateways import GatewayFactory
 from app.bot.utils.constants import TransactionStatus
 from app.bot.utils.formatting import format_subscription_period
 from app.bot.utils.navigation import NavSubscription
-from app.db.models import Transaction, User
+from app.db.models import Transaction
 
 from .keyboard import pay_keyboard
 
@@ -28,7 +28,7 @@ class PaymentState(StatesGroup):
 @router.callback_query(SubscriptionData.filter(F.state.startswith(NavSubscription.PAY)))
 async def callback_payment_method_selected(
     callback: CallbackQuery,
-    user: User,
+    user: UserProfile,
     callback_data: SubscriptionData,
     services: ServicesContainer,
     bot: Bot,
@@ -48,9 +48,12 @@ async def callback_payment_method_selected(
         logger.info(f"User {user.tg_id} selected payment method: {method}")
         logger.info(f"User {user.tg_id} selected {devices} devices and {duration} days.")
         gateway = gateway_factory.get_gateway(method)
-        plan = services.plan.get_plan(devices)
-        price = plan.get_price(currency=gateway.currency, duration=duration)
-        callback_data.price = price
+        price = services.prices.plan_price(devices, gateway.currency, duration)
+        if price is None:
+            raise ValueError(
+                f"No {gateway.currency.code} price for {devices} devices and {duration} days."
+            )
+        callback_data.price = float(price)
 
         pay_url = await gateway.create_payment(callback_data)
 
@@ -78,7 +81,7 @@ async def callback_payment_method_selected(
 
 
 @router.pre_checkout_query()
-async def pre_checkout_handler(pre_checkout_query: PreCheckoutQuery, user: User) -> None:
+async def pre_checkout_handler(pre_checkout_query: PreCheckoutQuery, user: UserProfile) -> None:
     logger.info(f"Pre-checkout query received from user {user.tg_id}")
     if pre_checkout_query.invoice_payload:
         await pre_checkout_query.answer(ok=True)
@@ -89,7 +92,7 @@ async def pre_checkout_handler(pre_checkout_query: PreCheckoutQuery, user: User)
 @router.message(F.successful_payment)
 async def successful_payment(
     message: Message,
-    user: User,
+    user: UserProfile,
     session: AsyncSession,
     bot: Bot,
     gateway_factory: GatewayFactory,
@@ -110,4 +113,5 @@ async def successful_payment(
     )
 
     gateway = gateway_factory.get_gateway(NavSubscription.PAY_TELEGRAM_STARS)
+    await gateway.handle_payment_created(data=data, payment_id=transaction.payment_id)
     await gateway.handle_payment_succeeded(payment_id=transaction.payment_id)
@@ -7,11 +7,11 @@ from aiogram.types import CallbackQuery, Message
 from aiogram.utils.i18n import gettext as _
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.bot.models import ServicesContainer
+from app.bot.models import ServicesContainer, UserProfile
 from app.bot.utils.constants import MAIN_MESSAGE_ID_KEY
 from app.bot.utils.formatting import format_subscription_period
 from app.bot.utils.navigation import NavSubscription
-from app.db.models import Promocode, User
+from app.db.models import Promocode
 
 from .keyboard import promocode_keyboard
 
@@ -24,7 +24,7 @@ class ActivatePromocodeStates(StatesGroup):
 
 
 @router.callback_query(F.data == NavSubscription.PROMOCODE)
-async def callback_promocode(callback: CallbackQuery, user: User, state: FSMContext) -> None:
+async def callback_promocode(callback: CallbackQuery, user: UserProfile, state: FSMContext) -> None:
     logger.info(f"User {user.tg_id} started activating promocode.")
     await state.set_state(ActivatePromocodeStates.promocode_input)
     await callback.message.edit_text(
@@ -36,7 +36,7 @@ async def callback_promocode(callback: CallbackQuery, user: User, state: FSMCont
 @router.message(ActivatePromocodeStates.promocode_input)
 async def handle_promocode_input(
     message: Message,
-    user: User,
+    user: UserProfile,
     session: AsyncSession,
     state: FSMContext,
     services: ServicesContainer,
@@ -47,8 +47,15 @@ async def handle_promocode_input(
     # For digital products, promocodes are always "available" - no server check needed
     logger.info(f"Processing digital product promocode for user {user.tg_id}")
 
-    promocode = await Promocode.get(session=session, code=input_promocode)
-    if promocode and not promocode.is_activated:
+    # Codes the filter has never seen are rejected without touching the database.
+    promocode = None
+    if services.promocodes.might_exist(input_promocode):
+        # Redeeming is a conditional update, so a code can't exceed its uses.
+        promocode = await Promocode.redeem(
+            session=session, code=input_promocode, user_id=user.tg_id
+        )
+
+    if promocode:
         # Use product service to handle promocode activation
         success = await services.product.process_bonus_days(
             user=user, 
@@ -56,11 +63,8 @@ async def handle_promocode_input(
             devices=1  # Default for digital products
         )
         
-        if success:
-            # Mark promocode as activated
-            promocode.is_activated = True
-            promocode.activated_user = user
-            await session.commit()
+        if not success:
+            await Promocode.release(session=session, code=input_promocode, user_id=user.tg_id)
             
         main_message_id = await state.get_value(MAIN_MESSAGE_ID_KEY)
         if success:
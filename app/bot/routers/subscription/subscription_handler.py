@@ -6,11 +6,10 @@ from aiogram.types import CallbackQuery
 from aiogram.utils.i18n import gettext as _
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.bot.models import ClientData, ServicesContainer, SubscriptionData
+from app.bot.models import ClientData, ServicesContainer, SubscriptionData, UserProfile
 from app.bot.payment_gateways import GatewayFactory
 from app.bot.utils.navigation import NavSubscription
 from app.config import Config
-from app.db.models import User
 
 from .keyboard import (
     devices_keyboard,
@@ -52,7 +51,7 @@ async def show_subscription(
 @router.callback_query(F.data == NavSubscription.MAIN)
 async def callback_subscription(
     callback: CallbackQuery,
-    user: User,
+    user: UserProfile,
     state: FSMContext,
     services: ServicesContainer,
 ) -> None:
@@ -79,7 +78,7 @@ async def callback_subscription(
 @router.callback_query(SubscriptionData.filter(F.state == NavSubscription.EXTEND))
 async def callback_subscription_extend(
     callback: CallbackQuery,
-    user: User,
+    user: UserProfile,
     callback_data: SubscriptionData,
     config: Config,
     services: ServicesContainer,
@@ -108,7 +107,7 @@ async def callback_subscription_extend(
     await callback.message.edit_text(
         text=_("subscription:message:duration"),
         reply_markup=duration_keyboard(
-            plan_service=services.plan,
+            price_service=services.prices,
             callback_data=callback_data,
             currency=config.shop.CURRENCY,
         ),
@@ -118,7 +117,7 @@ async def callback_subscription_extend(
 @router.callback_query(SubscriptionData.filter(F.state == NavSubscription.CHANGE))
 async def callback_subscription_change(
     callback: CallbackQuery,
-    user: User,
+    user: UserProfile,
     callback_data: SubscriptionData,
     services: ServicesContainer,
 ) -> None:
@@ -134,7 +133,7 @@ async def callback_subscription_change(
 @router.callback_query(SubscriptionData.filter(F.state == NavSubscription.PROCESS))
 async def callback_subscription_process(
     callback: CallbackQuery,
-    user: User,
+    user: UserProfile,
     session: AsyncSession,
     callback_data: SubscriptionData,
     services: ServicesContainer,
@@ -155,7 +154,7 @@ async def callback_subscription_process(
 @router.callback_query(SubscriptionData.filter(F.state == NavSubscription.DEVICES))
 async def callback_devices_selected(
     callback: CallbackQuery,
-    user: User,
+    user: UserProfile,
     callback_data: SubscriptionData,
     config: Config,
     services: ServicesContainer,
@@ -165,7 +164,7 @@ async def callback_devices_selected(
     await callback.message.edit_text(
         text=_("subscription:message:duration"),
         reply_markup=duration_keyboard(
-            plan_service=services.plan,
+            price_service=services.prices,
             callback_data=callback_data,
             currency=config.shop.CURRENCY,
         ),
@@ -175,7 +174,7 @@ async def callback_devices_selected(
 @router.callback_query(SubscriptionData.filter(F.state == NavSubscription.DURATION))
 async def callback_duration_selected(
     callback: CallbackQuery,
-    user: User,
+    user: UserProfile,
     callback_data: SubscriptionData,
     services: ServicesContainer,
     gateway_factory: GatewayFactory,
@@ -185,7 +184,7 @@ async def callback_duration_selected(
     await callback.message.edit_text(
         text=_("subscription:message:payment_method"),
         reply_markup=payment_method_keyboard(
-            plan=services.plan.get_plan(callback_data.devices),
+            price_service=services.prices,
             callback_data=callback_data,
             gateways=gateway_factory.get_gateways(),
         ),
@@ -5,13 +5,12 @@ from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery
 from aiogram.utils.i18n import gettext as _
 
-from app.bot.models import ServicesContainer
+from app.bot.models import ServicesContainer, UserProfile
 from app.bot.routers.subscription.keyboard import trial_success_keyboard
 from app.bot.utils.constants import MAIN_MESSAGE_ID_KEY, PREVIOUS_CALLBACK_KEY
 from app.bot.utils.formatting import format_subscription_period
 from app.bot.utils.navigation import NavMain, NavSubscription
 from app.config import Config
-from app.db.models import User
 
 logger = logging.getLogger(__name__)
 router = Router(name=__name__)
@@ -20,7 +19,7 @@ router = Router(name=__name__)
 @router.callback_query(F.data == NavSubscription.GET_TRIAL)
 async def callback_get_trial(
     callback: CallbackQuery,
-    user: User,
+    user: UserProfile,
     state: FSMContext,
     services: ServicesContainer,
     config: Config,
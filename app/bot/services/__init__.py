@@ -1,37 +1,86 @@
 from aiogram import Bot
+from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import async_sessionmaker
 
 from app.bot.models import ServicesContainer
 from app.config import Config
 
+from .catalog import DatabaseCatalog
+from .catalog_sync import CatalogSync
+from .delivery import DeliveryQueue
+from .expiry import ExpiryScheduler
+from .invite_tracker import InviteTracker
 from .invite_stats import InviteStatsService
+from .license_key import LicenseKeyService
 from .notification import NotificationService
 from .payment_stats import PaymentStatsService
 from .plan import PlanService
+from .price import PriceService
 from .product import ProductService
+from .promocode_filter import PromocodeFilter
 from .referral import ReferralService
+from .stock import StockService
 from .subscription import SubscriptionService
+from .user_cache import UserCache
+from .write_buffer import WriteBuffer
 
 
 async def initialize(
     config: Config,
     session: async_sessionmaker,
     bot: Bot,
+    redis: Redis | None = None,
+    read_session: async_sessionmaker | None = None,
 ) -> ServicesContainer:
     plan = PlanService()
     product = ProductService(config=config, session_factory=session)
+    prices = PriceService(
+        plan_service=plan, catalog=product.catalog, currency=config.shop.CURRENCY
+    )
     notification = NotificationService(config=config, bot=bot)
+    catalog_sync = None
+    if redis and isinstance(product.catalog, DatabaseCatalog):
+        catalog_sync = CatalogSync(redis=redis, catalog=product.catalog)
+        product.catalog.on_updated.append(catalog_sync.publish)
+    product.delivery.on_completed.append(notification.notify_delivery_completed)
+    product.delivery.on_dead.append(notification.notify_delivery_failed)
+    expiry = ExpiryScheduler(
+        session_factory=session, reminder_days=config.product.EXPIRY_REMINDER_DAYS
+    )
+    expiry.on_reminder.append(notification.notify_subscription_expiring)
     referral = ReferralService(config=config, session_factory=session, product_service=product)
-    subscription = SubscriptionService(config=config, session_factory=session, product_service=product)
-    payment_stats = PaymentStatsService(session_factory=session)
-    invite_stats = InviteStatsService(session_factory=session, payment_stats_service=payment_stats)
+    users = UserCache(redis=redis)
+    writes = WriteBuffer(
+        session_factory=session, flush_interval=config.database.WRITE_BUFFER_INTERVAL / 1000
+    )
+    promocodes = PromocodeFilter(session_factory=session, redis=redis)
+    invites = InviteTracker(session_factory=session, writes=writes, redis=redis)
+    subscription = SubscriptionService(
+        config=config, session_factory=session, product_service=product, user_cache=users
+    )
+    # Analytics read from the replica session factory so reports cannot starve user traffic.
+    read_session = read_session or session
+    payment_stats = PaymentStatsService(session_factory=read_session)
+    invite_stats = InviteStatsService(
+        session_factory=read_session, payment_stats_service=payment_stats
+    )
 
     return ServicesContainer(
         plan=plan,
+        prices=prices,
         product=product,
         notification=notification,
         referral=referral,
         subscription=subscription,
+        users=users,
+        writes=writes,
+        promocodes=promocodes,
+        invites=invites,
+        stock=product.stock,
+        license_keys=product.license_keys,
+        delivery=product.delivery,
+        expiry=expiry,
+        catalog_sync=catalog_sync,
         payment_stats=payment_stats,
         invite_stats=invite_stats,
     )
@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Iterator
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.bot.models.catalog import CatalogSnapshot
+from app.db.models import Product
+
+from .catalog_binary import compile_snapshot, load_snapshot
+from .search import ProductSearchIndex
+
+logger = logging.getLogger(__name__)
+
+IMPORT_BATCH_SIZE = 100
+READ_CHUNK_SIZE = 64 * 1024
+_PRODUCTS_ARRAY = re.compile(r'"products"\s*:\s*\[')
+
+
+class CatalogCache:
+    """In-memory catalog snapshot with a search index, shared by all catalog sources."""
+
+    def __init__(self) -> None:
+        self._snapshot = CatalogSnapshot.empty()
+        self.search_index = ProductSearchIndex()
+
+    @property
+    def snapshot(self) -> CatalogSnapshot:
+        return self._snapshot
+
+    def get_snapshot(self) -> CatalogSnapshot:
+        return self._snapshot
+
+    def search(self, query: str, limit: int | None = None) -> list[dict]:
+        snapshot = self.get_snapshot()
+        self.search_index.sync(snapshot)
+        return [snapshot.get(product_id) for product_id in self.search_index.search(query, limit)]
+
+
+class ProductCatalog(CatalogCache):
+    """
+    Process-wide, hot-reloading snapshot of the products catalog file.
+
+    The file is parsed once and kept in memory. Every access performs a cheap
+    `stat` call and only re-reads the file when its mtime or size changed; the
+    content hash then decides whether a new snapshot has to be parsed. Swapping
+    the snapshot is a single reference assignment, so readers always see either
+    the old or the new catalog, never a partially loaded one.
+    """
+
+    _instances: dict[Path, ProductCatalog] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, path: Path | str) -> None:
+        super().__init__()
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_path(cls, path: Path | str) -> ProductCatalog:
+        key = Path(path).resolve()
+        with cls._instances_lock:
+            catalog = cls._instances.get(key)
+            if catalog is None:
+                catalog = cls(key)
+                cls._instances[key] = catalog
+        return catalog
+
+    def get_snapshot(self) -> CatalogSnapshot:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            if self._snapshot.size != -1:
+                logger.warning(f"Products catalog not found at {self.path}")
+                self._snapshot = replace(CatalogSnapshot.empty(), size=-1)
+            return self._snapshot
+
+        current = self._snapshot
+        if (stat.st_mtime_ns, stat.st_size) == (current.mtime_ns, current.size):
+            return current
+
+        return self.reload(stat)
+
+    def reload(self, stat: os.stat_result | None = None) -> CatalogSnapshot:
+        with self._lock:
+            try:
+                stat = stat or os.stat(self.path)
+                raw = self.path.read_bytes()
+            except FileNotFoundError:
+                logger.warning(f"Products catalog not found at {self.path}")
+                self._snapshot = replace(CatalogSnapshot.empty(), size=-1)
+                return self._snapshot
+
+            current = self._snapshot
+            version = hashlib.sha256(raw).hexdigest()
+
+            if version == current.version:
+                self._snapshot = current.with_stat(stat.st_mtime_ns, stat.st_size)
+                return self._snapshot
+
+            try:
+                catalog = json.loads(raw)
+                products = tuple(catalog.get("products", []))
+            except (ValueError, AttributeError) as exception:
+                logger.error(f"Failed to load products catalog: {exception}")
+                # Keep serving the last good snapshot until the file changes again.
+                self._snapshot = current.with_stat(stat.st_mtime_ns, stat.st_size)
+                return self._snapshot
+
+            self._snapshot = CatalogSnapshot.build(
+                version=version,
+                products=products,
+                mtime_ns=stat.st_mtime_ns,
+                size=stat.st_size,
+            )
+            logger.info(f"Loaded {len(products)} products from catalog (version {version[:12]}).")
+            return self._snapshot
+
+
+def iter_catalog_products(path: Path, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[dict[str, Any]]:
+    """
+    Stream the entries of the `products` array of a catalog file.
+
+    Products are decoded one at a time from a rolling buffer, so memory use is bounded
+    by the largest product rather than the whole file.
+    """
+    decoder = json.JSONDecoder()
+
+    with open(path, encoding="utf-8") as file:
+        buffer, position, eof = "", 0, False
+
+        def read_more() -> None:
+            nonlocal buffer, position, eof
+            chunk = file.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+
+        while True:
+            match = _PRODUCTS_ARRAY.search(buffer, position)
+            if match:
+                position = match.end()
+                break
+            if eof:
+                return
+            # Keep a tail in case the key is split between chunks.
+            position = max(position, len(buffer) - 32)
+            read_more()
+
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position >= len(buffer):
+                if eof:
+                    raise ValueError("Unexpected end of catalog file")
+                read_more()
+                continue
+            if buffer[position] == "]":
+                return
+
+            try:
+                item, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # The product is split between chunks.
+                read_more()
+                continue
+            yield item
+
+
+@dataclass
+class ProductImportResult:
+    added: int = 0
+    updated: int = 0
+    skipped: int = 0
+
+
+class DatabaseCatalog(CatalogCache):
+    """
+    Catalog snapshot backed by the `products` table.
+
+    Readers get the in-memory snapshot without touching the database. `refresh`
+    probes the table with a single aggregate query and only rebuilds the snapshot
+    when rows were added, removed or changed. Rebuilt snapshots are compiled to
+    `snapshot_file` and served from the memory-mapped file, so a restart against an
+    unchanged table starts from the file without loading any rows.
+    """
+
+    def __init__(
+        self, session_factory: async_sessionmaker, snapshot_file: Path | str | None = None
+    ) -> None:
+        super().__init__()
+        self.session_factory = session_factory
+        self.snapshot_file = Path(snapshot_file) if snapshot_file else None
+        self.on_updated: list[Callable[[CatalogSnapshot], Awaitable[None]]] = []
+        self._state: tuple[int, datetime | None] | None = None
+
+    async def refresh(self, force: bool = False) -> CatalogSnapshot:
+        async with self.session_factory() as session:
+            state = await Product.get_state(session)
+            if state == self._state and not force:
+                return self._snapshot
+            products = await Product.get_all(session)
+
+        items = tuple(product.to_catalog() for product in products)
+        raw = json.dumps(items, sort_keys=True, default=str).encode()
+        version = hashlib.sha256(raw).hexdigest()
+        self._state = state
+
+        if version != self._snapshot.version:
+            self._snapshot = CatalogSnapshot.build(version=version, products=items, size=len(raw))
+            logger.info(f"Loaded {len(items)} products from database (version {version[:12]}).")
+
+        if self.snapshot_file:
+            self._snapshot = self._compile(self._snapshot, state)
+        return self._snapshot
+
+    def _compile(
+        self, snapshot: CatalogSnapshot, state: tuple[int, datetime | None]
+    ) -> CatalogSnapshot:
+        try:
+            compile_snapshot(snapshot, self.snapshot_file, state)
+            mapped = load_snapshot(self.snapshot_file)
+        except OSError as exception:
+            logger.error(f"Failed to write catalog snapshot {self.snapshot_file}: {exception}")
+            return snapshot
+        return mapped[0] if mapped and mapped[0].version == snapshot.version else snapshot
+
+    async def import_file(
+        self, path: Path | str, batch_size: int = IMPORT_BATCH_SIZE
+    ) -> ProductImportResult:
+        """Upsert products from a catalog file in a single transaction."""
+        result = ProductImportResult()
+        updated_at = datetime.now(timezone.utc)
+        batch: list[dict[str, Any]] = []
+
+        async with self.session_factory() as session:
+            try:
+                for position, item in enumerate(iter_catalog_products(Path(path))):
+                    if not isinstance(item, dict) or "id" not in item:
+                        result.skipped += 1
+                        continue
+                    batch.append(Product.values_from_catalog(item, position))
+                    if len(batch) >= batch_size:
+                        await self._upsert(session, batch, updated_at, result)
+                        batch = []
+
+                if batch:
+                    await self._upsert(session, batch, updated_at, result)
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+
+        logger.info(
+            f"Imported products from {path}: {result.added} added, "
+            f"{result.updated} updated, {result.skipped} skipped."
+        )
+        snapshot = await self.refresh()
+        for listener in self.on_updated:
+            try:
+                await listener(snapshot)
+            except Exception as exception:
+                logger.error(f"Catalog update listener failed: {exception}")
+        return result
+
+    @staticmethod
+    async def _upsert(
+        session, batch: list[dict[str, Any]], updated_at: datetime, result: ProductImportResult
+    ) -> None:
+        added, updated = await Product.upsert_batch(session, batch, updated_at)
+        result.added += added
+        result.updated += updated
+
+    async def initialize(self, seed_file: Path | str | None = None) -> CatalogSnapshot:
+        """
+        Load the catalog, starting from the compiled snapshot when there is one.
+
+        An empty table is seeded from the catalog file once.
+        """
+        if self.snapshot_file and (mapped := load_snapshot(self.snapshot_file)):
+            self._snapshot, self._state = mapped
+
+        async with self.session_factory() as session:
+            count, _ = await Product.get_state(session)
+
+        if not count and seed_file and Path(seed_file).exists():
+            try:
+                await self.import_file(seed_file)
+            except ValueError as exception:
+                logger.error(f"Failed to seed products from {seed_file}: {exception}")
+
+        return await self.refresh()
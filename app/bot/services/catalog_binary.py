@@ -0,0 +1,201 @@
+"""
+Compact binary catalog snapshots.
+
+Layout (little endian)::
+
+    header   magic "3XCS" | format | count | version (sha256) | state | offsets
+    records  `count` fixed-size records: id, category and payload references,
+             stock and flags
+    strings  UTF-8 string table: ids, categories and each product's JSON payload
+
+Files are written once per catalog version and read through `mmap`, so every worker
+process shares the same page cache instead of holding its own parsed copy. Product
+payloads are only decoded when a product is first accessed.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import mmap
+import os
+import struct
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Iterator, Sequence, overload
+
+from app.bot.models.catalog import CatalogSnapshot
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"3XCS"
+FORMAT_VERSION = 1
+
+# magic, format, count, version digest, state count, state timestamp (us, -1 = none),
+# records offset, strings offset
+HEADER = struct.Struct("<4sHI32sqqQQ")
+# id offset/length, category offset/length, payload offset/length, stock, is_active
+RECORD = struct.Struct("<QHQHQIiB")
+
+CatalogState = tuple[int, datetime | None]
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+class MappedProducts(Sequence[dict[str, Any]]):
+    """Read-only product sequence over a memory-mapped snapshot, decoded on access."""
+
+    def __init__(self, buffer: mmap.mmap, count: int, records: int, strings: int) -> None:
+        self._buffer = buffer
+        self._count = count
+        self._records = records
+        self._strings = strings
+        self._decoded: list[dict[str, Any] | None] = [None] * count
+
+    def __len__(self) -> int:
+        return self._count
+
+    @overload
+    def __getitem__(self, index: int) -> dict[str, Any]: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[dict[str, Any]]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("product index out of range")
+
+        product = self._decoded[index]
+        if product is None:
+            record = self._record(index)
+            product = json.loads(self._string(record[4], record[5]))
+            self._decoded[index] = product
+        return product
+
+    def _record(self, index: int) -> tuple:
+        return RECORD.unpack_from(self._buffer, self._records + index * RECORD.size)
+
+    def _string(self, offset: int, length: int) -> str:
+        start = self._strings + offset
+        return self._buffer[start : start + length].decode("utf-8")
+
+    def ids(self) -> Iterator[str]:
+        for index in range(self._count):
+            record = self._record(index)
+            yield self._string(record[0], record[1])
+
+    def categories(self) -> Iterator[str]:
+        for index in range(self._count):
+            record = self._record(index)
+            yield self._string(record[2], record[3])
+
+    @property
+    def materialized(self) -> int:
+        return sum(product is not None for product in self._decoded)
+
+
+def compile_snapshot(
+    snapshot: CatalogSnapshot, path: Path | str, state: CatalogState | None = None
+) -> Path:
+    """Write the snapshot to `path` atomically and return the path."""
+    path = Path(path)
+    strings = bytearray()
+    records = bytearray()
+
+    def add_string(value: str) -> tuple[int, int]:
+        data = value.encode("utf-8")
+        offset = len(strings)
+        strings.extend(data)
+        return offset, len(data)
+
+    for product in snapshot.products:
+        stock = product.get("stock")
+        records.extend(
+            RECORD.pack(
+                *add_string(str(product.get("id"))),
+                *add_string(str(product.get("category", "")).lower()),
+                *add_string(json.dumps(product, ensure_ascii=False, separators=(",", ":"))),
+                stock if isinstance(stock, int) and stock >= 0 else -1,
+                1 if product.get("is_active", True) else 0,
+            )
+        )
+
+    count, updated_at = state or (-1, None)
+    header = HEADER.pack(
+        MAGIC,
+        FORMAT_VERSION,
+        len(snapshot.products),
+        bytes.fromhex(snapshot.version) if snapshot.version else bytes(32),
+        count,
+        _to_micros(updated_at),
+        HEADER.size,
+        HEADER.size + len(records),
+    )
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(temporary, "wb") as file:
+        file.write(header)
+        file.write(records)
+        file.write(strings)
+    os.replace(temporary, path)
+
+    logger.debug(f"Compiled catalog snapshot {snapshot.version[:12]} to {path}.")
+    return path
+
+
+def load_snapshot(path: Path | str) -> tuple[CatalogSnapshot, CatalogState | None] | None:
+    """Map a compiled snapshot. Returns None when missing, corrupt or of another format."""
+    path = Path(path)
+    try:
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size < HEADER.size:
+                raise ValueError("file too small")
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as exception:
+        logger.warning(f"Failed to open catalog snapshot {path}: {exception}")
+        return None
+
+    magic, format_version, count, digest, state_count, state_micros, records, strings = (
+        HEADER.unpack_from(buffer)
+    )
+    if (
+        magic != MAGIC
+        or format_version != FORMAT_VERSION
+        or strings != records + count * RECORD.size
+        or strings > len(buffer)
+    ):
+        logger.warning(f"Ignoring incompatible catalog snapshot {path}.")
+        buffer.close()
+        return None
+
+    version = digest.hex() if any(digest) else ""
+    snapshot = CatalogSnapshot.build(
+        version=version,
+        products=MappedProducts(buffer, count, records, strings),
+        size=len(buffer),
+    )
+    state = (state_count, _from_micros(state_micros)) if state_count >= 0 else None
+    logger.info(f"Mapped {count} products from catalog snapshot (version {version[:12]}).")
+    return snapshot, state
+
+
+def _to_micros(value: datetime | None) -> int:
+    if value is None:
+        return -1
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+
+def _from_micros(value: int) -> datetime | None:
+    if value < 0:
+        return None
+    # Stored state is compared to naive UTC database timestamps.
+    return _EPOCH + timedelta(microseconds=value)
@@ -0,0 +1,105 @@
+import asyncio
+import logging
+
+from redis.asyncio import Redis
+
+from app.bot.models.catalog import CatalogSnapshot
+
+from .catalog import DatabaseCatalog
+
+logger = logging.getLogger(__name__)
+
+CATALOG_VERSION_KEY = "catalog:version"
+CATALOG_CHANNEL = "catalog:changes"
+RECONNECT_DELAY = 5
+
+
+class CatalogSync:
+    """
+    Propagates catalog changes between bot replicas over Redis.
+
+    A replica that writes to the products table bumps a version counter in Redis
+    and publishes it on the invalidation channel. Every replica, including the
+    writer, listens on the channel and refreshes its catalog snapshot as soon as a
+    newer version arrives. After a lost connection the catalog is refreshed once,
+    since messages published in the meantime are gone.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        catalog: DatabaseCatalog,
+        channel: str = CATALOG_CHANNEL,
+        version_key: str = CATALOG_VERSION_KEY,
+    ) -> None:
+        self.redis = redis
+        self.catalog = catalog
+        self.channel = channel
+        self.version_key = version_key
+        self.version = 0
+        self._task: asyncio.Task | None = None
+        self._subscribed = asyncio.Event()
+        logger.info("Catalog Sync initialized")
+
+    async def publish(self, snapshot: CatalogSnapshot | None = None) -> int:
+        """Announce a catalog change to all replicas. Usable as a catalog listener."""
+        version = await self.redis.incr(self.version_key)
+        await self.redis.publish(self.channel, version)
+        logger.info(f"Published catalog version {version}.")
+        return version
+
+    async def handle(self, data: bytes | str | int) -> bool:
+        """Refresh the catalog for a newer announced version."""
+        try:
+            version = int(data)
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring malformed catalog change message: {data!r}")
+            return False
+
+        if version <= self.version:
+            return False
+
+        self.version = version
+        try:
+            await self.catalog.refresh()
+        except Exception as exception:
+            logger.error(f"Failed to refresh catalog for version {version}: {exception}")
+            return False
+
+        logger.debug(f"Catalog refreshed for version {version}.")
+        return True
+
+    async def start(self) -> None:
+        self.version = int(await self.redis.get(self.version_key) or 0)
+        self._task = asyncio.create_task(self._listen(), name="catalog-sync")
+        await self._subscribed.wait()
+        logger.info(f"Catalog sync listening on {self.channel} from version {self.version}.")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _listen(self) -> None:
+        reconnecting = False
+        while True:
+            try:
+                async with self.redis.pubsub(ignore_subscribe_messages=True) as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    self._subscribed.set()
+                    if reconnecting:
+                        await self.catalog.refresh()
+                        reconnecting = False
+
+                    async for message in pubsub.listen():
+                        if message.get("type") == "message":
+                            await self.handle(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as exception:
+                logger.error(f"Catalog sync connection lost: {exception}")
+                # Unblock start() even if the first subscription failed.
+                self._subscribed.set()
+                reconnecting = True
+                await asyncio.sleep(RECONNECT_DELAY)
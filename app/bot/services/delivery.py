@@ -0,0 +1,203 @@
+import asyncio
+import logging
+import random
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.bot.utils.constants import DeliveryStatus
+from app.bot.utils.time import as_utc
+from app.db.models import DeliveryJob
+
+logger = logging.getLogger(__name__)
+
+DeliveryHandler = Callable[[DeliveryJob], Awaitable[dict[str, Any]]]
+DeliveryListener = Callable[[DeliveryJob, dict[str, Any]], Awaitable[None]]
+
+
+@dataclass
+class DeliveryQueueStats:
+    pending: int
+    processing: int
+    completed: int
+    dead: int
+    oldest_pending_seconds: float
+    average_latency_seconds: float | None
+
+
+class DeliveryQueue:
+    """
+    Persistent product delivery queue processed by a bounded pool of async workers.
+
+    Jobs are stored in the database before anything is delivered, so a crash or
+    restart never loses a paid order. Workers claim due jobs with an atomic UPDATE,
+    retry failures with exponential backoff and move jobs that run out of attempts
+    to the dead-letter state.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        handler: DeliveryHandler,
+        workers: int = 4,
+        max_attempts: int = 5,
+        base_delay: float = 5.0,
+        max_delay: float = 600.0,
+        poll_interval: float = 5.0,
+        stale_after: int = 3600,
+    ) -> None:
+        self.session_factory = session_factory
+        self.handler = handler
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.stale_after = timedelta(seconds=stale_after)
+        self.on_completed: list[DeliveryListener] = []
+        self.on_dead: list[DeliveryListener] = []
+        self._tasks: list[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self._latencies: deque[float] = deque(maxlen=100)
+
+    async def enqueue(
+        self, tg_id: int, payload: dict[str, Any], transaction_id: int | None = None
+    ) -> DeliveryJob | None:
+        async with self.session_factory() as session:
+            job = await DeliveryJob.create(
+                session,
+                tg_id=tg_id,
+                payload=payload,
+                transaction_id=transaction_id,
+                next_attempt_at=datetime.now(timezone.utc),
+            )
+
+        if job:
+            logger.info(f"Delivery job {job.id} queued for user {tg_id}.")
+            self._wakeup.set()
+        return job
+
+    async def start(self) -> None:
+        async with self.session_factory() as session:
+            requeued = await DeliveryJob.requeue_stale(
+                session, datetime.now(timezone.utc) - self.stale_after
+            )
+        if requeued:
+            logger.warning(f"Requeued {requeued} stale delivery jobs.")
+
+        self._tasks = [
+            asyncio.create_task(self._worker(number), name=f"delivery-worker-{number}")
+            for number in range(self.workers)
+        ]
+        logger.info(f"Delivery queue started with {self.workers} workers.")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("Delivery queue stopped.")
+
+    async def _worker(self, number: int) -> None:
+        while True:
+            try:
+                if await self.process_next():
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as exception:
+                logger.error(f"Delivery worker {number} error: {exception}")
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def process_next(self) -> bool:
+        """Claim and run one due job. Returns False when nothing is due."""
+        async with self.session_factory() as session:
+            job = await DeliveryJob.claim_next(session, datetime.now(timezone.utc))
+
+        if not job:
+            return False
+
+        try:
+            result = await self.handler(job)
+        except Exception as exception:
+            await self._fail(job, exception)
+            return True
+
+        now = datetime.now(timezone.utc)
+        async with self.session_factory() as session:
+            await DeliveryJob.finish(
+                session,
+                job.id,
+                status=DeliveryStatus.COMPLETED,
+                result=result,
+                completed_at=now,
+                last_error=None,
+            )
+
+        self._latencies.append((now - as_utc(job.created_at)).total_seconds())
+        logger.info(f"Delivery job {job.id} completed on attempt {job.attempts}.")
+        await self._notify(self.on_completed, job, result)
+        return True
+
+    async def _fail(self, job: DeliveryJob, exception: Exception) -> None:
+        error = str(exception)[:512]
+
+        if job.attempts >= self.max_attempts:
+            async with self.session_factory() as session:
+                await DeliveryJob.finish(
+                    session, job.id, status=DeliveryStatus.DEAD, last_error=error
+                )
+            logger.error(f"Delivery job {job.id} moved to dead letters after {job.attempts} attempts: {error}")
+            await self._notify(self.on_dead, job, {"error": error})
+            return
+
+        delay = self.backoff(job.attempts)
+        async with self.session_factory() as session:
+            await DeliveryJob.finish(
+                session,
+                job.id,
+                status=DeliveryStatus.PENDING,
+                next_attempt_at=datetime.now(timezone.utc) + timedelta(seconds=delay),
+                last_error=error,
+            )
+        logger.warning(
+            f"Delivery job {job.id} attempt {job.attempts} failed, retrying in {delay:.0f}s: {error}"
+        )
+
+    def backoff(self, attempts: int) -> float:
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+        return delay * random.uniform(0.8, 1.2)
+
+    @staticmethod
+    async def _notify(
+        listeners: list[DeliveryListener], job: DeliveryJob, data: dict[str, Any]
+    ) -> None:
+        for listener in listeners:
+            try:
+                await listener(job, data)
+            except Exception as exception:
+                logger.error(f"Delivery listener failed for job {job.id}: {exception}")
+
+    async def stats(self) -> DeliveryQueueStats:
+        async with self.session_factory() as session:
+            counts = await DeliveryJob.count_by_status(session)
+            oldest = await DeliveryJob.oldest_pending(session)
+
+        now = datetime.now(timezone.utc)
+        latencies = self._latencies
+        return DeliveryQueueStats(
+            pending=counts.get(DeliveryStatus.PENDING, 0),
+            processing=counts.get(DeliveryStatus.PROCESSING, 0),
+            completed=counts.get(DeliveryStatus.COMPLETED, 0),
+            dead=counts.get(DeliveryStatus.DEAD, 0),
+            oldest_pending_seconds=(now - as_utc(oldest)).total_seconds() if oldest else 0.0,
+            average_latency_seconds=sum(latencies) / len(latencies) if latencies else None,
+        )
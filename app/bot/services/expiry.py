@@ -0,0 +1,225 @@
+import asyncio
+import heapq
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Iterable
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.bot.utils.time import as_utc
+from app.db.models import ProductSubscription
+
+logger = logging.getLogger(__name__)
+
+# Reminder windows use days > 0, the expiry itself is scheduled as window 0.
+EXPIRY = 0
+MIN_SLEEP = 1.0
+
+ReminderListener = Callable[[ProductSubscription, int, str], Awaitable[None]]
+
+
+@dataclass(order=True, frozen=True)
+class ExpiryEvent:
+    fire_at: datetime
+    subscription_id: int
+    days: int
+    expire_date: datetime = field(compare=False)
+
+
+@dataclass
+class ExpiryRunResult:
+    reminded: int = 0
+    expired: int = 0
+    stale: int = 0
+
+
+class ExpiryScheduler:
+    """
+    Fires subscription expiry reminders and marks expired subscriptions.
+
+    Upcoming events are kept in a min-heap ordered by fire time and the loop sleeps
+    until the earliest one is due, so the work done scales with due events rather
+    than with the number of subscriptions. The heap only holds subscriptions expiring
+    within the rehydration window; it is refilled from the `expired_at, expire_date`
+    index at startup and every `rescan_interval`. Events are checked against the
+    database when they fire, so extended subscriptions drop their old events.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        reminder_days: Iterable[int] = (3, 1),
+        rescan_interval: float = 900.0,
+        batch_size: int = 100,
+    ) -> None:
+        self.session_factory = session_factory
+        self.reminder_days = sorted({days for days in reminder_days if days > 0}, reverse=True)
+        self.rescan_interval = timedelta(seconds=rescan_interval)
+        self.batch_size = batch_size
+        self.on_reminder: list[ReminderListener] = []
+        self._heap: list[ExpiryEvent] = []
+        self._scheduled: dict[tuple[int, int], datetime] = {}
+        self._next_rescan: datetime | None = None
+        self._task: asyncio.Task | None = None
+        self._wakeup = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    @property
+    def window(self) -> timedelta:
+        """How far ahead subscriptions are loaded into the heap."""
+        return timedelta(days=max(self.reminder_days, default=0)) + self.rescan_interval
+
+    def schedule(self, subscription: ProductSubscription, now: datetime | None = None) -> int:
+        """Queue the pending events of a subscription. Returns the number queued."""
+        now = now or datetime.now(timezone.utc)
+        expire_date = as_utc(subscription.expire_date)
+        start_date = as_utc(subscription.start_date)
+        reminded = subscription.reminded_days
+
+        events = [(expire_date, EXPIRY)]
+        due_reminder = None
+        for days in self.reminder_days if expire_date > now else ():
+            fire_at = expire_date - timedelta(days=days)
+            # Short subscriptions skip windows wider than themselves.
+            if fire_at <= start_date or (reminded is not None and reminded <= days):
+                continue
+            if fire_at <= now:
+                # After downtime only the narrowest missed window is worth sending.
+                due_reminder = (fire_at, days)
+                continue
+            events.append((fire_at, days))
+        if due_reminder:
+            events.append(due_reminder)
+
+        queued = 0
+        for fire_at, days in events:
+            key = (subscription.id, days)
+            if self._scheduled.get(key) == expire_date:
+                continue
+            self._scheduled[key] = expire_date
+            heapq.heappush(self._heap, ExpiryEvent(fire_at, subscription.id, days, expire_date))
+            queued += 1
+
+        if queued:
+            self._wakeup.set()
+        return queued
+
+    async def rehydrate(self, now: datetime | None = None) -> int:
+        now = now or datetime.now(timezone.utc)
+        async with self.session_factory() as session:
+            subscriptions = await ProductSubscription.get_expiring(session, now + self.window)
+
+        queued = sum(self.schedule(subscription, now) for subscription in subscriptions)
+        self._next_rescan = now + self.rescan_interval
+        logger.debug(f"Expiry scheduler loaded {queued} events, {len(self._heap)} pending.")
+        return queued
+
+    async def run_due(self, now: datetime | None = None) -> ExpiryRunResult:
+        """Process one batch of due events."""
+        now = now or datetime.now(timezone.utc)
+        result = ExpiryRunResult()
+        due: list[ExpiryEvent] = []
+        while self._heap and self._heap[0].fire_at <= now and len(due) < self.batch_size:
+            event = heapq.heappop(self._heap)
+            key = (event.subscription_id, event.days)
+            if self._scheduled.get(key) == event.expire_date:
+                del self._scheduled[key]
+            due.append(event)
+
+        if not due:
+            return result
+
+        async with self.session_factory() as session:
+            rows = await ProductSubscription.get_with_locale(
+                session, list({event.subscription_id for event in due})
+            )
+        current = {subscription.id: (subscription, locale) for subscription, locale in rows}
+
+        expired: list[int] = []
+        reminders: dict[int, list[tuple[ProductSubscription, str]]] = {}
+        for event in due:
+            subscription, locale = current.get(event.subscription_id, (None, None))
+            if (
+                subscription is None
+                or subscription.expired_at is not None
+                or as_utc(subscription.expire_date) != event.expire_date
+            ):
+                result.stale += 1
+            elif event.days == EXPIRY:
+                expired.append(subscription.id)
+            elif subscription.reminded_days is None or subscription.reminded_days > event.days:
+                reminders.setdefault(event.days, []).append((subscription, locale))
+            else:
+                result.stale += 1
+
+        for days, batch in reminders.items():
+            for subscription, locale in batch:
+                await self._notify(subscription, days, locale)
+            async with self.session_factory() as session:
+                result.reminded += await ProductSubscription.mark_reminded(
+                    session, [subscription.id for subscription, _ in batch], days
+                )
+
+        if expired:
+            async with self.session_factory() as session:
+                result.expired = await ProductSubscription.mark_expired(session, expired, now)
+
+        logger.info(
+            f"Expiry scheduler: {result.reminded} reminded, {result.expired} expired, "
+            f"{result.stale} stale events dropped."
+        )
+        return result
+
+    async def _notify(self, subscription: ProductSubscription, days: int, locale: str) -> None:
+        for listener in self.on_reminder:
+            try:
+                await listener(subscription, days, locale)
+            except Exception as exception:
+                logger.error(
+                    f"Expiry reminder listener failed for subscription {subscription.id}: "
+                    f"{exception}"
+                )
+
+    async def start(self) -> None:
+        await self.rehydrate()
+        self._task = asyncio.create_task(self._run(), name="expiry-scheduler")
+        logger.info(f"Expiry scheduler started with {len(self._heap)} pending events.")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        logger.info("Expiry scheduler stopped.")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                now = datetime.now(timezone.utc)
+                if self._next_rescan is None or now >= self._next_rescan:
+                    await self.rehydrate(now)
+                while self._is_due():
+                    await self.run_due()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exception:
+                logger.error(f"Expiry scheduler error: {exception}")
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._sleep_seconds())
+            except asyncio.TimeoutError:
+                pass
+
+    def _is_due(self) -> bool:
+        return bool(self._heap) and self._heap[0].fire_at <= datetime.now(timezone.utc)
+
+    def _sleep_seconds(self) -> float:
+        now = datetime.now(timezone.utc)
+        wake_at = self._next_rescan or now
+        if self._heap:
+            wake_at = min(wake_at, self._heap[0].fire_at)
+        return max((wake_at - now).total_seconds(), MIN_SLEEP)
@@ -0,0 +1,125 @@
+import asyncio
+import logging
+
+from cachetools import TTLCache
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.bot.models.invite_link import InviteLink
+from app.db.models import Invite
+
+from .write_buffer import WriteBuffer
+
+logger = logging.getLogger(__name__)
+
+INVITE_CLICKS_KEY = "invite:clicks"
+INVITE_CLICKS_LOCK_KEY = "invite:clicks:lock"
+INVITE_CACHE_TTL = 60
+
+
+class InviteTracker:
+    """
+    Resolves invite links and counts their clicks off the database hot path.
+
+    Hash lookups, including misses, are cached in-process for `cache_ttl` seconds. Clicks
+    are counted with `HINCRBY` in Redis, shared by all replicas, and added to the
+    `invites` table every `flush_interval` seconds by whichever replica holds the flush
+    lock. Without Redis, clicks go through the write buffer instead.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        writes: WriteBuffer,
+        redis: Redis | None = None,
+        flush_interval: float = 10,
+        cache_ttl: int = INVITE_CACHE_TTL,
+        maxsize: int = 1000,
+    ) -> None:
+        self.session_factory = session_factory
+        self.writes = writes
+        self.redis = redis
+        self.flush_interval = flush_interval
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=cache_ttl)
+        self._task: asyncio.Task | None = None
+
+    async def resolve(self, hash_code: str) -> InviteLink | None:
+        if hash_code in self._cache:
+            return self._cache[hash_code]
+
+        async with self.session_factory() as session:
+            invite = await Invite.get_by_hash(session=session, hash_code=hash_code)
+
+        link = InviteLink.from_invite(invite) if invite else None
+        self._cache[hash_code] = link
+        return link
+
+    def invalidate(self, hash_code: str) -> None:
+        """Drops a cached lookup; other replicas pick the change up within the cache TTL."""
+        self._cache.pop(hash_code, None)
+
+    async def count_click(self, invite_id: int) -> None:
+        if self.redis:
+            try:
+                await self.redis.hincrby(INVITE_CLICKS_KEY, str(invite_id), 1)
+                return
+            except Exception as exception:
+                logger.warning(f"Failed to count click for invite {invite_id}: {exception}")
+        self.writes.increment(Invite, invite_id, clicks=1)
+
+    async def flush(self) -> int:
+        """Add clicks counted in Redis to the database. Returns the number of invites."""
+        if not self.redis:
+            return 0
+        if not await self.redis.set(
+            INVITE_CLICKS_LOCK_KEY, 1, nx=True, ex=max(int(self.flush_interval * 3), 30)
+        ):
+            return 0
+
+        try:
+            counted = await self.redis.hgetall(INVITE_CLICKS_KEY)
+            clicks = {int(key): int(value) for key, value in counted.items() if int(value)}
+            if not clicks:
+                return 0
+
+            async with self.session_factory() as session:
+                await Invite.add_clicks(session=session, clicks=clicks)
+
+            # Subtract what was written rather than deleting: clicks counted meanwhile stay.
+            async with self.redis.pipeline(transaction=True) as pipeline:
+                for invite_id, count in clicks.items():
+                    pipeline.hincrby(INVITE_CLICKS_KEY, str(invite_id), -count)
+                await pipeline.execute()
+        finally:
+            await self.redis.delete(INVITE_CLICKS_LOCK_KEY)
+
+        logger.debug(f"Flushed clicks for {len(clicks)} invites.")
+        return len(clicks)
+
+    async def start(self) -> None:
+        if not self.redis:
+            return
+        self._task = asyncio.create_task(self._run(), name="invite-clicks")
+        logger.info(f"Invite tracker started, flushing clicks every {self.flush_interval}s.")
+
+    async def stop(self) -> None:
+        if not self._task:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        try:
+            await self.flush()
+        except Exception as exception:
+            logger.error(f"Failed to flush invite clicks on shutdown: {exception}")
+        logger.info("Invite tracker stopped.")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exception:
+                logger.error(f"Invite clicks flush error: {exception}")
@@ -0,0 +1,108 @@
+import csv
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.db.models import LicenseKey
+
+logger = logging.getLogger(__name__)
+
+IMPORT_BATCH_SIZE = 500
+
+
+@dataclass
+class LicenseKeyImportResult:
+    added: int = 0
+    duplicates: int = 0
+    available: int = 0
+
+
+def iter_key_file(path: Path) -> Iterator[str]:
+    """
+    Stream license keys from a TXT (one key per line) or CSV file.
+
+    CSV files use the `key` column when a header has one, otherwise the first column.
+    Blank lines and lines starting with `#` are skipped.
+    """
+    with open(path, newline="", encoding="utf-8-sig") as file:
+        if path.suffix.lower() != ".csv":
+            for line in file:
+                key = line.strip()
+                if key and not key.startswith("#"):
+                    yield key
+            return
+
+        column = 0
+        for line_number, row in enumerate(csv.reader(file)):
+            if line_number == 0:
+                header = [cell.strip().lower() for cell in row]
+                if "key" in header:
+                    column = header.index("key")
+                    continue
+            if len(row) > column:
+                key = row[column].strip()
+                if key and not key.startswith("#"):
+                    yield key
+
+
+class LicenseKeyService:
+    """Inventory of pre-loaded vendor license keys per catalog product."""
+
+    def __init__(self, session_factory: async_sessionmaker) -> None:
+        self.session_factory = session_factory
+        logger.info("License Key Service initialized")
+
+    async def import_file(
+        self, product_id: str, path: Path | str, batch_size: int = IMPORT_BATCH_SIZE
+    ) -> LicenseKeyImportResult:
+        """Import keys from a file in batches, skipping keys already in stock."""
+        result = LicenseKeyImportResult()
+        batch: set[str] = set()
+        seen = 0
+
+        async with self.session_factory() as session:
+            for key in iter_key_file(Path(path)):
+                seen += 1
+                batch.add(key)
+                if len(batch) >= batch_size:
+                    result.added += await LicenseKey.add_batch(session, product_id, batch)
+                    await session.commit()
+                    batch = set()
+
+            if batch:
+                result.added += await LicenseKey.add_batch(session, product_id, batch)
+                await session.commit()
+
+            result.duplicates = seen - result.added
+            result.available = await LicenseKey.count(session, product_id, available_only=True)
+
+        logger.info(
+            f"Imported {result.added} license keys for product {product_id} "
+            f"({result.duplicates} duplicates skipped, {result.available} available)."
+        )
+        return result
+
+    async def claim(
+        self, product_id: str, user_id: int, transaction_id: int | None = None
+    ) -> str | None:
+        async with self.session_factory() as session:
+            return await LicenseKey.claim(session, product_id, user_id, transaction_id)
+
+    async def release(self, product_id: str, key: str) -> bool:
+        async with self.session_factory() as session:
+            released = await LicenseKey.release(session, product_id, key)
+        if released:
+            logger.info(f"License key of product {product_id} returned to the pool.")
+        return released
+
+    async def has_pool(self, product_id: str) -> bool:
+        """Whether keys were ever imported for the product."""
+        async with self.session_factory() as session:
+            return await LicenseKey.count(session, product_id) > 0
+
+    async def count_available(self, product_id: str) -> int:
+        async with self.session_factory() as session:
+            return await LicenseKey.count(session, product_id, available_only=True)
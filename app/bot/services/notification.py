@@ -1,5 +1,7 @@
 import asyncio
 import logging
+from contextlib import nullcontext
+from typing import Any
 
 from aiogram import Bot
 from aiogram.types import (
@@ -11,15 +13,21 @@ from aiogram.types import (
     ReplyKeyboardMarkup,
     ReplyKeyboardRemove,
 )
+from aiogram.utils.i18n import I18n
 from aiogram.utils.i18n import gettext as _
 from aiogram.utils.i18n import lazy_gettext as __
 
 from app.bot.models.subscription_data import SubscriptionData
 from app.bot.routers.misc.keyboard import close_notification_keyboard
 from app.bot.routers.subscription.keyboard import payment_success_keyboard
-from app.bot.utils.constants import MESSAGE_EFFECT_IDS
+from app.bot.utils.constants import (
+    DEFAULT_LANGUAGE,
+    EVENT_DELIVERY_FAILED_TAG,
+    MESSAGE_EFFECT_IDS,
+)
 from app.bot.utils.formatting import format_device_count, format_subscription_period
 from app.config import Config
+from app.db.models import DeliveryJob, ProductSubscription
 
 logger = logging.getLogger(__name__)
 
@@ -173,6 +181,49 @@ class NotificationService:
             reply_markup=payment_success_keyboard(),
         )
 
+    async def notify_delivery_completed(
+        self, job: DeliveryJob, delivery_info: dict[str, Any]
+    ) -> None:
+        """Delivery queue listener: sends the delivered key in the buyer's language."""
+        key = (
+            delivery_info.get("license_key")
+            or delivery_info.get("access_token")
+            or delivery_info.get("api_key")
+            or "N/A"
+        )
+        i18n = I18n.get_current(no_error=True)
+        locale = job.payload.get("locale") or DEFAULT_LANGUAGE
+        with i18n.use_locale(locale) if i18n else nullcontext():
+            await self.notify_purchase_success(user_id=job.tg_id, key=key)
+
+    async def notify_delivery_failed(self, job: DeliveryJob, data: dict[str, Any]) -> None:
+        """Delivery queue listener: reports dead-lettered jobs to the developer."""
+        await self.notify_developer(
+            text=EVENT_DELIVERY_FAILED_TAG
+            + "\n\n"
+            + _("payment:event:delivery_failed").format(
+                job_id=job.id,
+                user_id=job.tg_id,
+                attempts=job.attempts,
+                error=data.get("error", ""),
+            ),
+        )
+
+    async def notify_subscription_expiring(
+        self, subscription: ProductSubscription, days: int, locale: str
+    ) -> None:
+        """Expiry scheduler listener: reminds the owner that a subscription runs out soon."""
+        i18n = I18n.get_current(no_error=True)
+        with i18n.use_locale(locale or DEFAULT_LANGUAGE) if i18n else nullcontext():
+            await self.notify_by_id(
+                chat_id=subscription.tg_id,
+                text=_("subscription:message:expiring").format(
+                    product=subscription.product_name,
+                    period=format_subscription_period(days),
+                ),
+                reply_markup=close_notification_keyboard(),
+            )
+
     async def notify_extend_success(
         self,
         user_id: int,
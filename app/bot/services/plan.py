@@ -3,6 +3,7 @@ import logging
 import os
 
 from app.bot.models import Plan
+from app.bot.models.price_matrix import PriceMatrix
 from app.config import DEFAULT_PLANS_DIR
 
 logger = logging.getLogger(__name__)
@@ -34,10 +35,12 @@ class PlanService:
 
         self._plans: list[Plan] = [Plan.from_dict(plan) for plan in self.data["plans"]]
         self._durations: list[int] = self.data["durations"]
+        self._by_devices: dict[int, Plan] = {plan.devices: plan for plan in self._plans}
+        self.prices = PriceMatrix.from_plans(self._plans)
         logger.info("Plans loaded successfully.")
 
     def get_plan(self, devices: int) -> Plan | None:
-        plan = next((plan for plan in self._plans if plan.devices == devices), None)
+        plan = self._by_devices.get(devices)
 
         if not plan:
             logger.critical(f"Plan with {devices} devices not found.")
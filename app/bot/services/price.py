@@ -0,0 +1,43 @@
+import logging
+from decimal import Decimal
+from typing import Any
+
+from app.bot.models.price_matrix import Price, PriceMatrix
+from app.bot.utils.constants import Currency
+
+from .catalog import CatalogCache
+from .plan import PlanService
+
+logger = logging.getLogger(__name__)
+
+
+class PriceService:
+    """
+    Single source of prices for keyboards and invoices.
+
+    Plan prices are precomputed once from the plans file; product prices come from the
+    price matrix of the current catalog snapshot, which is built once per catalog version.
+    """
+
+    def __init__(self, plan_service: PlanService, catalog: CatalogCache, currency: str) -> None:
+        self.plans = plan_service.prices
+        self.durations = plan_service.get_durations()
+        self.catalog = catalog
+        self.currency = currency
+        logger.info(f"Price Service initialized with {len(self.plans)} plan prices")
+
+    @property
+    def products(self) -> PriceMatrix:
+        return self.catalog.get_snapshot().prices
+
+    def plan_price(self, devices: int, currency: Currency | str, duration: int) -> Decimal | None:
+        return self.plans.get(devices, currency, duration)
+
+    def product_price(
+        self, product: dict[str, Any], currency: Currency | str | None = None
+    ) -> Price | None:
+        """Cheapest offer of a product, in the shop currency unless another is given."""
+        return self.products.cheapest(str(product.get("id")), currency or self.currency)
+
+    def product_offers(self, product: dict[str, Any]) -> tuple[Price, ...]:
+        return self.products.offers(str(product.get("id")))
@@ -1,21 +1,34 @@
 from __future__ import annotations
 
-import json
 import logging
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 import uuid
 
+from cachetools import TTLCache
 from sqlalchemy.ext.asyncio import async_sessionmaker
 
 from app.config import Config
-from app.db.models import User, Transaction
+from app.db.models import DeliveryJob, ProductSubscription, User, Transaction
 from app.bot.models.plan import Plan
+from app.bot.models.price_matrix import currency_code
 from app.bot.models.product_data import ProductSubscriptionData, ProductPlan
+from app.bot.models.subscription_data import SubscriptionData
+from app.bot.utils.constants import Currency
+from app.bot.utils.time import as_utc
+
+from .catalog import CatalogCache, DatabaseCatalog, ProductCatalog, ProductImportResult
+from .delivery import DeliveryQueue
+from .license_key import LicenseKeyService
+from .product_card import ProductCardCache
+from .stock import StockService
 
 logger = logging.getLogger(__name__)
 
+SUBSCRIPTION_CACHE_TTL = 60
+_MISSING = object()
+
 
 class ProductService:
     """
@@ -34,38 +47,68 @@ class ProductService:
         self.default_category = self.config.product.DEFAULT_CATEGORY
         self.products_file = Path(self.config.product.PRODUCTS_FILE)
         self.delivery_timeout = self.config.product.DELIVERY_TIMEOUT
+        self.catalog: CatalogCache
+        if self.config.product.CATALOG_SOURCE == "file":
+            self.catalog = ProductCatalog.for_path(self.products_file)
+        else:
+            self.catalog = DatabaseCatalog(
+                session_factory=session_factory,
+                snapshot_file=self.config.product.CATALOG_SNAPSHOT_FILE,
+            )
+        self.stock = StockService(session_factory=session_factory, catalog=self.catalog)
+        self.license_keys = LicenseKeyService(session_factory=session_factory)
+        self.cards = ProductCardCache()
+        self.delivery = DeliveryQueue(
+            session_factory=session_factory,
+            handler=self._process_delivery_job,
+            workers=self.config.product.DELIVERY_WORKERS,
+            max_attempts=self.config.product.DELIVERY_MAX_ATTEMPTS,
+            stale_after=self.delivery_timeout,
+        )
         
-        # In-memory storage for user subscriptions (replace with DB in production)
-        self._user_subscriptions: Dict[int, Dict] = {}
+        # Read-through cache of the current subscription row per user
+        self._subscription_cache: TTLCache = TTLCache(maxsize=10_000, ttl=SUBSCRIPTION_CACHE_TTL)
         
         logger.info("Product Service initialized")
 
+    async def initialize_catalog(self) -> None:
+        """Load the database catalog, seeding it from the products file on first start."""
+        if isinstance(self.catalog, DatabaseCatalog):
+            await self.catalog.initialize(seed_file=self.products_file)
+
+    async def import_catalog(self, path: Optional[Path] = None) -> ProductImportResult:
+        """
+        Upsert the database catalog from a catalog file, the products file by default.
+
+        Products are added or updated, never removed. Catalog update listeners announce
+        the change, so other replicas refresh without waiting for their poll.
+        """
+        if not isinstance(self.catalog, DatabaseCatalog):
+            raise ValueError("The file catalog is reloaded from the products file on change.")
+        return await self.catalog.import_file(path or self.products_file)
+
     async def load_products_catalog(self) -> List[Dict[str, Any]]:
-        """Load products from the catalog file."""
+        """Load products from the in-memory catalog snapshot."""
         try:
-            if self.products_file.exists():
-                with open(self.products_file, 'r', encoding='utf-8') as f:
-                    catalog = json.load(f)
-                    products = catalog.get('products', [])
-                    logger.info(f"Loaded {len(products)} products from catalog")
-                    return products
-            else:
-                logger.warning(f"Products catalog not found at {self.products_file}")
-                return []
+            return list(self.catalog.get_snapshot().products)
         except Exception as e:
             logger.error(f"Failed to load products catalog: {e}")
             return []
 
-    async def get_product_by_plan(self, plan: Plan) -> Optional[Dict[str, Any]]:
+    async def get_product(self, product_id: Any) -> Optional[Dict[str, Any]]:
+        """Get a catalog product by its id."""
+        return self.catalog.get_snapshot().get(product_id)
+
+    async def get_product_by_plan(
+        self, plan: Plan, currency: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
         """Find a product that matches the given plan."""
-        products = await self.load_products_catalog()
-        
-        for product in products:
-            # Match by price and duration if available
-            if (product.get('price', {}).get('amount') == plan.price and 
-                product.get('duration_days', plan.duration_days) == plan.duration_days):
-                return product
-                
+        product = self.catalog.get_snapshot().find_by_price(
+            duration=plan.duration_days, amount=plan.price, currency=currency
+        )
+        if product:
+            return product
+
         # Fallback: return default digital product
         return {
             'id': str(uuid.uuid4()),
@@ -78,51 +121,98 @@ class ProductService:
             'features': [f'{plan.duration_days} days access', f'{plan.traffic_gb}GB allowance']
         }
 
+    async def get_checkout_product(
+        self, data: SubscriptionData, currency: Currency | str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        The catalog product an invoice pays for, matched by its duration and price in the
+        invoice currency, or None if the invoice is not for a catalog product.
+        """
+        return self.catalog.get_snapshot().find_by_price(
+            duration=data.duration, amount=data.price, currency=currency_code(currency)
+        )
+
     async def create_subscription(
-        self, user_id: int, plan: Plan, transaction_id: int
+        self,
+        user_id: int,
+        plan: Plan,
+        transaction_id: int,
+        product: Optional[Dict[str, Any]] = None,
     ) -> ProductSubscriptionData:
-        """Create a subscription for digital product access."""
+        """
+        Queue delivery of a purchased product and return the subscription terms.
+
+        The product is delivered by a `DeliveryQueue` worker, so payment confirmation
+        does not wait for the delivery backend. `product` is the catalog product the
+        payment was for, whose stock the caller already secured; without it the product
+        is matched from the plan.
+        """
         async with self.session_factory() as session:
             user = await User.get(session, user_id)
-            
-            # Find matching product
-            product = await self.get_product_by_plan(plan)
-            
-            current_time = datetime.now(timezone.utc)
-            
-            subscription_data = ProductSubscriptionData(
-                start_date=current_time,
-                expire_date=current_time + timedelta(days=plan.duration_days),
-                traffic_limit=plan.traffic_gb,
-                is_trial=False,
-                product_id=product['id'],
-                product_name=product['name']
-            )
 
-            # Deliver the product
-            delivery_result = await self._deliver_product(user, product, subscription_data, transaction_id)
+        product = product or await self.get_product_by_plan(plan)
+        current_time = datetime.now(timezone.utc)
 
-            if delivery_result['success']:
-                # Store subscription info
-                self._user_subscriptions[user.tg_id] = {
-                    'user_id': user.tg_id,
-                    'product': product,
-                    'subscription_data': subscription_data,
-                    'delivery_info': delivery_result['delivery_info'],
-                    'created_at': current_time.isoformat(),
-                    'transaction_id': transaction_id
-                }
-                
-                logger.info(
-                    "Product subscription created for user %s - Product: %s - Expires: %s",
-                    user.tg_id,
-                    product['name'],
-                    subscription_data.expire_date,
-                )
-                return subscription_data
-            else:
-                logger.error("Product delivery failed for user %s", user.tg_id)
-                raise Exception("Product delivery failed")
+        subscription_data = ProductSubscriptionData(
+            start_date=current_time,
+            expire_date=current_time + timedelta(days=plan.duration_days),
+            traffic_limit=plan.traffic_gb,
+            is_trial=False,
+            product_id=product['id'],
+            product_name=product['name']
+        )
+
+        await self.delivery.enqueue(
+            tg_id=user.tg_id,
+            transaction_id=transaction_id,
+            payload={
+                'product': product,
+                'start_date': subscription_data.start_date.isoformat(),
+                'expire_date': subscription_data.expire_date.isoformat(),
+                'traffic_limit': subscription_data.traffic_limit,
+                'locale': user.language_code,
+            },
+        )
+
+        logger.info(
+            f"Product delivery queued for user {user.tg_id} - Product: {product['name']} "
+            f"- Expires: {subscription_data.expire_date}"
+        )
+        return subscription_data
+
+    async def _process_delivery_job(self, job: DeliveryJob) -> Dict[str, Any]:
+        """Deliver a queued purchase. Raising makes the queue retry the job."""
+        async with self.session_factory() as session:
+            user = await User.get(session, job.tg_id)
+
+        if not user:
+            raise Exception(f"User {job.tg_id} not found")
+
+        payload = job.payload
+        product = payload['product']
+        subscription_data = ProductSubscriptionData(
+            start_date=datetime.fromisoformat(payload['start_date']),
+            expire_date=datetime.fromisoformat(payload['expire_date']),
+            traffic_limit=payload.get('traffic_limit', 0),
+            is_trial=False,
+            product_id=product['id'],
+            product_name=product['name'],
+        )
+
+        delivery_result = await self._deliver_product(
+            user, product, subscription_data, job.transaction_id
+        )
+        if not delivery_result['success']:
+            raise Exception(delivery_result['error'])
+
+        await self._store_subscription(
+            user=user,
+            product=product,
+            subscription_data=subscription_data,
+            delivery_info=delivery_result['delivery_info'],
+            transaction_id=job.transaction_id,
+        )
+        return delivery_result['delivery_info']
 
     async def gift_product(
         self, user: User, duration: int, devices: int = 1
@@ -162,14 +252,13 @@ class ProductService:
             
             if delivery_result['success']:
                 # Store gift subscription
-                self._user_subscriptions[user.tg_id] = {
-                    'user_id': user.tg_id,
-                    'product': gift_product,
-                    'subscription_data': subscription_data,
-                    'delivery_info': delivery_result['delivery_info'],
-                    'created_at': current_time.isoformat(),
-                    'is_gift': True
-                }
+                await self._store_subscription(
+                    user=user,
+                    product=gift_product,
+                    subscription_data=subscription_data,
+                    delivery_info=delivery_result['delivery_info'],
+                    is_gift=True,
+                )
                 
                 logger.info(f"Product gifted successfully to user {user.tg_id}")
                 return True
@@ -193,22 +282,23 @@ class ProductService:
             current_time = datetime.now(timezone.utc)
             
             # Check if user has existing subscription
-            existing_subscription = self._user_subscriptions.get(user.tg_id)
-            
-            if existing_subscription:
-                # Extend existing subscription
-                old_expiry = datetime.fromisoformat(
-                    existing_subscription['subscription_data'].expire_date.isoformat()
-                )
-                new_expiry = old_expiry + timedelta(days=duration)
-                
-                # Update the subscription
-                existing_subscription['subscription_data'].expire_date = new_expiry
-                existing_subscription['bonus_days_added'] = existing_subscription.get('bonus_days_added', 0) + duration
-                existing_subscription['last_bonus_at'] = current_time.isoformat()
-                
-                logger.info(f"Extended subscription for user {user.tg_id} by {duration} days until {new_expiry}")
-            else:
+            async with self.session_factory() as session:
+                existing_subscription = await ProductSubscription.get_current(session, user.tg_id)
+
+                if existing_subscription:
+                    # Extend existing subscription
+                    new_expiry = existing_subscription.expire_date + timedelta(days=duration)
+                    await ProductSubscription.extend(
+                        session,
+                        subscription_id=existing_subscription.id,
+                        expire_date=new_expiry,
+                        bonus_days=duration,
+                    )
+                    self._subscription_cache.pop(user.tg_id, None)
+
+                    logger.info(f"Extended subscription for user {user.tg_id} by {duration} days until {new_expiry}")
+
+            if not existing_subscription:
                 # Create new bonus subscription
                 bonus_product = {
                     'id': f'bonus-{uuid.uuid4()}',
@@ -233,15 +323,14 @@ class ProductService:
                 delivery_result = await self._deliver_product(user, bonus_product, subscription_data, None)
                 
                 if delivery_result['success']:
-                    self._user_subscriptions[user.tg_id] = {
-                        'user_id': user.tg_id,
-                        'product': bonus_product,
-                        'subscription_data': subscription_data,
-                        'delivery_info': delivery_result['delivery_info'],
-                        'created_at': current_time.isoformat(),
-                        'is_bonus': True,
-                        'bonus_days_added': duration
-                    }
+                    await self._store_subscription(
+                        user=user,
+                        product=bonus_product,
+                        subscription_data=subscription_data,
+                        delivery_info=delivery_result['delivery_info'],
+                        is_bonus=True,
+                        bonus_days_added=duration,
+                    )
             
             logger.info(f"Bonus days processed successfully for user {user.tg_id}")
             return True
@@ -253,11 +342,11 @@ class ProductService:
     async def get_user_subscription_info(self, user: User) -> Optional[Dict]:
         """Get user's current product subscription information."""
         try:
-            subscription = self._user_subscriptions.get(user.tg_id)
+            subscription = await self._get_current_subscription(user.tg_id)
             
             if subscription:
                 current_time = datetime.now(timezone.utc)
-                expiry_time = subscription['subscription_data'].expire_date
+                expiry_time = subscription['expire_date']
                 
                 # Check if subscription is still active
                 is_active = current_time < expiry_time
@@ -265,16 +354,16 @@ class ProductService:
                 
                 subscription_info = {
                     'user_id': user.tg_id,
-                    'product_name': subscription['product']['name'],
-                    'category': subscription['product']['category'],
+                    'product_name': subscription['product_name'],
+                    'category': subscription['category'],
                     'status': 'active' if is_active else 'expired',
                     'expires_at': expiry_time.isoformat(),
                     'days_remaining': max(0, days_remaining),
                     'created_at': subscription['created_at'],
-                    'is_gift': subscription.get('is_gift', False),
-                    'is_bonus': subscription.get('is_bonus', False),
-                    'bonus_days_added': subscription.get('bonus_days_added', 0),
-                    'delivery_info': subscription.get('delivery_info', {})
+                    'is_gift': subscription['is_gift'],
+                    'is_bonus': subscription['is_bonus'],
+                    'bonus_days_added': subscription['bonus_days_added'],
+                    'delivery_info': subscription['delivery_info'] or {}
                 }
                 
                 return subscription_info
@@ -290,27 +379,84 @@ class ProductService:
             logger.error(f"Failed to get subscription info for user {user.tg_id}: {e}")
             return None
 
+    async def _get_current_subscription(self, tg_id: int) -> Optional[Dict[str, Any]]:
+        """Read-through lookup of the user's latest subscription, cached for a short TTL."""
+        cached = self._subscription_cache.get(tg_id, _MISSING)
+        if cached is not _MISSING:
+            return cached
+
+        async with self.session_factory() as session:
+            subscription = await ProductSubscription.get_current(session, tg_id)
+
+        record = None
+        if subscription:
+            record = {
+                'product_name': subscription.product_name,
+                'category': subscription.category,
+                'expire_date': as_utc(subscription.expire_date),
+                'created_at': as_utc(subscription.created_at).isoformat(),
+                'is_gift': subscription.is_gift,
+                'is_bonus': subscription.is_bonus,
+                'bonus_days_added': subscription.bonus_days_added,
+                'delivery_info': subscription.delivery_info,
+            }
+
+        self._subscription_cache[tg_id] = record
+        return record
+
+    async def _store_subscription(
+        self,
+        user: User,
+        product: Dict[str, Any],
+        subscription_data: ProductSubscriptionData,
+        delivery_info: Dict[str, Any],
+        **kwargs: Any,
+    ) -> None:
+        """Persist a delivered subscription and drop the user's cached lookup."""
+        async with self.session_factory() as session:
+            await ProductSubscription.create(
+                session,
+                tg_id=user.tg_id,
+                product_id=str(product['id']),
+                product_name=product['name'],
+                category=product.get('category'),
+                start_date=subscription_data.start_date,
+                expire_date=subscription_data.expire_date,
+                is_trial=subscription_data.is_trial,
+                delivery_info=delivery_info,
+                **kwargs,
+            )
+        self._subscription_cache.pop(user.tg_id, None)
+
     async def get_available_categories(self) -> List[str]:
         """Get list of available product categories."""
         return self.product_categories
 
     async def get_products_by_category(self, category: str) -> List[Dict[str, Any]]:
         """Get all products in a specific category."""
-        products = await self.load_products_catalog()
-        return [p for p in products if p.get('category', '').lower() == category.lower()]
+        return list(self.catalog.get_snapshot().in_category(category))
 
-    async def search_products(self, query: str) -> List[Dict[str, Any]]:
-        """Search products by name or description."""
-        products = await self.load_products_catalog()
-        query_lower = query.lower()
-        
-        results = []
-        for product in products:
-            if (query_lower in product.get('name', '').lower() or 
-                query_lower in product.get('description', '').lower()):
-                results.append(product)
-        
-        return results
+    async def search_products(self, query: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Search products by localized name, description and features."""
+        return self.catalog.search(query, limit)
+
+    async def _claim_license_key(
+        self, user: User, product: Dict[str, Any], transaction_id: Optional[int] = None
+    ) -> Optional[str]:
+        """
+        Claim a pre-loaded vendor key, or None if the product has no key pool.
+
+        A key claimed for a transaction is returned again when its delivery is retried.
+        """
+        product_id = str(product['id'])
+        key = await self.license_keys.claim(product_id, user.tg_id, transaction_id)
+        if key:
+            return key
+
+        if await self.license_keys.has_pool(product_id):
+            raise Exception(f"No license keys left for product {product_id}")
+
+        return None
 
     async def _generate_product_key(self, product: Dict[str, Any]) -> str:
         """Generate a unique product key/license."""
@@ -334,68 +480,11 @@ class ProductService:
             # Generate a unique access token
             return f"ACCESS-{uuid.uuid4().hex[:12].upper()}"
 
-    async def deliver_product_from_catalog(
-        self, user: User, product_id: str, transaction_id: Optional[int] = None
-    ) -> Dict[str, Any]:
-        """Deliver a product from the catalog to a user."""
-        try:
-            # Get product from catalog
-            products = await self.load_products_catalog()
-            product = next((p for p in products if p['id'] == product_id), None)
-            
-            if not product:
-                return {'success': False, 'error': 'Product not found'}
-            
-            # Check availability
-            stock = product.get('stock', 0)
-            is_active = product.get('is_active', True)
-            
-            if not is_active:
-                return {'success': False, 'error': 'Product is not active'}
-            
-            if stock <= 0:
-                return {'success': False, 'error': 'Product is out of stock'}
-            
-            # Create subscription data
-            current_time = datetime.now(timezone.utc)
-            duration_days = product.get('duration_days', 30)
-            
-            subscription_data = ProductSubscriptionData(
-                start_date=current_time,
-                expire_date=current_time + timedelta(days=duration_days) if duration_days > 0 else current_time + timedelta(days=36500),  # 100 years for lifetime
-                traffic_limit=0,  # No traffic limit for digital products
-                is_trial=False,
-                product_id=product['id'],
-                product_name=product['name']
-            )
-            
-            # Deliver the product
-            delivery_result = await self._deliver_product(user, product, subscription_data, transaction_id)
-            
-            if delivery_result['success']:
-                # Store subscription info
-                self._user_subscriptions[user.tg_id] = {
-                    'user_id': user.tg_id,
-                    'product': product,
-                    'subscription_data': subscription_data,
-                    'delivery_info': delivery_result['delivery_info'],
-                    'created_at': current_time.isoformat(),
-                    'transaction_id': transaction_id,
-                    'from_catalog': True
-                }
-                
-                logger.info(f"Product delivered from catalog: {product['name']} to user {user.tg_id}")
-            
-            return delivery_result
-            
-        except Exception as e:
-            logger.error(f"Failed to deliver catalog product {product_id} to user {user.tg_id}: {e}")
-            return {'success': False, 'error': str(e)}
-
     async def _deliver_product(
         self, user: User, product: Dict[str, Any], subscription_data: ProductSubscriptionData, transaction_id: Optional[int] = None
     ) -> Dict[str, Any]:
         """Internal method to handle product delivery."""
+        pooled_key = None
         try:
             current_time = datetime.now(timezone.utc)
             delivery_type = product.get('delivery_type', 'digital')
@@ -414,7 +503,8 @@ class ProductService:
             
             # Generate specific delivery content based on type
             if delivery_type == 'license_key':
-                delivery_info['license_key'] = await self._generate_product_key(product)
+                pooled_key = await self._claim_license_key(user, product, transaction_id)
+                delivery_info['license_key'] = pooled_key or await self._generate_product_key(product)
                 delivery_info['activation_instructions'] = product.get('delivery_config', {}).get('template', '')
                 
                 # Format the template with actual values
@@ -475,6 +565,9 @@ class ProductService:
             
         except Exception as e:
             logger.error(f"Product delivery failed for user {user.tg_id}: {e}")
+            if pooled_key:
+                # The key never reached the user, so a later attempt may hand it out
+                await self.license_keys.release(str(product['id']), pooled_key)
             return {
                 'success': False,
                 'error': str(e)
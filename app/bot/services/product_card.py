@@ -0,0 +1,67 @@
+import logging
+from dataclasses import dataclass
+
+from aiogram.types import InlineKeyboardMarkup
+
+logger = logging.getLogger(__name__)
+
+LOW_STOCK_THRESHOLD = 10
+PRODUCT_CARD_CACHE_SIZE = 4096
+
+
+def stock_bucket(stock: int | None) -> int | str:
+    """
+    Collapse a stock level to the values that change the rendered card.
+
+    Unlimited and plentiful stock render the same text, low stock shows the exact count.
+    """
+    if stock is None or stock > LOW_STOCK_THRESHOLD:
+        return "available"
+    if stock > 0:
+        return stock
+    return "out_of_stock"
+
+
+@dataclass(frozen=True)
+class ProductCard:
+    version: str
+    bucket: int | str
+    text: str
+    reply_markup: InlineKeyboardMarkup
+
+
+class ProductCardCache:
+    """
+    Pre-rendered product detail cards per (product_id, locale).
+
+    Each card remembers the catalog version and stock bucket it was rendered for;
+    a catalog reload or a stock bucket change turns the lookup into a miss.
+    """
+
+    def __init__(self, maxsize: int = PRODUCT_CARD_CACHE_SIZE) -> None:
+        self.maxsize = maxsize
+        self._cards: dict[tuple[str, str], ProductCard] = {}
+
+    def get(
+        self, product_id: str, locale: str, version: str, bucket: int | str
+    ) -> ProductCard | None:
+        card = self._cards.get((product_id, locale))
+        if card and card.version == version and card.bucket == bucket:
+            return card
+        return None
+
+    def put(self, product_id: str, locale: str, card: ProductCard) -> None:
+        key = (product_id, locale)
+        if key not in self._cards and len(self._cards) >= self.maxsize:
+            # Drop the oldest rendered card; dicts keep insertion order.
+            self._cards.pop(next(iter(self._cards)))
+        self._cards[key] = card
+
+    def invalidate(self, product_id: str | None = None) -> None:
+        if product_id is None:
+            self._cards.clear()
+            return
+
+        for key in [key for key in self._cards if key[0] == product_id]:
+            del self._cards[key]
+        logger.debug(f"Product card cache invalidated for product {product_id}.")
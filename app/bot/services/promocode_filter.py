@@ -0,0 +1,202 @@
+import asyncio
+import json
+import logging
+import math
+import time
+from hashlib import blake2b
+from typing import Iterable
+
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.db.models import Promocode
+
+logger = logging.getLogger(__name__)
+
+PROMOCODE_CHANNEL = "promocodes:created"
+RECONNECT_DELAY = 5
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings.
+
+    `__contains__` never returns False for an added item; it returns True for an item
+    that was never added with a probability close to `error_rate` while the filter
+    holds at most `capacity` items.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001) -> None:
+        self.capacity = max(capacity, 1)
+        self.size = math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(round(self.size / self.capacity * math.log(2)), 1)
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> Iterable[int]:
+        # Double hashing: two 64-bit halves of one digest give all k positions.
+        digest = blake2b(item.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8]), int.from_bytes(digest[8:]) | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item)
+        )
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class PromocodeFilter:
+    """
+    In-memory negative-lookup cache of existing promocodes.
+
+    Guessed codes that the filter has never seen are rejected without a database
+    query, so brute-forcing codes costs the bot nothing but CPU. The filter is loaded
+    on start and topped up with newer codes every `refresh_interval` seconds. Codes
+    created through `add` are visible immediately, and with Redis they are broadcast
+    to the filters of all other replicas too, so a code created on one replica is not
+    rejected on another until its next refresh. Each refresh re-reads ids from the
+    previous refresh on, so a code whose transaction committed after a higher id was
+    seen is still picked up. The filter is rebuilt every `rebuild_interval` seconds,
+    which also drops deleted codes; until then a stale hit just falls through to the
+    database.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        redis: Redis | None = None,
+        channel: str = PROMOCODE_CHANNEL,
+        refresh_interval: float = 60,
+        rebuild_interval: float = 3600,
+        capacity: int = 100_000,
+        error_rate: float = 0.001,
+    ) -> None:
+        self.session_factory = session_factory
+        self.redis = redis
+        self.channel = channel
+        self.refresh_interval = refresh_interval
+        self.rebuild_interval = rebuild_interval
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._filter: BloomFilter | None = None
+        self._last_id = 0
+        self._scanned_id = 0
+        self._built_at = 0.0
+        self._tasks: list[asyncio.Task] = []
+        self._subscribed = asyncio.Event()
+
+    def might_exist(self, code: str) -> bool:
+        """False only if the code certainly does not exist. True until the filter is loaded."""
+        return self._filter is None or code in self._filter
+
+    async def add(self, codes: Iterable[str]) -> None:
+        """Add newly created codes here and announce them to the other replicas."""
+        codes = list(codes)
+        self._add(codes)
+        if not self.redis or not codes:
+            return
+        try:
+            await self.redis.publish(self.channel, json.dumps(codes))
+        except Exception as exception:
+            logger.error(f"Failed to announce {len(codes)} promocodes: {exception}")
+
+    def handle(self, data: bytes | str) -> None:
+        """Add codes announced by another replica."""
+        try:
+            codes = json.loads(data)
+        except ValueError:
+            logger.warning(f"Ignoring malformed promocode announcement: {data!r}")
+            return
+        self._add(codes)
+
+    def _add(self, codes: Iterable[str]) -> None:
+        if self._filter is None:
+            return
+        for code in codes:
+            self._filter.add(code)
+
+    async def refresh(self) -> None:
+        """Add promocodes committed since the previous refresh, rebuilding the filter when due."""
+        rebuild = (
+            self._filter is None or time.monotonic() - self._built_at >= self.rebuild_interval
+        )
+        if not rebuild:
+            async with self.session_factory() as session:
+                rows = await Promocode.get_all_codes(session=session, after_id=self._scanned_id)
+            rebuild = len(self._filter) + len(rows) > self._filter.capacity
+
+        if rebuild:
+            async with self.session_factory() as session:
+                rows = await Promocode.get_all_codes(session=session)
+            capacity = max(self.capacity, 2 * len(rows))
+            self._filter, self._last_id = BloomFilter(capacity, self.error_rate), 0
+            self._built_at = time.monotonic()
+            logger.info(f"Promocode filter rebuilt for {len(rows)} codes (capacity {capacity}).")
+
+        # Ids are taken at insert but become visible at commit, so a lower id can show up
+        # after a higher one: the next refresh scans again from this refresh's start.
+        self._scanned_id = self._last_id
+        for promocode_id, code in rows:
+            if code not in self._filter:
+                self._filter.add(code)
+            self._last_id = max(self._last_id, promocode_id)
+
+    async def start(self) -> None:
+        try:
+            await self.refresh()
+        except Exception as exception:
+            logger.error(f"Failed to load promocode filter, lookups hit the database: {exception}")
+        self._tasks = [asyncio.create_task(self._run(), name="promocode-filter")]
+        if self.redis:
+            self._tasks.append(asyncio.create_task(self._listen(), name="promocode-sync"))
+            await self._subscribed.wait()
+        logger.info(f"Promocode filter started, refreshing every {self.refresh_interval}s.")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("Promocode filter stopped.")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exception:
+                logger.error(f"Promocode filter refresh error: {exception}")
+
+    async def _listen(self) -> None:
+        reconnecting = False
+        while True:
+            try:
+                async with self.redis.pubsub(ignore_subscribe_messages=True) as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    self._subscribed.set()
+                    if reconnecting:
+                        # Announcements sent while disconnected are lost.
+                        await self.refresh()
+                        reconnecting = False
+
+                    async for message in pubsub.listen():
+                        if message.get("type") == "message":
+                            self.handle(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as exception:
+                logger.error(f"Promocode sync connection lost: {exception}")
+                # Unblock start() even if the first subscription failed.
+                self._subscribed.set()
+                reconnecting = True
+                await asyncio.sleep(RECONNECT_DELAY)
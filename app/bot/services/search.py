@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from typing import Any, Iterable
+
+from app.bot.models.catalog import CatalogSnapshot
+
+logger = logging.getLogger(__name__)
+
+WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+CJK_PATTERN = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af]+")
+
+FIELD_WEIGHTS = {
+    "name": 3.0,
+    "features": 1.5,
+    "category": 1.0,
+    "description": 1.0,
+}
+PREFIX_PENALTY = 0.5
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Split text into lowercase search terms.
+
+    Runs of CJK characters have no word boundaries, so they are indexed as single
+    characters plus overlapping bigrams.
+    """
+    text = unicodedata.normalize("NFKC", text).casefold()
+    tokens = []
+    for word in WORD_PATTERN.findall(text):
+        cjk_runs = CJK_PATTERN.findall(word)
+        if not cjk_runs:
+            tokens.append(word)
+            continue
+
+        for part in CJK_PATTERN.split(word):
+            if part:
+                tokens.append(part)
+        for run in cjk_runs:
+            tokens.extend(run)
+            tokens.extend(run[i : i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def _field_texts(product: dict[str, Any]) -> Iterable[tuple[str, str]]:
+    for key, value in product.items():
+        field = key.split("_", 1)[0]
+        if field not in FIELD_WEIGHTS or not value:
+            continue
+        if isinstance(value, (list, tuple)):
+            for item in value:
+                yield field, str(item)
+        elif isinstance(value, str):
+            yield field, value
+
+
+def _fingerprint(product: dict[str, Any]) -> str:
+    payload = json.dumps(
+        sorted((key, value) for key, value in _field_texts(product)), ensure_ascii=False
+    )
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def _document_terms(product: dict[str, Any]) -> dict[str, float]:
+    terms: dict[str, float] = {}
+    for field, text in _field_texts(product):
+        weight = FIELD_WEIGHTS[field]
+        for token in tokenize(text):
+            if terms.get(token, 0.0) < weight:
+                terms[token] = weight
+    return terms
+
+
+class ProductSearchIndex:
+    """
+    Inverted index over localized product names, descriptions and features.
+
+    Every term maps to the products containing it with the weight of the best
+    field it appeared in. Terms are also kept sorted, so prefix queries resolve
+    with a binary search instead of scanning the vocabulary. The index follows
+    catalog snapshots incrementally: only products whose searchable text changed
+    are re-tokenized.
+    """
+
+    def __init__(self) -> None:
+        self.version: str | None = None
+        self._lock = threading.Lock()
+        self._fingerprints: dict[str, str] = {}
+        self._documents: dict[str, dict[str, float]] = {}
+        self._order: dict[str, int] = {}
+        self._postings: dict[str, dict[str, float]] = {}
+        self._terms: list[str] = []
+
+    def sync(self, snapshot: CatalogSnapshot) -> None:
+        if snapshot.version == self.version:
+            return
+
+        with self._lock:
+            if snapshot.version == self.version:
+                return
+
+            seen = set()
+            changed = 0
+            order = {}
+            for position, (product_id, product) in enumerate(snapshot.by_id.items()):
+                seen.add(product_id)
+                order[product_id] = position
+                fingerprint = _fingerprint(product)
+                if self._fingerprints.get(product_id) == fingerprint:
+                    continue
+                self._remove(product_id)
+                self._add(product_id, product, fingerprint)
+                changed += 1
+
+            removed = [product_id for product_id in self._documents if product_id not in seen]
+            for product_id in removed:
+                self._remove(product_id)
+
+            if changed or removed:
+                self._terms = sorted(self._postings)
+            self._order = order
+            self.version = snapshot.version
+            logger.debug(
+                f"Search index synced to {snapshot.version[:12]}: "
+                f"{changed} updated, {len(removed)} removed, {len(self._terms)} terms."
+            )
+
+    def _add(self, product_id: str, product: dict[str, Any], fingerprint: str) -> None:
+        terms = _document_terms(product)
+        for term, weight in terms.items():
+            self._postings.setdefault(term, {})[product_id] = weight
+        self._documents[product_id] = terms
+        self._fingerprints[product_id] = fingerprint
+
+    def _remove(self, product_id: str) -> None:
+        for term in self._documents.pop(product_id, {}):
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            posting.pop(product_id, None)
+            if not posting:
+                del self._postings[term]
+        self._fingerprints.pop(product_id, None)
+
+    def _expand(self, token: str) -> Iterable[str]:
+        terms = self._terms
+        index = bisect_left(terms, token)
+        while index < len(terms) and terms[index].startswith(token):
+            yield terms[index]
+            index += 1
+
+    def search(self, query: str, limit: int | None = None) -> list[str]:
+        """Return ids of products matching every query term, best matches first."""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+
+        postings = self._postings
+        scores: dict[str, float] | None = None
+        for token in tokens:
+            token_scores: dict[str, float] = {}
+            for term in self._expand(token):
+                factor = 1.0 if term == token else PREFIX_PENALTY
+                for product_id, weight in postings[term].items():
+                    score = weight * factor
+                    if token_scores.get(product_id, 0.0) < score:
+                        token_scores[product_id] = score
+
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {
+                    product_id: score + token_scores[product_id]
+                    for product_id, score in scores.items()
+                    if product_id in token_scores
+                }
+            if not scores:
+                return []
+
+        order = self._order
+        ranked = sorted(scores, key=lambda product_id: (-scores[product_id], order[product_id]))
+        return ranked[:limit] if limit else ranked
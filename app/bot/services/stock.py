@@ -0,0 +1,231 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.bot.utils.constants import ReservationStatus
+from app.db.models import ProductStock, StockReservation
+
+from .catalog import CatalogCache
+
+logger = logging.getLogger(__name__)
+
+RESERVATION_TTL_MINUTES = 15
+
+
+class StockService:
+    """
+    Reservation-based stock accounting for limited catalog products.
+
+    Units move from `available` into a reservation when a user starts checkout, are
+    committed when the payment succeeds and handed back when it is canceled or the
+    reservation expires. Every step is a conditional UPDATE, so concurrent buyers
+    never oversell and never wait on a shared lock. Products without a non-negative
+    `stock` value in the catalog are treated as unlimited.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        catalog: CatalogCache,
+        reservation_ttl: int = RESERVATION_TTL_MINUTES,
+    ) -> None:
+        self.session_factory = session_factory
+        self.catalog = catalog
+        self.reservation_ttl = timedelta(minutes=reservation_ttl)
+        self._synced_version: str | None = None
+        logger.info("Stock Service initialized")
+
+    @staticmethod
+    def is_limited(product: dict[str, Any]) -> bool:
+        stock = product.get("stock")
+        return isinstance(stock, int) and stock >= 0
+
+    async def _sync(self) -> None:
+        snapshot = self.catalog.get_snapshot()
+        if snapshot.version == self._synced_version:
+            return
+
+        totals = {
+            str(product["id"]): product["stock"]
+            for product in snapshot.products
+            if self.is_limited(product)
+        }
+        async with self.session_factory() as session:
+            await ProductStock.sync(session, totals)
+
+        self._synced_version = snapshot.version
+        logger.debug(f"Stock synced for {len(totals)} limited products.")
+
+    async def get_available(self, product: dict[str, Any]) -> int | None:
+        """Units that can still be reserved, or None if the product is unlimited."""
+        if not self.is_limited(product):
+            return None
+
+        await self._sync()
+        async with self.session_factory() as session:
+            stock = await ProductStock.get(session, str(product["id"]))
+        return stock.available if stock else 0
+
+    async def reserve(self, user_id: int, product: dict[str, Any], quantity: int = 1) -> bool:
+        """Hold units for the user. Repeated calls reuse the user's active reservation."""
+        if not self.is_limited(product):
+            return True
+
+        await self._sync()
+        product_id = str(product["id"])
+        now = datetime.now(timezone.utc)
+
+        async with self.session_factory() as session:
+            if await StockReservation.get_active(session, user_id, product_id, now):
+                return True
+
+            if not await ProductStock.take(session, product_id, quantity):
+                await session.rollback()
+                logger.info(f"Product {product_id} is out of stock for user {user_id}.")
+                return False
+
+            session.add(
+                StockReservation(
+                    product_id=product_id,
+                    tg_id=user_id,
+                    quantity=quantity,
+                    expires_at=now + self.reservation_ttl,
+                )
+            )
+            await session.commit()
+
+        logger.info(f"Reserved {quantity} of product {product_id} for user {user_id}.")
+        return True
+
+    async def attach_payment(self, user_id: int, payment_id: str, product_id: str) -> bool:
+        """
+        Bind the user's reservation of the invoiced product to the invoice, so the payment
+        outcome commits or releases exactly that reservation. A reservation already bound
+        to another invoice is left alone.
+        """
+        async with self.session_factory() as session:
+            now = datetime.now(timezone.utc)
+            reservation = await StockReservation.get_active(
+                session, user_id, product_id, now, unpaid=True
+            )
+            if not reservation:
+                return False
+
+            reservation.payment_id = payment_id
+            await session.commit()
+
+        logger.info(f"Reservation {reservation.id} bound to payment {payment_id}.")
+        return True
+
+    async def commit(
+        self,
+        payment_id: str | None = None,
+        user_id: int | None = None,
+        product_id: str | None = None,
+    ) -> bool:
+        """Mark a reservation as paid; its units stay out of available stock for good."""
+        async with self.session_factory() as session:
+            reservation = await self._find(session, payment_id, user_id, product_id)
+            if not reservation:
+                return False
+
+            committed = await StockReservation.transition(
+                session, reservation.id, ReservationStatus.COMMITTED
+            )
+            await session.commit()
+
+        if committed:
+            logger.info(f"Reservation {reservation.id} for product {reservation.product_id} committed.")
+        return committed
+
+    async def release(
+        self,
+        payment_id: str | None = None,
+        user_id: int | None = None,
+        product_id: str | None = None,
+    ) -> bool:
+        """Cancel a reservation and return its units to available stock."""
+        async with self.session_factory() as session:
+            reservation = await self._find(session, payment_id, user_id, product_id)
+            if not reservation:
+                return False
+            released = await self._release(session, reservation)
+            await session.commit()
+        return released
+
+    async def release_expired(self) -> int:
+        async with self.session_factory() as session:
+            expired = await StockReservation.get_expired(session, datetime.now(timezone.utc))
+            released = 0
+            for reservation in expired:
+                released += await self._release(session, reservation)
+            await session.commit()
+        return released
+
+    async def purchase(
+        self,
+        user_id: int,
+        product: dict[str, Any],
+        payment_id: str | None = None,
+        quantity: int = 1,
+    ) -> bool:
+        """
+        Finalize a sale: commit the reservation bound to the payment, or the user's own
+        one without a payment. If none is left (it expired and was released, or the
+        buyer never reserved), take the units directly; False means the product sold out.
+        """
+        if not self.is_limited(product):
+            return True
+
+        product_id = str(product["id"])
+        if payment_id:
+            committed = await self.commit(payment_id=payment_id)
+        else:
+            committed = await self.commit(user_id=user_id, product_id=product_id)
+        if committed:
+            return True
+
+        await self._sync()
+        async with self.session_factory() as session:
+            taken = await ProductStock.take(session, product_id, quantity)
+            await session.commit()
+
+        if taken:
+            logger.info(
+                f"Took {quantity} of product {product_id} for user {user_id} "
+                "without a reservation."
+            )
+        else:
+            logger.warning(f"Product {product_id} sold out before user {user_id} paid.")
+        return taken
+
+    async def _find(
+        self,
+        session: AsyncSession,
+        payment_id: str | None,
+        user_id: int | None,
+        product_id: str | None,
+    ) -> StockReservation | None:
+        if payment_id:
+            return await StockReservation.get_by_payment(session, payment_id)
+        if user_id is not None and product_id is not None:
+            now = datetime.now(timezone.utc)
+            return await StockReservation.get_active(session, user_id, product_id, now)
+        return None
+
+    @staticmethod
+    async def _release(session: AsyncSession, reservation: StockReservation) -> bool:
+        # The status transition guards against returning the same units twice.
+        if not await StockReservation.transition(
+            session, reservation.id, ReservationStatus.RELEASED
+        ):
+            return False
+
+        await ProductStock.give_back(session, reservation.product_id, reservation.quantity)
+        logger.info(
+            f"Reservation {reservation.id} released, {reservation.quantity} of "
+            f"product {reservation.product_id} returned to stock."
+        )
+        return True
@@ -13,6 +13,7 @@ from app.bot.models.subscription_data import SubscriptionData
 
 if TYPE_CHECKING:
     from app.bot.services.product import ProductService
+    from app.bot.services.user_cache import UserCache
 
 logger = logging.getLogger(__name__)
 
@@ -23,10 +24,12 @@ class SubscriptionService:
         config: Config,
         session_factory: async_sessionmaker,
         product_service: "ProductService" = None,
+        user_cache: "UserCache | None" = None,
     ) -> None:
         self.config = config
         self.session_factory = session_factory
         self.product_service = product_service
+        self.user_cache = user_cache
         logger.info("Subscription Service initialized")
 
     async def is_trial_available(self, user: User) -> bool:
@@ -53,6 +56,7 @@ class SubscriptionService:
             trial_used = await User.update_trial_status(
                 session=session, tg_id=user.tg_id, used=True
             )
+        await self._invalidate_user(user.tg_id)
 
         if not trial_used:
             logger.critical(f"Failed to activate trial for user {user.tg_id}.")
@@ -79,16 +83,27 @@ class SubscriptionService:
 
         async with self.session_factory() as session:
             await User.update_trial_status(session=session, tg_id=user.tg_id, used=False)
+        await self._invalidate_user(user.tg_id)
 
         logger.warning(f"Failed to apply trial period for user {user.tg_id} due to failure.")
         return False
 
+    async def _invalidate_user(self, tg_id: int) -> None:
+        if self.user_cache:
+            await self.user_cache.invalidate(tg_id)
+
     async def create_subscription(
-        self, user_id: int, plan: Plan, transaction_id: int
+        self,
+        user_id: int,
+        plan: Plan,
+        transaction_id: int,
+        product: Optional[Dict] = None,
     ) -> SubscriptionData:
         """Create a subscription using the product service."""
         if self.product_service:
-            return await self.product_service.create_subscription(user_id, plan, transaction_id)
+            return await self.product_service.create_subscription(
+                user_id, plan, transaction_id, product=product
+            )
         
         # Fallback logic if product service not available
         async with self.session_factory() as session:
@@ -0,0 +1,92 @@
+import json
+import logging
+
+from cachetools import TTLCache
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.bot.models.user_profile import UserProfile
+from app.db.models import User
+
+logger = logging.getLogger(__name__)
+
+USER_CACHE_KEY = "user:profile:{tg_id}"
+LOCAL_CACHE_TTL = 10
+REDIS_CACHE_TTL = 600
+
+
+class UserCache:
+    """
+    Read-through cache of user profiles for the per-update user lookup.
+
+    Profiles are kept in-process for a few seconds and in Redis for longer, so
+    returning users are resolved without a database query. Code that changes a
+    user row calls `invalidate`; the short local TTL bounds how long other
+    replicas keep serving their own copy.
+    """
+
+    def __init__(
+        self,
+        redis: Redis | None = None,
+        local_ttl: int = LOCAL_CACHE_TTL,
+        redis_ttl: int = REDIS_CACHE_TTL,
+        maxsize: int = 10_000,
+    ) -> None:
+        self.redis = redis
+        self.redis_ttl = redis_ttl
+        self._local: TTLCache = TTLCache(maxsize=maxsize, ttl=local_ttl)
+
+    async def get(self, tg_id: int) -> UserProfile | None:
+        profile = self._local.get(tg_id)
+        if profile is not None or not self.redis:
+            return profile
+
+        try:
+            raw = await self.redis.get(USER_CACHE_KEY.format(tg_id=tg_id))
+        except Exception as exception:
+            logger.warning(f"Failed to read cached user {tg_id}: {exception}")
+            return None
+
+        if raw is None:
+            return None
+        profile = UserProfile.from_dict(json.loads(raw))
+        self._local[tg_id] = profile
+        return profile
+
+    async def put(self, profile: UserProfile) -> None:
+        self._local[profile.tg_id] = profile
+        if not self.redis:
+            return
+
+        try:
+            await self.redis.set(
+                USER_CACHE_KEY.format(tg_id=profile.tg_id),
+                json.dumps(profile.to_dict()),
+                ex=self.redis_ttl,
+            )
+        except Exception as exception:
+            logger.warning(f"Failed to cache user {profile.tg_id}: {exception}")
+
+    async def invalidate(self, tg_id: int) -> None:
+        self._local.pop(tg_id, None)
+        if not self.redis:
+            return
+
+        try:
+            await self.redis.delete(USER_CACHE_KEY.format(tg_id=tg_id))
+        except Exception as exception:
+            logger.warning(f"Failed to invalidate cached user {tg_id}: {exception}")
+
+    async def load(self, session: AsyncSession, tg_id: int) -> UserProfile | None:
+        """Cached profile, or the user row read into the cache."""
+        profile = await self.get(tg_id)
+        if profile is not None:
+            return profile
+
+        user = await User.get(session=session, tg_id=tg_id)
+        if not user:
+            return None
+
+        profile = UserProfile.from_user(user)
+        await self.put(profile)
+        return profile
@@ -0,0 +1,132 @@
+import asyncio
+import logging
+from collections import Counter, defaultdict
+from typing import Any
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.db.models import Base
+
+logger = logging.getLogger(__name__)
+
+RowKey = tuple[type[Base], str, Any]
+
+
+class WriteBuffer:
+    """
+    Write-behind buffer for small, frequent writes such as counters and flags.
+
+    Increments and field updates are coalesced in memory per row and written by a
+    background task every `flush_interval` seconds in a single transaction, so a burst
+    of clicks costs one short write lock instead of one commit each. Buffered writes
+    are lost only if the process dies without running `stop`, which flushes them.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        flush_interval: float = 0.5,
+        max_pending: int = 1000,
+    ) -> None:
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._counters: defaultdict[RowKey, Counter[str]] = defaultdict(Counter)
+        self._updates: defaultdict[RowKey, dict[str, Any]] = defaultdict(dict)
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._wakeup = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._counters.keys() | self._updates.keys())
+
+    def increment(
+        self, model: type[Base], key: Any, key_column: str = "id", **counters: int
+    ) -> None:
+        """Add to counter columns of the row where `key_column == key`."""
+        self._counters[(model, key_column, key)].update(counters)
+        self._pending_changed()
+
+    def update(self, model: type[Base], key: Any, key_column: str = "id", **values: Any) -> None:
+        """Set columns of the row where `key_column == key`; the last value written wins."""
+        self._updates[(model, key_column, key)].update(values)
+        self._pending_changed()
+
+    async def flush(self) -> int:
+        """Write all buffered changes in one transaction. Returns the number of rows."""
+        async with self._lock:
+            counters, self._counters = self._counters, defaultdict(Counter)
+            updates, self._updates = self._updates, defaultdict(dict)
+            if not counters and not updates:
+                return 0
+
+            # Rows that received the same increments share one UPDATE ... WHERE key IN (...)
+            increments: defaultdict[tuple, list[Any]] = defaultdict(list)
+            for (model, key_column, key), deltas in counters.items():
+                deltas = tuple(sorted((column, by) for column, by in deltas.items() if by))
+                if deltas:
+                    increments[(model, key_column, deltas)].append(key)
+
+            try:
+                async with self.session_factory() as session:
+                    for (model, key_column, deltas), keys in increments.items():
+                        await session.execute(
+                            update(model)
+                            .where(getattr(model, key_column).in_(keys))
+                            .values({column: getattr(model, column) + by for column, by in deltas})
+                        )
+                    for (model, key_column, key), values in updates.items():
+                        await session.execute(
+                            update(model).where(getattr(model, key_column) == key).values(values)
+                        )
+                    await session.commit()
+            except Exception as exception:
+                logger.error(f"Failed to flush buffered writes, keeping them: {exception}")
+                self._restore(counters, updates)
+                return 0
+
+        rows = len(counters.keys() | updates.keys())
+        logger.debug(f"Flushed buffered writes for {rows} rows.")
+        return rows
+
+    def _restore(
+        self,
+        counters: dict[RowKey, Counter[str]],
+        updates: dict[RowKey, dict[str, Any]],
+    ) -> None:
+        for row, deltas in counters.items():
+            self._counters[row].update(deltas)
+        for row, values in updates.items():
+            # Values buffered since the failed flush are newer and take precedence.
+            self._updates[row] = {**values, **self._updates.get(row, {})}
+
+    def _pending_changed(self) -> None:
+        if len(self) >= self.max_pending:
+            self._wakeup.set()
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="write-buffer")
+        logger.info(f"Write buffer started, flushing every {self.flush_interval}s.")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+        logger.info("Write buffer stopped.")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exception:
+                logger.error(f"Write buffer error: {exception}")
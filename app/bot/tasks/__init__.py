@@ -1,2 +1,4 @@
+from .catalog import start_scheduler
 from .referral import start_scheduler
+from .stock import start_scheduler
 from .transactions import start_scheduler
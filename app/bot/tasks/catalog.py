@@ -0,0 +1,27 @@
+import logging
+from datetime import datetime
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+from app.bot.services.catalog import DatabaseCatalog
+
+logger = logging.getLogger(__name__)
+
+
+async def refresh_catalog(catalog: DatabaseCatalog) -> None:
+    try:
+        await catalog.refresh()
+    except Exception as exception:
+        logger.error(f"[Background check] Failed to refresh product catalog: {exception}")
+
+
+def start_scheduler(catalog: DatabaseCatalog, interval: int = 30) -> None:
+    scheduler = AsyncIOScheduler()
+    scheduler.add_job(
+        refresh_catalog,
+        "interval",
+        seconds=interval,
+        args=[catalog],
+        next_run_time=datetime.now(),
+    )
+    scheduler.start()
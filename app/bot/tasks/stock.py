@@ -0,0 +1,29 @@
+import logging
+from datetime import datetime
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+from app.bot.services import StockService
+
+logger = logging.getLogger(__name__)
+
+
+async def release_expired_reservations(stock_service: StockService) -> None:
+    released = await stock_service.release_expired()
+
+    if released:
+        logger.info(f"[Background check] Released {released} expired stock reservations.")
+    else:
+        logger.info("[Background check] No expired stock reservations found.")
+
+
+def start_scheduler(stock_service: StockService) -> None:
+    scheduler = AsyncIOScheduler()
+    scheduler.add_job(
+        release_expired_reservations,
+        "interval",
+        minutes=5,
+        args=[stock_service],
+        next_run_time=datetime.now(),
+    )
+    scheduler.start()
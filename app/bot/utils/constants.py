@@ -31,6 +31,10 @@ MAIN_MESSAGE_ID_KEY = "main_message_id"
 PREVIOUS_CALLBACK_KEY = "previous_callback"
 
 INPUT_PROMOCODE_KEY = "input_promocode"
+INPUT_PROMOCODE_COUNT_KEY = "input_promocode_count"
+INPUT_PROMOCODE_MAX_USES_KEY = "input_promocode_max_uses"
+MAX_BULK_PROMOCODES = 50_000
+MAX_PROMOCODE_USES = 10_000
 
 PRODUCT_NAME_KEY = "product_name"
 PRODUCT_CATEGORY_KEY = "product_category"
@@ -60,6 +64,8 @@ BOT_STOPPED_TAG = "#BotStopped"
 BACKUP_CREATED_TAG = "#BackupCreated"
 EVENT_PAYMENT_SUCCEEDED_TAG = "#EventPaymentSucceeded"
 EVENT_PAYMENT_CANCELED_TAG = "#EventPaymentCanceled"
+EVENT_DELIVERY_FAILED_TAG = "#EventDeliveryFailed"
+EVENT_PAYMENT_REFUND_REQUIRED_TAG = "#EventPaymentRefundRequired"
 # endregion
 
 # region: I18n settings
@@ -92,6 +98,20 @@ class TransactionStatus(Enum):
     COMPLETED = "completed"
     CANCELED = "canceled"
     REFUNDED = "refunded"
+    REFUND_PENDING = "refund_pending"
+
+
+class DeliveryStatus(Enum):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    COMPLETED = "completed"
+    DEAD = "dead"
+
+
+class ReservationStatus(Enum):
+    RESERVED = "reserved"
+    COMMITTED = "committed"
+    RELEASED = "released"
 
 
 class Currency(Enum):
@@ -83,6 +83,8 @@ class NavAdminTools(str, Enum):
     PRODUCT_EDIT = "product_edit"
     PRODUCT_DELETE = "product_delete"
     PRODUCT_TOGGLE_STATUS = "product_toggle_status"
+    IMPORT_KEYS = "import_keys"
+    IMPORT_PRODUCTS = "import_products"
 
     INVITE_EDITOR = "invite_editor"
     CREATE_INVITE = "create_invite"
@@ -95,6 +97,7 @@ class NavAdminTools(str, Enum):
 
     PROMOCODE_EDITOR = "promocode_editor"
     CREATE_PROMOCODE = "create_promocode"
+    BULK_CREATE_PROMOCODES = "bulk_create_promocodes"
     DELETE_PROMOCODE = "delete_promocode"
     EDIT_PROMOCODE = "edit_promocode"
 
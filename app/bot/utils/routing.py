@@ -0,0 +1,15 @@
+import weakref
+
+from aiogram import Router
+
+_sessionless_routers: weakref.WeakSet[Router] = weakref.WeakSet()
+
+
+def skip_db_session(router: Router) -> Router:
+    """Mark a router whose handlers never touch the database, so they get no session."""
+    _sessionless_routers.add(router)
+    return router
+
+
+def is_sessionless(router: Router | None) -> bool:
+    return router is not None and router in _sessionless_routers
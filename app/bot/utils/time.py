@@ -12,3 +12,8 @@ def add_days_to_timestamp(timestamp: int, days: int) -> int:
 
 def days_to_timestamp(days: int) -> int:
     return add_days_to_timestamp(get_current_timestamp(), days)
+
+
+def as_utc(value: datetime) -> datetime:
+    # SQLite drops tzinfo on the way back; stored values are always UTC.
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
@@ -2,6 +2,7 @@ import logging
 from dataclasses import dataclass
 from logging.handlers import MemoryHandler
 from pathlib import Path
+from typing import Any
 
 from environs import Env
 from marshmallow.validate import OneOf, Range
@@ -38,6 +39,16 @@ DEFAULT_SHOP_BONUS_DEVICES_COUNT = 1
 DEFAULT_SHOP_PAYMENT_STARS_ENABLED = True
 DEFAULT_SHOP_PAYMENT_CRYPTOMUS_ENABLED = False
 DEFAULT_DB_NAME = "bot_database"
+DEFAULT_DB_WRITE_BUFFER_INTERVAL = 500  # milliseconds
+DEFAULT_DB_POOL_SIZE = 5
+DEFAULT_DB_MAX_OVERFLOW = 10
+DEFAULT_DB_POOL_TIMEOUT = 30
+DEFAULT_DB_READ_POOL_SIZE = 2
+DEFAULT_DB_BUSY_TIMEOUT = 5000  # milliseconds
+DEFAULT_DB_JOURNAL_MODE = "WAL"
+DEFAULT_DB_SYNCHRONOUS = "NORMAL"
+DEFAULT_DB_CACHE_SIZE = -64000  # negative values are KiB, 64 MB
+DEFAULT_DB_MMAP_SIZE = 256 * 1024 * 1024
 
 DEFAULT_REDIS_DB_NAME = "0"
 DEFAULT_REDIS_HOST = "digitalstore-redis"
@@ -46,7 +57,13 @@ DEFAULT_REDIS_PORT = 6379
 # Product configuration defaults
 DEFAULT_PRODUCTS_FILE = DEFAULT_DATA_DIR / "products.json"
 DEFAULT_PRODUCT_CATEGORY = "digital"
+DEFAULT_CATALOG_SOURCE = "file"
+DEFAULT_CATALOG_SNAPSHOT_FILE = DEFAULT_DATA_DIR / "catalog.snapshot"
 DEFAULT_DELIVERY_TIMEOUT = 3600  # 1 hour in seconds
+DEFAULT_DELIVERY_WORKERS = 4
+DEFAULT_DELIVERY_MAX_ATTEMPTS = 5
+DEFAULT_CATALOG_PAGE_SIZE = 8
+DEFAULT_EXPIRY_REMINDER_DAYS = [3, 1]
 DEFAULT_PRODUCT_CATEGORIES = ["software", "gaming", "subscription", "digital", "education"]
 
 DEFAULT_LOG_LEVEL = "DEBUG"
@@ -92,8 +109,14 @@ class ShopConfig:
 @dataclass
 class ProductConfig:
     PRODUCTS_FILE: str
+    CATALOG_SOURCE: str
+    CATALOG_SNAPSHOT_FILE: str
     DEFAULT_CATEGORY: str
     DELIVERY_TIMEOUT: int
+    DELIVERY_WORKERS: int
+    DELIVERY_MAX_ATTEMPTS: int
+    CATALOG_PAGE_SIZE: int
+    EXPIRY_REMINDER_DAYS: list[int]
     PRODUCT_CATEGORIES: list[str]
 
 
@@ -110,12 +133,54 @@ class DatabaseConfig:
     NAME: str
     USERNAME: str | None
     PASSWORD: str | None
+    WRITE_BUFFER_INTERVAL: int = DEFAULT_DB_WRITE_BUFFER_INTERVAL
+    POOL_SIZE: int = DEFAULT_DB_POOL_SIZE
+    MAX_OVERFLOW: int = DEFAULT_DB_MAX_OVERFLOW
+    POOL_TIMEOUT: int = DEFAULT_DB_POOL_TIMEOUT
+    BUSY_TIMEOUT: int = DEFAULT_DB_BUSY_TIMEOUT
+    JOURNAL_MODE: str = DEFAULT_DB_JOURNAL_MODE
+    SYNCHRONOUS: str = DEFAULT_DB_SYNCHRONOUS
+    CACHE_SIZE: int = DEFAULT_DB_CACHE_SIZE
+    MMAP_SIZE: int = DEFAULT_DB_MMAP_SIZE
+    READ_URL: str | None = None
+    READ_POOL_SIZE: int = DEFAULT_DB_READ_POOL_SIZE
 
     def url(self, driver: str = "sqlite+aiosqlite") -> str:
         if driver.startswith("sqlite"):
             return f"{driver}:////{DEFAULT_DATA_DIR}/{self.NAME}.{DB_FORMAT}"
         return f"{driver}://{self.USERNAME}:{self.PASSWORD}@{self.HOST}:{self.PORT}/{self.NAME}"
 
+    def read_url(self) -> str:
+        return self.READ_URL or self.url()
+
+    def engine_options(self, read_only: bool = False) -> dict[str, Any]:
+        return {
+            "pool_pre_ping": True,
+            "pool_size": self.READ_POOL_SIZE if read_only else self.POOL_SIZE,
+            "max_overflow": 0 if read_only else self.MAX_OVERFLOW,
+            "pool_timeout": self.POOL_TIMEOUT,
+        }
+
+    def sqlite_pragmas(self, read_only: bool = False) -> dict[str, str | int]:
+        """Pragmas applied to every new SQLite connection, in order."""
+        if read_only:
+            # The journal mode is a property of the file, set by the writer connections.
+            return {
+                "busy_timeout": self.BUSY_TIMEOUT,
+                "cache_size": self.CACHE_SIZE,
+                "mmap_size": self.MMAP_SIZE,
+                "temp_store": "MEMORY",
+                "query_only": "ON",
+            }
+        return {
+            "journal_mode": self.JOURNAL_MODE,
+            "synchronous": self.SYNCHRONOUS,
+            "busy_timeout": self.BUSY_TIMEOUT,
+            "cache_size": self.CACHE_SIZE,
+            "mmap_size": self.MMAP_SIZE,
+            "temp_store": "MEMORY",
+        }
+
 
 @dataclass
 class RedisConfig:
@@ -267,8 +332,26 @@ def load_config() -> Config:
         ),
         product=ProductConfig(
             PRODUCTS_FILE=env.str("PRODUCTS_FILE", default=str(DEFAULT_PRODUCTS_FILE)),
+            CATALOG_SOURCE=env.str(
+                "CATALOG_SOURCE",
+                default=DEFAULT_CATALOG_SOURCE,
+                validate=OneOf(
+                    ["file", "database"], error="CATALOG_SOURCE must be one of: {choices}"
+                ),
+            ),
+            CATALOG_SNAPSHOT_FILE=env.str(
+                "CATALOG_SNAPSHOT_FILE", default=str(DEFAULT_CATALOG_SNAPSHOT_FILE)
+            ),
             DEFAULT_CATEGORY=env.str("DEFAULT_PRODUCT_CATEGORY", default=DEFAULT_PRODUCT_CATEGORY),
             DELIVERY_TIMEOUT=env.int("DELIVERY_TIMEOUT", default=DEFAULT_DELIVERY_TIMEOUT),
+            DELIVERY_WORKERS=env.int("DELIVERY_WORKERS", default=DEFAULT_DELIVERY_WORKERS),
+            DELIVERY_MAX_ATTEMPTS=env.int(
+                "DELIVERY_MAX_ATTEMPTS", default=DEFAULT_DELIVERY_MAX_ATTEMPTS
+            ),
+            CATALOG_PAGE_SIZE=env.int("CATALOG_PAGE_SIZE", default=DEFAULT_CATALOG_PAGE_SIZE),
+            EXPIRY_REMINDER_DAYS=env.list(
+                "EXPIRY_REMINDER_DAYS", subcast=int, default=DEFAULT_EXPIRY_REMINDER_DAYS
+            ),
             PRODUCT_CATEGORIES=DEFAULT_PRODUCT_CATEGORIES,
         ),
         cryptomus=CryptomusConfig(
@@ -281,6 +364,27 @@ def load_config() -> Config:
             USERNAME=env.str("DB_USERNAME", default=None),
             PASSWORD=env.str("DB_PASSWORD", default=None),
             NAME=env.str("DB_NAME", default=DEFAULT_DB_NAME),
+            WRITE_BUFFER_INTERVAL=env.int(
+                "DB_WRITE_BUFFER_INTERVAL", default=DEFAULT_DB_WRITE_BUFFER_INTERVAL
+            ),
+            POOL_SIZE=env.int("DB_POOL_SIZE", default=DEFAULT_DB_POOL_SIZE),
+            MAX_OVERFLOW=env.int("DB_MAX_OVERFLOW", default=DEFAULT_DB_MAX_OVERFLOW),
+            POOL_TIMEOUT=env.int("DB_POOL_TIMEOUT", default=DEFAULT_DB_POOL_TIMEOUT),
+            BUSY_TIMEOUT=env.int("DB_BUSY_TIMEOUT", default=DEFAULT_DB_BUSY_TIMEOUT),
+            JOURNAL_MODE=env.str(
+                "DB_JOURNAL_MODE",
+                default=DEFAULT_DB_JOURNAL_MODE,
+                validate=OneOf(["WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY", "OFF"]),
+            ),
+            SYNCHRONOUS=env.str(
+                "DB_SYNCHRONOUS",
+                default=DEFAULT_DB_SYNCHRONOUS,
+                validate=OneOf(["OFF", "NORMAL", "FULL", "EXTRA"]),
+            ),
+            CACHE_SIZE=env.int("DB_CACHE_SIZE", default=DEFAULT_DB_CACHE_SIZE),
+            MMAP_SIZE=env.int("DB_MMAP_SIZE", default=DEFAULT_DB_MMAP_SIZE),
+            READ_URL=env.str("DB_READ_URL", default=None),
+            READ_POOL_SIZE=env.int("DB_READ_POOL_SIZE", default=DEFAULT_DB_READ_POOL_SIZE),
         ),
         redis=RedisConfig(
             HOST=env.str("REDIS_HOST", default=DEFAULT_REDIS_HOST),
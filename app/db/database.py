@@ -1,7 +1,13 @@
 import logging
-from typing import Self
+from typing import Any, Self
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 
 from app.config import DatabaseConfig
 
@@ -11,18 +17,58 @@ logger = logging.getLogger(__name__)
 
 
 class Database:
+    """
+    Primary engine for interactive traffic plus a read-only engine for analytics.
+
+    `read_session` binds to `DB_READ_URL` when a replica is configured, otherwise to
+    a small separate pool on the same database (read-only SQLite connections under
+    WAL), so heavy reports never wait for or hold connections of the main pool.
+    """
+
     def __init__(self, config: DatabaseConfig) -> None:
-        self.engine = create_async_engine(
-            url=config.url(),
-            pool_pre_ping=True,
-        )
+        self.engine = self._create_engine(config)
+        self.read_engine = self._create_engine(config, read_only=True)
         self.session = async_sessionmaker(
             bind=self.engine,
             class_=AsyncSession,
             expire_on_commit=False,
         )
+        self.read_session = async_sessionmaker(
+            bind=self.read_engine,
+            class_=AsyncSession,
+            expire_on_commit=False,
+        )
         logger.debug("Database engine and session maker initialized successfully.")
 
+    @staticmethod
+    def _create_engine(config: DatabaseConfig, read_only: bool = False) -> AsyncEngine:
+        url = config.read_url() if read_only else config.url()
+        engine = create_async_engine(url=url, **config.engine_options(read_only))
+        if engine.dialect.name == "sqlite":
+            pragmas = config.sqlite_pragmas(read_only)
+
+            @event.listens_for(engine.sync_engine, "connect")
+            def set_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+                cursor = dbapi_connection.cursor()
+                try:
+                    for name, value in pragmas.items():
+                        cursor.execute(f"PRAGMA {name}={value}")
+                finally:
+                    cursor.close()
+
+            logger.debug(f"SQLite pragmas configured (read only: {read_only}): {pragmas}")
+        return engine
+
+    def pool_status(self, read_only: bool = False) -> dict[str, int]:
+        """Connection pool counters, for monitoring and diagnostics."""
+        pool = (self.read_engine if read_only else self.engine).pool
+        status = {}
+        for name in ("size", "checkedin", "checkedout", "overflow"):
+            counter = getattr(pool, name, None)
+            if callable(counter):
+                status[name] = counter()
+        return status
+
     async def initialize(self) -> Self:
         try:
             async with self.engine.begin() as connection:
@@ -34,9 +80,41 @@ class Database:
         return self
 
     async def close(self) -> None:
+        logger.debug(
+            f"Database pool status before closing: {self.pool_status()}, "
+            f"read pool: {self.pool_status(read_only=True)}"
+        )
         try:
+            await self.read_engine.dispose()
             await self.engine.dispose()
             logger.debug("Database engine closed successfully.")
         except Exception as exception:
             logger.error(f"Error closing database engine: {exception}")
             raise
+
+
+class LazySession:
+    """
+    Stand-in for an `AsyncSession` that only opens the real session on first use.
+
+    Handlers receive it as their `session`; updates whose handler never queries the
+    database never create a session or check out a pooled connection.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker) -> None:
+        self._session_factory = session_factory
+        self._session: AsyncSession | None = None
+
+    @property
+    def started(self) -> bool:
+        return self._session is not None
+
+    def __getattr__(self, name: str) -> Any:
+        if self._session is None:
+            self._session = self._session_factory()
+        return getattr(self._session, name)
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
@@ -0,0 +1,57 @@
+"""Add hot path indexes
+
+Revision ID: 9c4f1e2a7d55
+Revises: 7b2d4e6f8a10
+Create Date: 2026-10-17 19:12:08.417263
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9c4f1e2a7d55"
+down_revision: Union[str, None] = "7b2d4e6f8a10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_transactions_tg_id_status", "transactions", ["tg_id", "status"], unique=False
+    )
+    op.create_index(
+        "ix_transactions_status_created_at", "transactions", ["status", "created_at"], unique=False
+    )
+    op.create_index(
+        "ix_users_source_invite_name", "users", ["source_invite_name"], unique=False
+    )
+    op.create_index(
+        "ix_referrals_referrer_tg_id", "referrals", ["referrer_tg_id"], unique=False
+    )
+    # referrer_rewards is created by `create_all` at startup, not by a migration.
+    if not sa.inspect(op.get_bind()).has_table("referrer_rewards"):
+        return
+    op.create_index(
+        "ix_referrer_rewards_pending_user_tg_id",
+        "referrer_rewards",
+        ["user_tg_id"],
+        unique=False,
+        sqlite_where=sa.text("rewarded_at IS NULL"),
+        postgresql_where=sa.text("rewarded_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("referrer_rewards"):
+        op.drop_index(
+            "ix_referrer_rewards_pending_user_tg_id",
+            table_name="referrer_rewards",
+            if_exists=True,
+        )
+    op.drop_index("ix_referrals_referrer_tg_id", table_name="referrals")
+    op.drop_index("ix_users_source_invite_name", table_name="users")
+    op.drop_index("ix_transactions_status_created_at", table_name="transactions")
+    op.drop_index("ix_transactions_tg_id_status", table_name="transactions")
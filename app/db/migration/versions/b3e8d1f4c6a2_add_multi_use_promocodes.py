@@ -0,0 +1,60 @@
+"""Add multi-use promocodes
+
+Revision ID: b3e8d1f4c6a2
+Revises: 9c4f1e2a7d55
+Create Date: 2026-10-17 21:04:51.902316
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b3e8d1f4c6a2"
+down_revision: Union[str, None] = "9c4f1e2a7d55"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("promocodes", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("max_uses", sa.Integer(), nullable=False, server_default="1")
+        )
+        batch_op.add_column(sa.Column("uses", sa.Integer(), nullable=False, server_default="0"))
+    op.execute("UPDATE promocodes SET uses = 1 WHERE is_activated")
+
+    op.create_table(
+        "promocode_activations",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("promocode_id", sa.Integer(), nullable=False),
+        sa.Column("tg_id", sa.Integer(), nullable=False),
+        sa.Column("activated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["promocode_id"],
+            ["promocodes.id"],
+            name=op.f("fk_promocode_activations_promocode_id_promocodes"),
+            ondelete="CASCADE",
+        ),
+        sa.ForeignKeyConstraint(
+            ["tg_id"], ["users.tg_id"], name=op.f("fk_promocode_activations_tg_id_users")
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_promocode_activations")),
+        sa.UniqueConstraint(
+            "promocode_id", "tg_id", name=op.f("uq_promocode_activations_promocode_id")
+        ),
+    )
+    op.execute(
+        "INSERT INTO promocode_activations (promocode_id, tg_id, activated_at) "
+        "SELECT id, activated_by, CURRENT_TIMESTAMP FROM promocodes "
+        "WHERE is_activated AND activated_by IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("promocode_activations")
+    with op.batch_alter_table("promocodes", schema=None) as batch_op:
+        batch_op.drop_column("uses")
+        batch_op.drop_column("max_uses")
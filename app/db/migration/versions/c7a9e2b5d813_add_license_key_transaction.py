@@ -0,0 +1,32 @@
+"""Add license key transaction
+
+Revision ID: c7a9e2b5d813
+Revises: b3e8d1f4c6a2
+Create Date: 2026-10-18 10:26:37.518204
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c7a9e2b5d813"
+down_revision: Union[str, None] = "b3e8d1f4c6a2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("license_keys", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("transaction_id", sa.Integer(), nullable=True))
+        batch_op.create_index(
+            batch_op.f("ix_license_keys_transaction_id"), ["transaction_id"], unique=False
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("license_keys", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_license_keys_transaction_id"))
+        batch_op.drop_column("transaction_id")
@@ -0,0 +1,38 @@
+"""Add refund pending transaction status
+
+Revision ID: e4b7c1d9a356
+Revises: c7a9e2b5d813
+Create Date: 2026-10-19 09:12:48.304117
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e4b7c1d9a356"
+down_revision: Union[str, None] = "c7a9e2b5d813"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+old_enum = sa.Enum("pending", "completed", "canceled", "refunded", name="transactionstatus")
+new_enum = sa.Enum(
+    "pending", "completed", "canceled", "refunded", "refund_pending", name="transactionstatus"
+)
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("transactions", schema=None) as batch_op:
+        batch_op.alter_column(
+            "status", existing_type=old_enum, type_=new_enum, existing_nullable=False
+        )
+
+
+def downgrade() -> None:
+    op.execute("UPDATE transactions SET status = 'completed' WHERE status = 'refund_pending'")
+    with op.batch_alter_table("transactions", schema=None) as batch_op:
+        batch_op.alter_column(
+            "status", existing_type=new_enum, type_=old_enum, existing_nullable=False
+        )
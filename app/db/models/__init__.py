@@ -1,7 +1,12 @@
 from ._base import Base
+from .delivery_job import DeliveryJob
 from .invite import Invite
-from .promocode import Promocode
+from .license_key import LicenseKey
+from .product import Product
+from .product_subscription import ProductSubscription
+from .promocode import Promocode, PromocodeActivation
 from .referral import Referral
 from .referrer_reward import ReferrerReward
+from .stock import ProductStock, StockReservation
 from .transaction import Transaction
 from .user import User
@@ -1,4 +1,8 @@
-from sqlalchemy import MetaData
+from typing import Any, TypeVar
+
+from sqlalchemy import MetaData, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base(
@@ -12,3 +16,35 @@ Base = declarative_base(
         }
     )
 )
+
+ModelT = TypeVar("ModelT")
+
+
+def dialect_insert(session: AsyncSession, model: type[ModelT]) -> Any:
+    """`INSERT` construct of the session's dialect, for `ON CONFLICT` clauses."""
+    dialect = session.get_bind().dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    return insert(model)
+
+
+async def update_returning(
+    session: AsyncSession,
+    model: type[ModelT],
+    *where: Any,
+    commit: bool = True,
+    **values: Any,
+) -> ModelT | None:
+    """
+    Applies `values` to the row matching `where` in one `UPDATE ... RETURNING` and commits.
+
+    Returns the updated row, or None when no row matched. Extra conditions in `where`
+    make the update a conditional state transition that needs no prior read. With
+    `commit=False` the update stays in the caller's transaction.
+    """
+    row = await session.scalar(
+        update(model).where(*where).values(**values).returning(model),
+        execution_options={"populate_existing": True},
+    )
+    if commit:
+        await session.commit()
+    return row
@@ -0,0 +1,146 @@
+import logging
+from datetime import datetime
+from typing import Any, Self
+
+from sqlalchemy import JSON, Index, String, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.types import Enum
+
+from app.bot.utils.constants import DeliveryStatus
+
+from . import Base
+
+logger = logging.getLogger(__name__)
+
+
+class DeliveryJob(Base):
+    """
+    Represents a queued product delivery.
+
+    Attributes:
+        id (int): Unique primary key for the job.
+        tg_id (int): Telegram user ID the product is delivered to.
+        transaction_id (int | None): Paying transaction, unique to keep enqueueing idempotent.
+        payload (dict): Product and subscription data needed to perform the delivery.
+        status (DeliveryStatus): Pending, processing, completed or dead (out of attempts).
+        attempts (int): Number of started delivery attempts.
+        next_attempt_at (datetime): Earliest time the job may be picked up.
+        last_error (str | None): Error of the last failed attempt.
+        result (dict | None): Delivery info returned by a successful attempt.
+        created_at (datetime): Timestamp when the job was enqueued.
+        started_at (datetime | None): Timestamp when the last attempt started.
+        completed_at (datetime | None): Timestamp when the job completed.
+    """
+
+    __tablename__ = "delivery_jobs"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    tg_id: Mapped[int] = mapped_column(nullable=False)
+    transaction_id: Mapped[int | None] = mapped_column(unique=True, nullable=True)
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+    status: Mapped[DeliveryStatus] = mapped_column(
+        Enum(DeliveryStatus, values_callable=lambda obj: [e.value for e in obj]),
+        default=DeliveryStatus.PENDING,
+        nullable=False,
+    )
+    attempts: Mapped[int] = mapped_column(default=0, nullable=False)
+    next_attempt_at: Mapped[datetime] = mapped_column(default=func.now(), nullable=False)
+    last_error: Mapped[str | None] = mapped_column(String(length=512), nullable=True)
+    result: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(default=func.now(), nullable=False)
+    started_at: Mapped[datetime | None] = mapped_column(nullable=True)
+    completed_at: Mapped[datetime | None] = mapped_column(nullable=True)
+
+    __table_args__ = (
+        Index("ix_delivery_jobs_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<DeliveryJob(id={self.id}, tg_id={self.tg_id}, status='{self.status}', "
+            f"attempts={self.attempts}, next_attempt_at={self.next_attempt_at})>"
+        )
+
+    @classmethod
+    async def create(cls, session: AsyncSession, tg_id: int, **kwargs: Any) -> Self | None:
+        job = DeliveryJob(tg_id=tg_id, **kwargs)
+        session.add(job)
+
+        try:
+            await session.commit()
+            logger.debug(f"Delivery job {job.id} created for user {tg_id}.")
+            return job
+        except IntegrityError as exception:
+            await session.rollback()
+            logger.warning(f"Delivery job for user {tg_id} already exists: {exception}")
+            return None
+
+    @classmethod
+    async def claim_next(cls, session: AsyncSession, now: datetime) -> Self | None:
+        """Atomically moves the next due pending job to PROCESSING and returns it."""
+        candidate = (
+            select(DeliveryJob.id)
+            .where(
+                DeliveryJob.status == DeliveryStatus.PENDING,
+                DeliveryJob.next_attempt_at <= now,
+            )
+            .order_by(DeliveryJob.next_attempt_at, DeliveryJob.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = await session.execute(
+            update(DeliveryJob)
+            .where(DeliveryJob.id == candidate, DeliveryJob.status == DeliveryStatus.PENDING)
+            .values(
+                status=DeliveryStatus.PROCESSING,
+                attempts=DeliveryJob.attempts + 1,
+                started_at=now,
+            )
+            .returning(DeliveryJob)
+            .execution_options(synchronize_session=False)
+        )
+        job = result.scalar_one_or_none()
+        await session.commit()
+        return job
+
+    @classmethod
+    async def finish(cls, session: AsyncSession, job_id: int, **kwargs: Any) -> None:
+        await session.execute(
+            update(DeliveryJob)
+            .where(DeliveryJob.id == job_id, DeliveryJob.status == DeliveryStatus.PROCESSING)
+            .values(**kwargs)
+        )
+        await session.commit()
+
+    @classmethod
+    async def requeue_stale(cls, session: AsyncSession, started_before: datetime) -> int:
+        """Returns jobs left in PROCESSING by a crashed worker to the queue."""
+        result = await session.execute(
+            update(DeliveryJob)
+            .where(
+                DeliveryJob.status == DeliveryStatus.PROCESSING,
+                DeliveryJob.started_at <= started_before,
+            )
+            .values(status=DeliveryStatus.PENDING)
+        )
+        await session.commit()
+        return result.rowcount
+
+    @classmethod
+    async def count_by_status(cls, session: AsyncSession) -> dict[DeliveryStatus, int]:
+        query = await session.execute(
+            select(DeliveryJob.status, func.count(DeliveryJob.id)).group_by(DeliveryJob.status)
+        )
+        return dict(query.all())
+
+    @classmethod
+    async def oldest_pending(cls, session: AsyncSession) -> datetime | None:
+        query = await session.execute(
+            select(func.min(DeliveryJob.created_at)).where(
+                DeliveryJob.status == DeliveryStatus.PENDING
+            )
+        )
+        return query.scalar()
@@ -2,7 +2,7 @@ import logging
 from datetime import datetime
 from typing import Optional, Self
 
-from sqlalchemy import Boolean, DateTime, Integer, String, select
+from sqlalchemy import Boolean, DateTime, Integer, String, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -48,8 +48,14 @@ class Invite(Base):
         return list(result.scalars().all())
 
     @classmethod
-    async def increment_clicks(cls, session: AsyncSession, invite_id: int) -> None:
-        invite = await session.get(cls, invite_id)
-        if invite:
-            invite.clicks += 1
-            await session.commit()
+    async def increment_clicks(cls, session: AsyncSession, invite_id: int, by: int = 1) -> None:
+        await cls.add_clicks(session=session, clicks={invite_id: by})
+
+    @classmethod
+    async def add_clicks(cls, session: AsyncSession, clicks: dict[int, int]) -> None:
+        """Adds counted clicks per invite id in one transaction, without reading the rows."""
+        for invite_id, count in clicks.items():
+            await session.execute(
+                update(cls).where(cls.id == invite_id).values(clicks=cls.clicks + count)
+            )
+        await session.commit()
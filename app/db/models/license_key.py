@@ -0,0 +1,136 @@
+import logging
+from datetime import datetime
+from typing import Self
+
+from sqlalchemy import Index, String, UniqueConstraint, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Mapped, mapped_column
+
+from . import Base
+
+logger = logging.getLogger(__name__)
+
+
+class LicenseKey(Base):
+    """
+    Represents a vendor license key held in stock for a catalog product.
+
+    Attributes:
+        id (int): Unique primary key for the key.
+        product_id (str): Catalog product the key belongs to.
+        key (str): License key value, unique per product.
+        tg_id (int | None): Telegram user ID the key was delivered to.
+        claimed_at (datetime | None): Timestamp when the key was delivered.
+        transaction_id (int | None): Purchase the key was claimed for.
+        created_at (datetime): Timestamp when the key was imported.
+    """
+
+    __tablename__ = "license_keys"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    product_id: Mapped[str] = mapped_column(String(length=64), nullable=False)
+    key: Mapped[str] = mapped_column(String(length=255), nullable=False)
+    tg_id: Mapped[int | None] = mapped_column(nullable=True)
+    claimed_at: Mapped[datetime | None] = mapped_column(nullable=True)
+    transaction_id: Mapped[int | None] = mapped_column(nullable=True, index=True)
+    created_at: Mapped[datetime] = mapped_column(default=func.now(), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("product_id", "key", name="uq_license_keys_product_id_key"),
+        # Unclaimed keys of a product are the leading range of this index.
+        Index("ix_license_keys_product_id_claimed_at", "product_id", "claimed_at"),
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<LicenseKey(id={self.id}, product_id='{self.product_id}', "
+            f"tg_id={self.tg_id}, claimed_at={self.claimed_at})>"
+        )
+
+    @classmethod
+    async def claim(
+        cls,
+        session: AsyncSession,
+        product_id: str,
+        tg_id: int,
+        transaction_id: int | None = None,
+    ) -> str | None:
+        """
+        Atomically assigns the oldest unclaimed key of a product to a user.
+
+        The single UPDATE ... RETURNING re-checks `claimed_at`, so two concurrent claims
+        can never receive the same key. A claim for a transaction that already holds a
+        key returns that key, so retried deliveries do not consume more keys.
+        """
+        if transaction_id is not None:
+            query = await session.execute(
+                select(LicenseKey.key).where(
+                    LicenseKey.product_id == product_id,
+                    LicenseKey.transaction_id == transaction_id,
+                )
+            )
+            key = query.scalars().first()
+            if key:
+                return key
+
+        candidate = (
+            select(LicenseKey.id)
+            .where(LicenseKey.product_id == product_id, LicenseKey.claimed_at.is_(None))
+            .order_by(LicenseKey.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = await session.execute(
+            update(LicenseKey)
+            .where(LicenseKey.id == candidate, LicenseKey.claimed_at.is_(None))
+            .values(tg_id=tg_id, claimed_at=func.now(), transaction_id=transaction_id)
+            .returning(LicenseKey.key)
+            .execution_options(synchronize_session=False)
+        )
+        key = result.scalar_one_or_none()
+        await session.commit()
+
+        if key:
+            logger.debug(f"License key for product {product_id} claimed by user {tg_id}.")
+        return key
+
+    @classmethod
+    async def release(cls, session: AsyncSession, product_id: str, key: str) -> bool:
+        """Returns an undelivered key to the pool."""
+        result = await session.execute(
+            update(LicenseKey)
+            .where(LicenseKey.product_id == product_id, LicenseKey.key == key)
+            .values(tg_id=None, claimed_at=None, transaction_id=None)
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+        return result.rowcount == 1
+
+    @classmethod
+    async def add_batch(cls, session: AsyncSession, product_id: str, keys: set[str]) -> int:
+        """Inserts keys not yet stored for the product. Does not commit."""
+        query = await session.execute(
+            select(LicenseKey.key).where(
+                LicenseKey.product_id == product_id, LicenseKey.key.in_(keys)
+            )
+        )
+        new_keys = keys - set(query.scalars().all())
+
+        if new_keys:
+            await session.execute(
+                insert(LicenseKey),
+                [{"product_id": product_id, "key": key} for key in new_keys],
+            )
+        return len(new_keys)
+
+    @classmethod
+    async def count(
+        cls, session: AsyncSession, product_id: str, available_only: bool = False
+    ) -> int:
+        filters = [LicenseKey.product_id == product_id]
+        if available_only:
+            filters.append(LicenseKey.claimed_at.is_(None))
+
+        query = await session.execute(select(func.count(LicenseKey.id)).where(*filters))
+        return query.scalar() or 0
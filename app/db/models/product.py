@@ -0,0 +1,138 @@
+import logging
+from datetime import datetime
+from typing import Any, Self
+
+from sqlalchemy import JSON, String, Text, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Mapped, mapped_column
+
+from . import Base
+
+logger = logging.getLogger(__name__)
+
+# Catalog fields stored in dedicated columns; everything else lives in `attributes`.
+PRICE_FIELDS = ("price", "prices")
+COLUMN_FIELDS = (
+    "id",
+    "name",
+    "description",
+    "category",
+    "stock",
+    "is_active",
+    "delivery_type",
+    "delivery_config",
+) + PRICE_FIELDS
+
+
+class Product(Base):
+    """
+    Represents a catalog product.
+
+    Attributes:
+        id (str): Catalog product ID.
+        name (str): Display name.
+        description (str | None): Product description.
+        category (str): Catalog category the product is listed in.
+        price_data (dict): Pricing, either `{"price": {...}}` or `{"prices": {CUR: {days: amount}}}`.
+        stock_quantity (int): Units in stock, -1 for unlimited.
+        is_active (bool): Whether the product is offered.
+        delivery_type (str): How the product is delivered.
+        delivery_config (dict | None): Delivery template and settings.
+        attributes (dict): Remaining catalog fields (features, localized names, ...).
+        position (int): Listing order within the catalog.
+        created_at (datetime): Timestamp when the product was created.
+        updated_at (datetime): Timestamp of the last change.
+    """
+
+    __tablename__ = "products"
+
+    id: Mapped[str] = mapped_column(String(length=64), primary_key=True)
+    name: Mapped[str] = mapped_column(String(length=255), nullable=False)
+    description: Mapped[str | None] = mapped_column(Text, nullable=True)
+    category: Mapped[str] = mapped_column(String(length=100), index=True, nullable=False)
+    price_data: Mapped[dict] = mapped_column(JSON, nullable=False)
+    stock_quantity: Mapped[int] = mapped_column(default=-1, nullable=False)
+    is_active: Mapped[bool] = mapped_column(default=True, index=True, nullable=False)
+    delivery_type: Mapped[str] = mapped_column(
+        String(length=50), default="digital", nullable=False
+    )
+    delivery_config: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    attributes: Mapped[dict] = mapped_column(JSON, default=dict, nullable=False)
+    position: Mapped[int] = mapped_column(default=0, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(default=func.now(), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(default=func.now(), nullable=False)
+
+    def __repr__(self) -> str:
+        return (
+            f"<Product(id='{self.id}', name='{self.name}', category='{self.category}', "
+            f"is_active={self.is_active})>"
+        )
+
+    @staticmethod
+    def values_from_catalog(item: dict[str, Any], position: int = 0) -> dict[str, Any]:
+        """Map a products.json entry to column values."""
+        stock = item.get("stock")
+        return {
+            "id": str(item["id"]),
+            "name": str(item.get("name", "")),
+            "description": item.get("description"),
+            "category": str(item.get("category", "")).lower(),
+            "price_data": {field: item[field] for field in PRICE_FIELDS if field in item},
+            "stock_quantity": stock if isinstance(stock, int) and stock >= 0 else -1,
+            "is_active": bool(item.get("is_active", True)),
+            "delivery_type": item.get("delivery_type", "digital"),
+            "delivery_config": item.get("delivery_config"),
+            "attributes": {k: v for k, v in item.items() if k not in COLUMN_FIELDS},
+            "position": position,
+        }
+
+    def to_catalog(self) -> dict[str, Any]:
+        """Rebuild the products.json shape the catalog snapshot works with."""
+        item = {
+            **(self.attributes or {}),
+            "id": self.id,
+            "name": self.name,
+            "description": self.description or "",
+            "category": self.category,
+            "is_active": self.is_active,
+            "delivery_type": self.delivery_type,
+            **(self.price_data or {}),
+        }
+        if self.delivery_config is not None:
+            item["delivery_config"] = self.delivery_config
+        if self.stock_quantity >= 0:
+            item["stock"] = self.stock_quantity
+        return item
+
+    @classmethod
+    async def get_all(cls, session: AsyncSession) -> list[Self]:
+        query = await session.execute(select(Product).order_by(Product.position, Product.id))
+        return query.scalars().all()
+
+    @classmethod
+    async def get_state(cls, session: AsyncSession) -> tuple[int, datetime | None]:
+        """Row count and last change time, a cheap probe for catalog changes."""
+        query = await session.execute(
+            select(func.count(Product.id), func.max(Product.updated_at))
+        )
+        count, updated_at = query.one()
+        return count, updated_at
+
+    @classmethod
+    async def upsert_batch(
+        cls, session: AsyncSession, rows: list[dict[str, Any]], updated_at: datetime
+    ) -> tuple[int, int]:
+        """Inserts new products and updates existing ones by ID. Does not commit."""
+        query = await session.execute(
+            select(Product.id).where(Product.id.in_([row["id"] for row in rows]))
+        )
+        existing = set(query.scalars().all())
+        new_rows = [{**row, "updated_at": updated_at} for row in rows if row["id"] not in existing]
+        changed_rows = [{**row, "updated_at": updated_at} for row in rows if row["id"] in existing]
+
+        if new_rows:
+            await session.execute(insert(Product), new_rows)
+        if changed_rows:
+            # Bulk UPDATE by primary key
+            await session.execute(update(Product), changed_rows)
+        return len(new_rows), len(changed_rows)
@@ -0,0 +1,177 @@
+import logging
+from datetime import datetime
+from typing import Any, Self
+
+from sqlalchemy import JSON, ForeignKey, Index, String, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Mapped, mapped_column
+
+from . import Base
+from .user import User
+
+logger = logging.getLogger(__name__)
+
+
+class ProductSubscription(Base):
+    """
+    Represents a digital product subscription granted to a user.
+
+    Attributes:
+        id (int): Unique primary key for the subscription.
+        tg_id (int): Telegram user ID of the subscription owner.
+        product_id (str): Catalog product ID (or generated gift/bonus ID).
+        product_name (str): Product name at the time of delivery.
+        category (str): Product category.
+        start_date (datetime): Timestamp when the subscription started.
+        expire_date (datetime): Timestamp when the subscription expires.
+        is_trial (bool): Whether the subscription is a trial.
+        is_gift (bool): Whether the subscription was gifted.
+        is_bonus (bool): Whether the subscription was created from bonus days.
+        bonus_days_added (int): Total bonus days added to the subscription.
+        transaction_id (int | None): Transaction that paid for the subscription.
+        delivery_info (dict | None): Delivery payload returned to the user.
+        created_at (datetime): Timestamp when the record was created.
+        last_bonus_at (datetime | None): Timestamp of the last bonus extension.
+        reminded_days (int | None): Smallest "expires in N days" reminder already sent.
+        expired_at (datetime | None): Timestamp when the subscription was marked expired.
+    """
+
+    __tablename__ = "product_subscriptions"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    tg_id: Mapped[int] = mapped_column(
+        ForeignKey("users.tg_id", ondelete="CASCADE"), nullable=False
+    )
+    product_id: Mapped[str] = mapped_column(String(length=64), nullable=False)
+    product_name: Mapped[str] = mapped_column(String(length=128), nullable=False)
+    category: Mapped[str | None] = mapped_column(String(length=32), nullable=True)
+    start_date: Mapped[datetime] = mapped_column(nullable=False)
+    expire_date: Mapped[datetime] = mapped_column(nullable=False, index=True)
+    is_trial: Mapped[bool] = mapped_column(default=False, nullable=False)
+    is_gift: Mapped[bool] = mapped_column(default=False, nullable=False)
+    is_bonus: Mapped[bool] = mapped_column(default=False, nullable=False)
+    bonus_days_added: Mapped[int] = mapped_column(default=0, nullable=False)
+    transaction_id: Mapped[int | None] = mapped_column(nullable=True)
+    delivery_info: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(default=func.now(), nullable=False)
+    last_bonus_at: Mapped[datetime | None] = mapped_column(nullable=True)
+    reminded_days: Mapped[int | None] = mapped_column(nullable=True)
+    expired_at: Mapped[datetime | None] = mapped_column(nullable=True)
+
+    # Leading tg_id serves per-user lookups, expire_date orders them newest first.
+    # Leading expired_at limits the expiry scan to subscriptions not yet expired.
+    __table_args__ = (
+        Index("ix_product_subscriptions_tg_id_expire_date", "tg_id", "expire_date"),
+        Index("ix_product_subscriptions_expired_at_expire_date", "expired_at", "expire_date"),
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<ProductSubscription(id={self.id}, tg_id={self.tg_id}, "
+            f"product_id='{self.product_id}', expire_date={self.expire_date}, "
+            f"is_trial={self.is_trial}, is_gift={self.is_gift}, is_bonus={self.is_bonus})>"
+        )
+
+    @classmethod
+    async def get_current(cls, session: AsyncSession, tg_id: int) -> Self | None:
+        query = await session.execute(
+            select(ProductSubscription)
+            .where(ProductSubscription.tg_id == tg_id)
+            .order_by(ProductSubscription.expire_date.desc(), ProductSubscription.id.desc())
+            .limit(1)
+        )
+        return query.scalar_one_or_none()
+
+    @classmethod
+    async def create(cls, session: AsyncSession, tg_id: int, **kwargs: Any) -> Self:
+        subscription = ProductSubscription(tg_id=tg_id, **kwargs)
+        session.add(subscription)
+        await session.commit()
+        logger.debug(
+            f"Product subscription {subscription.id} created for user {tg_id} "
+            f"until {subscription.expire_date}."
+        )
+        return subscription
+
+    @classmethod
+    async def extend(
+        cls, session: AsyncSession, subscription_id: int, expire_date: datetime, bonus_days: int = 0
+    ) -> None:
+        # A new expiry date starts a new reminder cycle.
+        values: dict[str, Any] = {
+            "expire_date": expire_date,
+            "reminded_days": None,
+            "expired_at": None,
+        }
+        if bonus_days:
+            values["bonus_days_added"] = ProductSubscription.bonus_days_added + bonus_days
+            values["last_bonus_at"] = func.now()
+
+        await session.execute(
+            update(ProductSubscription)
+            .where(ProductSubscription.id == subscription_id)
+            .values(**values)
+        )
+        await session.commit()
+        logger.debug(f"Product subscription {subscription_id} extended until {expire_date}.")
+
+    @classmethod
+    async def get_expiring(cls, session: AsyncSession, until: datetime) -> list[Self]:
+        """Subscriptions not yet marked expired that expire before `until`."""
+        query = await session.execute(
+            select(ProductSubscription)
+            .where(
+                ProductSubscription.expired_at.is_(None),
+                ProductSubscription.expire_date <= until,
+            )
+            .order_by(ProductSubscription.expire_date)
+        )
+        return query.scalars().all()
+
+    @classmethod
+    async def get_with_locale(
+        cls, session: AsyncSession, subscription_ids: list[int]
+    ) -> list[tuple[Self, str]]:
+        """Subscriptions by ID together with their owner's language code."""
+        query = await session.execute(
+            select(ProductSubscription, User.language_code)
+            .join(User, User.tg_id == ProductSubscription.tg_id)
+            .where(ProductSubscription.id.in_(subscription_ids))
+        )
+        return [tuple(row) for row in query.all()]
+
+    @classmethod
+    async def mark_reminded(
+        cls, session: AsyncSession, subscription_ids: list[int], days: int
+    ) -> int:
+        query = await session.execute(
+            update(ProductSubscription)
+            .where(
+                ProductSubscription.id.in_(subscription_ids),
+                or_(
+                    ProductSubscription.reminded_days.is_(None),
+                    ProductSubscription.reminded_days > days,
+                ),
+            )
+            .values(reminded_days=days)
+        )
+        await session.commit()
+        return query.rowcount
+
+    @classmethod
+    async def mark_expired(
+        cls, session: AsyncSession, subscription_ids: list[int], now: datetime
+    ) -> int:
+        """Marks subscriptions expired unless they were extended in the meantime."""
+        query = await session.execute(
+            update(ProductSubscription)
+            .where(
+                ProductSubscription.id.in_(subscription_ids),
+                ProductSubscription.expired_at.is_(None),
+                ProductSubscription.expire_date <= now,
+            )
+            .values(expired_at=now)
+        )
+        await session.commit()
+        logger.debug(f"Marked {query.rowcount} product subscriptions expired.")
+        return query.rowcount
@@ -10,6 +10,7 @@ from sqlalchemy.orm import Mapped, mapped_column, relationship, selectinload
 from app.bot.utils.misc import generate_code
 
 from . import Base
+from ._base import dialect_insert, update_returning
 
 logger = logging.getLogger(__name__)
 
@@ -22,10 +23,13 @@ class Promocode(Base):
         id (int): Unique identifier (primary key)
         code (str): Unique promocode value (8 characters max)
         duration (int): Associated subscription duration in days
-        is_activated (bool): Flag indicating activation status
-        activated_by (int | None): Telegram ID of activating user
+        is_activated (bool): Whether the promocode is used up
+        activated_by (int | None): Telegram ID of the user who redeemed it last
+        max_uses (int): How many users can redeem the promocode
+        uses (int): How many users have redeemed it
         created_at (datetime): Timestamp of creation
         activated_user (User | None): Relationship to User model
+        activations (list[PromocodeActivation]): Redemptions, one per user
     """
 
     __tablename__ = "promocodes"
@@ -35,16 +39,21 @@ class Promocode(Base):
     duration: Mapped[int] = mapped_column(nullable=False)
     is_activated: Mapped[bool] = mapped_column(default=False, nullable=False)
     activated_by: Mapped[int | None] = mapped_column(ForeignKey("users.tg_id"), nullable=True)
+    max_uses: Mapped[int] = mapped_column(default=1, nullable=False)
+    uses: Mapped[int] = mapped_column(default=0, nullable=False)
     created_at: Mapped[datetime] = mapped_column(default=func.now(), nullable=False)
     activated_user: Mapped["User | None"] = relationship(  # type: ignore
         "User", back_populates="activated_promocodes"
     )
+    activations: Mapped[list["PromocodeActivation"]] = relationship(
+        back_populates="promocode", cascade="all, delete-orphan", passive_deletes=True
+    )
 
     def __repr__(self) -> str:
         return (
             f"<Promocode(id={self.id}, code='{self.code}', duration={self.duration}, "
             f"is_activated={self.is_activated}, activated_by={self.activated_by}, "
-            f"created_at={self.created_at})>"
+            f"uses={self.uses}/{self.max_uses}, created_at={self.created_at})>"
         )
 
     @classmethod
@@ -75,21 +84,64 @@ class Promocode(Base):
             logger.error(f"Error occurred while creating promocode {promocode.code}: {exception}")
             return None
 
+    @classmethod
+    async def create_batch(
+        cls,
+        session: AsyncSession,
+        count: int,
+        duration: int,
+        max_uses: int = 1,
+        batch_size: int = 1000,
+    ) -> list[str]:
+        """
+        Creates up to `count` promocodes of the same duration and returns their codes.
+
+        Codes are deduplicated in memory and inserted `batch_size` rows per statement
+        with `ON CONFLICT DO NOTHING`; codes that collide with existing ones are
+        replaced in a single retry pass.
+        """
+        created: list[str] = []
+        seen: set[str] = set()
+
+        for attempt in range(2):
+            codes = []
+            while len(codes) < count - len(created):
+                code = generate_code()
+                if code not in seen:
+                    seen.add(code)
+                    codes.append(code)
+
+            for start in range(0, len(codes), batch_size):
+                batch = codes[start : start + batch_size]
+                rows = [
+                    {"code": code, "duration": duration, "max_uses": max_uses} for code in batch
+                ]
+                inserted = await session.scalars(
+                    dialect_insert(session, Promocode)
+                    .values(rows)
+                    .on_conflict_do_nothing(index_elements=[Promocode.code])
+                    .returning(Promocode.code)
+                )
+                created.extend(inserted)
+            await session.commit()
+
+            if len(created) >= count:
+                break
+
+        if len(created) < count:
+            logger.warning(f"Created {len(created)} of {count} requested promocodes.")
+        logger.info(f"Created {len(created)} promocodes for {duration} days.")
+        return created
+
     @classmethod
     async def update(cls, session: AsyncSession, code: str, **kwargs: Any) -> Self | None:
-        promocode = await Promocode.get(session=session, code=code)
+        filter = [Promocode.code == code]
+        promocode = await update_returning(session, Promocode, *filter, **kwargs)
 
         if not promocode:
             logger.warning(f"Promocode {code} not found for update.")
             return None
 
-        # if promocode.is_activated:
-        #     logger.warning(f"Promocode {code} is activated and cannot be updated.")
-        #     return None
-
-        filter = [Promocode.code == code]
-        await session.execute(update(Promocode).where(*filter).values(**kwargs))
-        await session.commit()
         logger.info(f"Promocode {code} updated.")
         return promocode
 
@@ -98,6 +150,9 @@ class Promocode(Base):
         promocode = await Promocode.get(session=session, code=code)
 
         if promocode:
+            await session.execute(
+                delete(PromocodeActivation).where(PromocodeActivation.promocode_id == promocode.id)
+            )
             await session.delete(promocode)
             await session.commit()
             logger.info(f"Promocode {code} deleted.")
@@ -107,31 +162,125 @@ class Promocode(Base):
         return False
 
     @classmethod
-    async def set_activated(cls, session: AsyncSession, code: str, user_id: int) -> bool:
-        promocode = await Promocode.get(session=session, code=code)
+    async def redeem(cls, session: AsyncSession, code: str, user_id: int) -> Self | None:
+        """
+        Redeems the promocode for a user and commits.
+
+        The usage counter is taken with a conditional `UPDATE ... RETURNING` and the
+        redemption row is unique per user, both in one transaction, so concurrent
+        redemptions can neither exceed `max_uses` nor grant one user twice.
+
+        Returns:
+            Promocode | None: The redeemed promocode, or None if it does not exist, is
+            used up or was already redeemed by this user.
+        """
+        promocode = await update_returning(
+            session,
+            Promocode,
+            Promocode.code == code,
+            Promocode.uses < Promocode.max_uses,
+            commit=False,
+            uses=Promocode.uses + 1,
+            is_activated=Promocode.uses + 1 >= Promocode.max_uses,
+            activated_by=user_id,
+        )
 
         if not promocode:
-            logger.warning(f"Promocode {code} not found for activation.")
-            return False
+            await session.commit()
+            logger.warning(f"Promocode {code} not found or used up.")
+            return None
 
-        if promocode.is_activated:
-            logger.warning(f"Promocode {code} is already activated.")
+        session.add(PromocodeActivation(promocode_id=promocode.id, tg_id=user_id))
+        try:
+            await session.commit()
+        except IntegrityError:
+            await session.rollback()
+            logger.warning(f"Promocode {code} already redeemed by {user_id}.")
+            return None
+
+        logger.info(
+            f"Promocode {code} redeemed by {user_id} ({promocode.uses}/{promocode.max_uses})."
+        )
+        return promocode
+
+    @classmethod
+    async def release(cls, session: AsyncSession, code: str, user_id: int) -> bool:
+        """
+        Reverts a user's redemption, e.g. when granting its bonus failed, and commits.
+
+        The usage counter is only given back when the user's redemption row is deleted,
+        so releasing a code the user never redeemed, or releasing it twice, changes
+        nothing. `activated_by` falls back to the previous redeemer, if any.
+        """
+        promocode_id = select(Promocode.id).where(Promocode.code == code).scalar_subquery()
+        result = await session.execute(
+            delete(PromocodeActivation).where(
+                PromocodeActivation.promocode_id == promocode_id,
+                PromocodeActivation.tg_id == user_id,
+            )
+        )
+        if not result.rowcount:
+            await session.commit()
+            logger.warning(f"Promocode {code} was not redeemed by {user_id}, nothing to release.")
             return False
 
-        await Promocode.update(session=session, code=code, is_activated=True, activated_by=user_id)
+        last_redeemer = (
+            select(PromocodeActivation.tg_id)
+            .where(PromocodeActivation.promocode_id == Promocode.id)
+            .order_by(PromocodeActivation.id.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+        await update_returning(
+            session,
+            Promocode,
+            Promocode.code == code,
+            Promocode.uses > 0,
+            commit=False,
+            uses=Promocode.uses - 1,
+            is_activated=False,
+            activated_by=last_redeemer,
+        )
+        await session.commit()
+        logger.info(f"Promocode {code} released for {user_id}.")
         return True
 
     @classmethod
-    async def set_deactivated(cls, session: AsyncSession, code: str) -> bool:
-        promocode = await Promocode.get(session=session, code=code)
+    async def get_all_codes(cls, session: AsyncSession, after_id: int = 0) -> list[tuple[int, str]]:
+        """(id, code) pairs of promocodes with an id above `after_id`, in id order."""
+        query = await session.execute(
+            select(Promocode.id, Promocode.code)
+            .where(Promocode.id > after_id)
+            .order_by(Promocode.id)
+        )
+        return [(row.id, row.code) for row in query]
 
-        if not promocode:
-            logger.warning(f"Promocode {code} not found for deactivation.")
-            return False
 
-        if not promocode.is_activated:
-            logger.warning(f"Promocode {code} is already deactivated.")
-            return False
+class PromocodeActivation(Base):
+    """
+    A redemption of a promocode by a user; each user redeems a promocode at most once.
 
-        await Promocode.update(session=session, code=code, is_activated=False, activated_by=None)
-        return True
+    Attributes:
+        id (int): Unique identifier (primary key)
+        promocode_id (int): Redeemed promocode
+        tg_id (int): Telegram ID of the redeeming user
+        activated_at (datetime): Timestamp of the redemption
+    """
+
+    __tablename__ = "promocode_activations"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    promocode_id: Mapped[int] = mapped_column(
+        ForeignKey("promocodes.id", ondelete="CASCADE"), nullable=False
+    )
+    tg_id: Mapped[int] = mapped_column(ForeignKey("users.tg_id"), nullable=False)
+    activated_at: Mapped[datetime] = mapped_column(default=func.now(), nullable=False)
+    promocode: Mapped[Promocode] = relationship(back_populates="activations")
+
+    __table_args__ = (UniqueConstraint("promocode_id", "tg_id"),)
+
+    def __repr__(self) -> str:
+        return (
+            f"<PromocodeActivation(id={self.id}, promocode_id={self.promocode_id}, "
+            f"tg_id={self.tg_id}, activated_at={self.activated_at})>"
+        )
@@ -34,7 +34,7 @@ class Referral(Base):
         ForeignKey("users.tg_id", ondelete="CASCADE"), unique=True, nullable=False
     )
     referrer_tg_id: Mapped[int] = mapped_column(
-        ForeignKey("users.tg_id", ondelete="CASCADE"), nullable=False
+        ForeignKey("users.tg_id", ondelete="CASCADE"), nullable=False, index=True
     )
     created_at: Mapped[datetime] = mapped_column(default=func.now(), nullable=False)
     referred_rewarded_at: Mapped[datetime | None] = mapped_column(nullable=True)
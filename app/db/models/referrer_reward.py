@@ -6,11 +6,13 @@ from typing import Self
 from sqlalchemy import (
     Enum,
     ForeignKey,
+    Index,
     Numeric,
     String,
     UniqueConstraint,
     func,
     select,
+    text,
     update,
 )
 from sqlalchemy.exc import IntegrityError
@@ -55,7 +57,16 @@ class ReferrerReward(Base):
     rewarded_at: Mapped[datetime | None] = mapped_column(nullable=True)
     payment_id: Mapped[str] = mapped_column(String(length=64), nullable=False)
 
-    __table_args__ = (UniqueConstraint("user_tg_id", "payment_id", name="uq_user_payment"),)
+    __table_args__ = (
+        UniqueConstraint("user_tg_id", "payment_id", name="uq_user_payment"),
+        # Partial index: only pending rewards are indexed, the processed bulk is not.
+        Index(
+            "ix_referrer_rewards_pending_user_tg_id",
+            "user_tg_id",
+            sqlite_where=text("rewarded_at IS NULL"),
+            postgresql_where=text("rewarded_at IS NULL"),
+        ),
+    )
 
     def __repr__(self) -> str:
         return (
@@ -0,0 +1,213 @@
+import logging
+from datetime import datetime
+from typing import Any, Self
+
+from sqlalchemy import ForeignKey, Index, String, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.types import Enum
+
+from app.bot.utils.constants import ReservationStatus
+
+from . import Base
+
+logger = logging.getLogger(__name__)
+
+
+class ProductStock(Base):
+    """
+    Represents the sellable quantity of a limited-stock catalog product.
+
+    Attributes:
+        product_id (str): Catalog product ID (primary key).
+        total (int): Stock quantity last synced from the catalog.
+        available (int): Units that are neither reserved nor sold.
+        updated_at (datetime): Timestamp when the row was last changed.
+    """
+
+    __tablename__ = "product_stock"
+
+    product_id: Mapped[str] = mapped_column(String(length=64), primary_key=True)
+    total: Mapped[int] = mapped_column(nullable=False)
+    available: Mapped[int] = mapped_column(nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<ProductStock(product_id='{self.product_id}', total={self.total}, "
+            f"available={self.available})>"
+        )
+
+    @classmethod
+    async def get(cls, session: AsyncSession, product_id: str) -> Self | None:
+        query = await session.execute(
+            select(ProductStock).where(ProductStock.product_id == product_id)
+        )
+        return query.scalar_one_or_none()
+
+    @classmethod
+    async def sync(cls, session: AsyncSession, totals: dict[str, int]) -> None:
+        """
+        Inserts missing stock rows and applies catalog restocks.
+
+        A changed catalog quantity shifts `available` by the same delta, so units that are
+        reserved or sold stay accounted for.
+        """
+        query = await session.execute(
+            select(ProductStock.product_id, ProductStock.total).where(
+                ProductStock.product_id.in_(totals)
+            )
+        )
+        current = dict(query.all())
+
+        for product_id, total in totals.items():
+            if product_id not in current:
+                session.add(ProductStock(product_id=product_id, total=total, available=total))
+            elif current[product_id] != total:
+                await session.execute(
+                    update(ProductStock)
+                    .where(ProductStock.product_id == product_id)
+                    .values(
+                        available=ProductStock.available + (total - ProductStock.total),
+                        total=total,
+                    )
+                )
+
+        try:
+            await session.commit()
+        except IntegrityError as exception:
+            # Another worker seeded the same rows first; its values are equivalent.
+            await session.rollback()
+            logger.warning(f"Concurrent stock sync detected: {exception}")
+
+    @classmethod
+    async def take(cls, session: AsyncSession, product_id: str, quantity: int) -> bool:
+        """Decrements available stock only if enough units are left. Does not commit."""
+        result = await session.execute(
+            update(ProductStock)
+            .where(ProductStock.product_id == product_id, ProductStock.available >= quantity)
+            .values(available=ProductStock.available - quantity)
+        )
+        return result.rowcount == 1
+
+    @classmethod
+    async def give_back(cls, session: AsyncSession, product_id: str, quantity: int) -> None:
+        """Returns units to available stock. Does not commit."""
+        await session.execute(
+            update(ProductStock)
+            .where(ProductStock.product_id == product_id)
+            .values(available=ProductStock.available + quantity)
+        )
+
+
+class StockReservation(Base):
+    """
+    Represents units of a product held for a user until payment completes.
+
+    Attributes:
+        id (int): Unique primary key for the reservation.
+        product_id (str): Reserved catalog product.
+        tg_id (int): Telegram user ID the units are held for.
+        quantity (int): Number of reserved units.
+        status (ReservationStatus): Reserved, committed (paid) or released.
+        payment_id (str | None): Payment the reservation is attached to.
+        expires_at (datetime): Timestamp after which an unpaid reservation is released.
+        created_at (datetime): Timestamp when the reservation was created.
+    """
+
+    __tablename__ = "stock_reservations"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    product_id: Mapped[str] = mapped_column(
+        ForeignKey("product_stock.product_id", ondelete="CASCADE"), nullable=False
+    )
+    tg_id: Mapped[int] = mapped_column(nullable=False)
+    quantity: Mapped[int] = mapped_column(default=1, nullable=False)
+    status: Mapped[ReservationStatus] = mapped_column(
+        Enum(ReservationStatus, values_callable=lambda obj: [e.value for e in obj]),
+        default=ReservationStatus.RESERVED,
+        nullable=False,
+    )
+    payment_id: Mapped[str | None] = mapped_column(String(length=64), unique=True, nullable=True)
+    expires_at: Mapped[datetime] = mapped_column(nullable=False)
+    created_at: Mapped[datetime] = mapped_column(default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_stock_reservations_status_expires_at", "status", "expires_at"),
+        Index("ix_stock_reservations_tg_id_product_id", "tg_id", "product_id"),
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<StockReservation(id={self.id}, product_id='{self.product_id}', "
+            f"tg_id={self.tg_id}, quantity={self.quantity}, status='{self.status}', "
+            f"payment_id='{self.payment_id}', expires_at={self.expires_at})>"
+        )
+
+    @classmethod
+    async def get_active(
+        cls,
+        session: AsyncSession,
+        tg_id: int,
+        product_id: str,
+        now: datetime,
+        unpaid: bool = False,
+    ) -> Self | None:
+        """The user's latest live reservation of a product, without an invoice if `unpaid`."""
+        filters = [
+            StockReservation.tg_id == tg_id,
+            StockReservation.product_id == product_id,
+            StockReservation.status == ReservationStatus.RESERVED,
+            StockReservation.expires_at > now,
+        ]
+        if unpaid:
+            filters.append(StockReservation.payment_id.is_(None))
+
+        query = await session.execute(
+            select(StockReservation)
+            .where(*filters)
+            .order_by(StockReservation.id.desc())
+            .limit(1)
+        )
+        return query.scalar_one_or_none()
+
+    @classmethod
+    async def get_by_payment(cls, session: AsyncSession, payment_id: str) -> Self | None:
+        query = await session.execute(
+            select(StockReservation).where(StockReservation.payment_id == payment_id)
+        )
+        return query.scalar_one_or_none()
+
+    @classmethod
+    async def get_expired(cls, session: AsyncSession, now: datetime) -> list[Self]:
+        query = await session.execute(
+            select(StockReservation).where(
+                StockReservation.status == ReservationStatus.RESERVED,
+                StockReservation.expires_at <= now,
+            )
+        )
+        return query.scalars().all()
+
+    @classmethod
+    async def transition(
+        cls,
+        session: AsyncSession,
+        reservation_id: int,
+        status: ReservationStatus,
+        **kwargs: Any,
+    ) -> bool:
+        """Moves a reservation out of RESERVED state exactly once. Does not commit."""
+        result = await session.execute(
+            update(StockReservation)
+            .where(
+                StockReservation.id == reservation_id,
+                StockReservation.status == ReservationStatus.RESERVED,
+            )
+            .values(status=status, **kwargs)
+        )
+        return result.rowcount == 1
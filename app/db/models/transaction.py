@@ -11,6 +11,7 @@ from sqlalchemy.types import Enum
 from app.bot.utils.constants import TransactionStatus
 
 from . import Base
+from ._base import update_returning
 
 logger = logging.getLogger(__name__)
 
@@ -48,6 +49,11 @@ class Transaction(Base):
     )
     user: Mapped["User"] = relationship("User", back_populates="transactions")  # type: ignore
 
+    __table_args__ = (
+        Index("ix_transactions_tg_id_status", "tg_id", "status"),
+        Index("ix_transactions_status_created_at", "status", "created_at"),
+    )
+
     def __repr__(self) -> str:
         return (
             f"<Transaction(id={self.id}, tg_id={self.tg_id}, payment_id='{self.payment_id}', "
@@ -93,12 +99,10 @@ class Transaction(Base):
 
     @classmethod
     async def update(cls, session: AsyncSession, payment_id: str, **kwargs: Any) -> Self | None:
-        transaction = await Transaction.get_by_id(session=session, payment_id=payment_id)
+        filter = [Transaction.payment_id == payment_id]
+        transaction = await update_returning(session, Transaction, *filter, **kwargs)
 
         if transaction:
-            filter = [Transaction.id == transaction.id]
-            await session.execute(update(Transaction).where(*filter).values(**kwargs))
-            await session.commit()
             logger.info(f"Transaction {payment_id} updated.")
             return transaction
 
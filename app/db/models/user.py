@@ -2,14 +2,14 @@ import logging
 from datetime import datetime
 from typing import Any, Optional, Self
 
-from sqlalchemy import ForeignKey, String, func, select, update
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import ForeignKey, String, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Mapped, mapped_column, relationship, selectinload
 
 from app.bot.utils.constants import DEFAULT_LANGUAGE
 
 from . import Base
+from ._base import dialect_insert, update_returning
 
 logger = logging.getLogger(__name__)
 
@@ -61,7 +61,9 @@ class User(Base):
         back_populates="referred",
         uselist=False,
     )
-    source_invite_name: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    source_invite_name: Mapped[Optional[str]] = mapped_column(
+        String(100), nullable=True, index=True
+    )
 
     def __repr__(self) -> str:
         return (
@@ -71,16 +73,17 @@ class User(Base):
         )
 
     @classmethod
-    async def get(cls, session: AsyncSession, tg_id: int) -> Self | None:
+    async def get(
+        cls, session: AsyncSession, tg_id: int, load_relations: bool = False
+    ) -> Self | None:
         filter = [User.tg_id == tg_id]
-        query = await session.execute(
-            select(User)
-            .options(
+        statement = select(User).where(*filter)
+        if load_relations:
+            statement = statement.options(
                 selectinload(User.transactions),
                 selectinload(User.activated_promocodes),
             )
-            .where(*filter)
-        )
+        query = await session.execute(statement)
         user = query.scalar_one_or_none()
 
         if user:
@@ -97,32 +100,48 @@ class User(Base):
 
     @classmethod
     async def create(cls, session: AsyncSession, tg_id: int, **kwargs: Any) -> Self | None:
-        user = await User.get(session=session, tg_id=tg_id)
+        user, is_new_user = await User.upsert(session=session, tg_id=tg_id, **kwargs)
 
-        if user:
+        if not is_new_user:
             logger.warning(f"User {tg_id} already exists.")
             return None
 
-        user = User(tg_id=tg_id, **kwargs)
-        session.add(user)
+        return user
+
+    @classmethod
+    async def upsert(cls, session: AsyncSession, tg_id: int, **kwargs: Any) -> tuple[Self, bool]:
+        """
+        Inserts the user unless it already exists and commits.
+
+        A single `INSERT ... ON CONFLICT DO NOTHING RETURNING` both creates the user and
+        tells whether it is new; only a user that already exists is read back. Missing
+        values (e.g. no Telegram language) fall back to column defaults.
+
+        Returns:
+            tuple[User, bool]: The user and whether it was created by this call.
+        """
+        values = {key: value for key, value in kwargs.items() if value is not None}
+
+        user = await session.scalar(
+            dialect_insert(session, User)
+            .values(tg_id=tg_id, **values)
+            .on_conflict_do_nothing(index_elements=[User.tg_id])
+            .returning(User)
+        )
+        await session.commit()
 
-        try:
-            await session.commit()
+        if user:
             logger.debug(f"User {tg_id} created.")
-            return user
-        except IntegrityError as exception:
-            await session.rollback()
-            logger.error(f"Error occurred while creating user {tg_id}: {exception}")
-            return None
+            return user, True
+
+        return await User.get(session=session, tg_id=tg_id), False
 
     @classmethod
     async def update(cls, session: AsyncSession, tg_id: int, **kwargs: Any) -> Self | None:
-        user = await User.get(session=session, tg_id=tg_id)
+        filter = [User.tg_id == tg_id]
+        user = await update_returning(session, User, *filter, **kwargs)
 
         if user:
-            filter = [User.tg_id == tg_id]
-            await session.execute(update(User).where(*filter).values(**kwargs))
-            await session.commit()
             logger.debug(f"User {tg_id} updated.")
             return user
 
@@ -138,21 +157,22 @@ class User(Base):
         """
         Updates the trial status of a user.
 
+        The update only applies when the status actually changes, so of two concurrent
+        trial activations only one succeeds.
+
         Args:
             session (AsyncSession): Database session.
             tg_id (int): Telegram user ID.
             used (bool): Whether the trial has been used.
 
         Returns:
-            bool: True if updated, False otherwise.
+            bool: True if updated, False if the user is missing or already in that state.
         """
-        user = await cls.get(session=session, tg_id=tg_id)
+        filter = [User.tg_id == tg_id, User.is_trial_used.is_not(used)]
 
-        if not user:
-            logger.warning(f"User {tg_id} not found to update trial status.")
+        if not await update_returning(session, User, *filter, is_trial_used=used):
+            logger.warning(f"User {tg_id} not found or trial status already {used}.")
             return False
 
-        await session.execute(update(User).where(User.tg_id == tg_id).values(is_trial_used=used))
-        await session.commit()
         logger.info(f"Trial status updated for user {tg_id}: {used}")
         return True
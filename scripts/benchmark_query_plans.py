@@ -0,0 +1,185 @@
+"""
+Query plan regression benchmark for the hot-path queries.
+
+Seeds a throwaway SQLite database with a synthetic dataset, runs each hot query
+the way the application builds it, and checks with EXPLAIN QUERY PLAN that it is
+served by its index rather than a table scan. Exits non-zero on a regression.
+
+Usage:
+    python scripts/benchmark_query_plans.py [--users 200000] [--keep PATH]
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import Engine, create_engine, event, func, insert, select  # noqa: E402
+
+from app.bot.utils.constants import (  # noqa: E402
+    ReferrerRewardType,
+    TransactionStatus,
+)
+from app.db.models import Base, Referral, ReferrerReward, Transaction, User  # noqa: E402
+
+BATCH_SIZE = 10_000
+
+
+def seed(engine: Engine, users: int) -> None:
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    invites = [f"invite-{index}" for index in range(50)]
+    statuses = list(TransactionStatus)
+
+    with engine.begin() as connection:
+        for start in range(0, users, BATCH_SIZE):
+            tg_ids = range(start + 1, min(start + BATCH_SIZE, users) + 1)
+            connection.execute(
+                insert(User),
+                [
+                    {
+                        "tg_id": tg_id,
+                        "first_name": f"user{tg_id}",
+                        "language_code": "en",
+                        "source_invite_name": rng.choice(invites) if tg_id % 4 == 0 else None,
+                    }
+                    for tg_id in tg_ids
+                ],
+            )
+            connection.execute(
+                insert(Transaction),
+                [
+                    {
+                        "tg_id": tg_id,
+                        "payment_id": f"payment-{tg_id}-{attempt}",
+                        "subscription": "synthetic",
+                        "status": rng.choice(statuses),
+                        "created_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 90)),
+                    }
+                    for tg_id in tg_ids
+                    for attempt in range(3)
+                ],
+            )
+            connection.execute(
+                insert(Referral),
+                [
+                    {"referred_tg_id": tg_id, "referrer_tg_id": rng.randint(1, users)}
+                    for tg_id in tg_ids
+                    if tg_id % 3 == 0
+                ],
+            )
+            connection.execute(
+                insert(ReferrerReward),
+                [
+                    {
+                        "user_tg_id": rng.randint(1, users),
+                        "reward_type": ReferrerRewardType.DAYS,
+                        "amount": 3,
+                        "payment_id": f"payment-{tg_id}-0",
+                        # Nearly all rewards are processed; the pending tail is what is queried.
+                        "rewarded_at": None if tg_id % 100 == 0 else now,
+                    }
+                    for tg_id in tg_ids
+                ],
+            )
+
+
+def hot_queries(users: int) -> dict[str, tuple[Any, str]]:
+    """Query name -> (statement, index expected to serve it)."""
+    tg_id = users // 2
+    return {
+        "payment stats by user": (
+            select(Transaction).where(
+                Transaction.tg_id == tg_id, Transaction.status == TransactionStatus.COMPLETED
+            ),
+            "ix_transactions_tg_id_status",
+        ),
+        "expired pending transactions": (
+            select(Transaction).where(
+                Transaction.status == TransactionStatus.PENDING,
+                Transaction.created_at <= datetime.utcnow() - timedelta(days=89),
+            ),
+            "ix_transactions_status_created_at",
+        ),
+        "invite audience": (
+            select(User).where(User.source_invite_name == "invite-7"),
+            "ix_users_source_invite_name",
+        ),
+        "pending rewards": (
+            select(ReferrerReward).where(ReferrerReward.rewarded_at.is_(None)),
+            "ix_referrer_rewards_pending_user_tg_id",
+        ),
+        "pending rewards count by user": (
+            select(func.count())
+            .select_from(ReferrerReward)
+            .where(ReferrerReward.rewarded_at.is_(None), ReferrerReward.user_tg_id == tg_id),
+            "ix_referrer_rewards_pending_user_tg_id",
+        ),
+        "referral count": (
+            select(func.count()).where(Referral.referrer_tg_id == tg_id),
+            "ix_referrals_referrer_tg_id",
+        ),
+    }
+
+
+def check(engine: Engine, users: int) -> bool:
+    captured: list[tuple[str, Any]] = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def capture(connection, cursor, statement, parameters, context, executemany) -> None:
+        captured.append((statement, parameters))
+
+    ok = True
+    with engine.connect() as connection:
+        for name, (statement, index) in hot_queries(users).items():
+            captured.clear()
+            started = time.perf_counter()
+            rows = len(connection.execute(statement).all())
+            elapsed = (time.perf_counter() - started) * 1000
+
+            sql, parameters = captured[-1]
+            plan = [
+                row[-1]
+                for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", parameters)
+            ]
+            uses_index = any(index in detail for detail in plan)
+            ok &= uses_index
+            print(
+                f"{'OK  ' if uses_index else 'FAIL'} {name}: {rows} rows in {elapsed:.2f} ms\n"
+                f"     expected {index}, plan: {' | '.join(plan)}"
+            )
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=200_000, help="synthetic users to seed")
+    parser.add_argument("--keep", type=Path, help="write the database here instead of a temp dir")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.keep or Path(directory) / "benchmark.db"
+        engine = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(engine)
+
+        started = time.perf_counter()
+        seed(engine, args.users)
+        with engine.begin() as connection:
+            connection.exec_driver_sql("ANALYZE")
+        print(f"Seeded {args.users} users in {time.perf_counter() - started:.1f} s")
+
+        ok = check(engine, args.users)
+        engine.dispose()
+
+    print("All hot queries use their indexes." if ok else "Query plan regression detected.")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,13 +5,15 @@ import pytest
 from unittest.mock import Mock, AsyncMock, MagicMock, patch
 from typing import Dict, Any
 
-from aiogram import BaseMiddleware
+from aiogram import BaseMiddleware, Router
 from aiogram.types import TelegramObject, Update, Message, CallbackQuery, User as TelegramUser
 
 from app.bot.middlewares.database import DBSessionMiddleware
 from app.bot.middlewares.throttling import ThrottlingMiddleware
 from app.bot.middlewares.maintenance import MaintenanceMiddleware
 from app.bot.middlewares.garbage import GarbageMiddleware
+from app.bot.utils.routing import skip_db_session
+from app.db.database import LazySession
 
 
 class TestDBSessionMiddleware:
@@ -55,11 +57,11 @@ class TestDBSessionMiddleware:
         data: Dict[str, Any] = {}
         
         with patch('app.db.models.User.get', return_value=None), \
-             patch('app.db.models.User.create') as mock_create:
+             patch('app.db.models.User.upsert') as mock_create:
             
             mock_user = Mock()
             mock_user.tg_id = 123456789
-            mock_create.return_value = mock_user
+            mock_create.return_value = (mock_user, True)
             
             await db_middleware(mock_handler, mock_event, data)
             
@@ -77,7 +79,7 @@ class TestDBSessionMiddleware:
         mock_user.tg_id = 123456789
         
         with patch('app.db.models.User.get', return_value=mock_user), \
-             patch('app.db.models.User.create') as mock_create:
+             patch('app.db.models.User.upsert') as mock_create:
             
             await db_middleware(mock_handler, mock_event, data)
             
@@ -87,12 +89,43 @@ class TestDBSessionMiddleware:
             # Verify handler was called
             mock_handler.assert_called_once_with(mock_event, data)
 
+    async def test_returning_user_served_from_cache(self, db_middleware, mock_handler, mock_event):
+        """Test that a returning user is resolved without querying the database."""
+        await db_middleware(mock_handler, mock_event, {})
+
+        data: Dict[str, Any] = {}
+        with patch('app.db.models.User.get') as mock_get:
+            await db_middleware(mock_handler, mock_event, data)
+            mock_get.assert_not_called()
+
+        assert data["user"].tg_id == 123456789
+        assert data["user"].first_name == "Test User"
+        assert data["is_new_user"] is False
+
+    async def test_session_opened_only_when_used(self, db_middleware, mock_event):
+        """Test that handlers get a lazy session and sessionless routers get none."""
+        await db_middleware(AsyncMock(), mock_event, {})
+        sessions = []
+
+        async def handler(event, data):
+            sessions.append(data.get("session"))
+
+        router = skip_db_session(Router())
+        with patch.object(db_middleware, "session", wraps=db_middleware.session) as factory:
+            await db_middleware(handler, mock_event, {"event_router": router})
+            await db_middleware(handler, mock_event, {"event_router": Router()})
+            factory.assert_not_called()
+
+        assert sessions[0] is None
+        assert isinstance(sessions[1], LazySession)
+        assert not sessions[1].started
+
     async def test_middleware_with_bot_user(self, db_middleware, mock_handler, mock_bot_event):
         """Test middleware with bot user (should be ignored)."""
         data: Dict[str, Any] = {}
         
         with patch('app.db.models.User.get') as mock_get, \
-             patch('app.db.models.User.create') as mock_create:
+             patch('app.db.models.User.upsert') as mock_create:
             
             await db_middleware(mock_handler, mock_bot_event, data)
             
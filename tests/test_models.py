@@ -3,10 +3,15 @@ Tests for database models.
 """
 import pytest
 from datetime import datetime
-from sqlalchemy.exc import IntegrityError
+from unittest.mock import patch
+
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError, OperationalError
 
 from app.db.models import User, Transaction, Referral, Promocode, Invite, ReferrerReward
 from app.bot.utils.constants import TransactionStatus
+from app.config import DatabaseConfig
+from app.db.database import Database
 
 
 class TestUserModel:
@@ -66,6 +71,19 @@ class TestUserModel:
                     username="user2"
                 )
 
+    async def test_upsert_user(self, test_db):
+        """Test that upsert creates a user once and reports whether it was new."""
+        async with test_db.session() as session:
+            user, is_new = await User.upsert(
+                session=session, tg_id=123456789, first_name="First", language_code=None
+            )
+            assert is_new is True
+            assert user.language_code == "en"
+
+            again, is_new = await User.upsert(session=session, tg_id=123456789, first_name="Second")
+            assert is_new is False
+            assert (again.id, again.first_name) == (user.id, "First")
+
     async def test_get_all_users(self, test_db):
         """Test getting all users."""
         async with test_db.session() as session:
@@ -78,6 +96,15 @@ class TestUserModel:
             assert len(users) == 3
 
 
+    async def test_update_trial_status_only_on_change(self, test_db, test_user):
+        """Test that the trial can only be claimed once until it is released."""
+        async with test_db.session() as session:
+            assert await User.update_trial_status(session, test_user.tg_id, used=True)
+            assert not await User.update_trial_status(session, test_user.tg_id, used=True)
+            assert await User.update_trial_status(session, test_user.tg_id, used=False)
+            assert not await User.update_trial_status(session, 404, used=True)
+
+
 class TestTransactionModel:
     """Tests for Transaction model."""
     
@@ -99,6 +126,23 @@ class TestTransactionModel:
             assert transaction.status == TransactionStatus.PENDING
             assert transaction.created_at is not None
 
+    async def test_update_returns_updated_row(self, test_db, test_user):
+        """Test that an update returns the row as written, in one statement."""
+        async with test_db.session() as session:
+            await Transaction.create(
+                session=session,
+                tg_id=test_user.tg_id,
+                subscription="sub",
+                payment_id="payment_returning",
+                status=TransactionStatus.PENDING,
+            )
+
+            updated = await Transaction.update(
+                session=session, payment_id="payment_returning", status=TransactionStatus.COMPLETED
+            )
+            assert updated.status == TransactionStatus.COMPLETED
+            assert await Transaction.update(session=session, payment_id="missing") is None
+
     async def test_get_user_transactions(self, test_db, test_user):
         """Test getting transactions for a user."""
         async with test_db.session() as session:
@@ -262,6 +306,75 @@ class TestPromocodeModel:
                 )
 
 
+    async def test_redeem_is_a_single_conditional_update(self, test_db, test_user):
+        """Test that a promocode is redeemed once and can be released again."""
+        async with test_db.session() as session:
+            code = (await Promocode.create(session=session, duration=7)).code
+
+            assert await Promocode.redeem(session, code, test_user.tg_id)
+            assert not await Promocode.redeem(session, code, test_user.tg_id)
+            assert not await Promocode.redeem(session, "MISSING", test_user.tg_id)
+
+            assert await Promocode.release(session, code, test_user.tg_id)
+            updated = await Promocode.update(session=session, code=code, duration=30)
+            assert updated.duration == 30
+            assert updated.is_activated is False
+            assert updated.uses == 0
+
+    async def test_redeem_multi_use_limits(self, test_db, test_user):
+        """Test that a multi-use promocode is limited per user and by max uses."""
+        async with test_db.session() as session:
+            code = (await Promocode.create(session=session, duration=7, max_uses=2)).code
+            await User.create(session=session, tg_id=987654321, first_name="Other")
+            await User.create(session=session, tg_id=555, first_name="Third")
+
+            redeemed = await Promocode.redeem(session, code, test_user.tg_id)
+            assert redeemed.uses == 1 and redeemed.is_activated is False
+            assert not await Promocode.redeem(session, code, test_user.tg_id)
+            assert (await Promocode.get(session=session, code=code)).uses == 1
+
+            redeemed = await Promocode.redeem(session, code, 987654321)
+            assert redeemed.uses == 2 and redeemed.is_activated is True
+            assert not await Promocode.redeem(session, code, 555)
+
+            assert await Promocode.delete(session=session, code=code)
+
+    async def test_release_requires_users_redemption(self, test_db, test_user):
+        """Test that only the user's own redemption is released, and only once."""
+        async with test_db.session() as session:
+            code = (await Promocode.create(session=session, duration=7, max_uses=2)).code
+            await User.create(session=session, tg_id=987654321, first_name="Other")
+            await Promocode.redeem(session, code, test_user.tg_id)
+            await Promocode.redeem(session, code, 987654321)
+
+            assert not await Promocode.release(session, code, 555)
+            assert not await Promocode.release(session, "MISSING", test_user.tg_id)
+            assert (await Promocode.get(session=session, code=code)).uses == 2
+
+            assert await Promocode.release(session, code, 987654321)
+            assert not await Promocode.release(session, code, 987654321)
+            released = await Promocode.get(session=session, code=code)
+            assert (released.uses, released.is_activated) == (1, False)
+            assert released.activated_by == test_user.tg_id
+
+            assert await Promocode.release(session, code, test_user.tg_id)
+            released = await Promocode.get(session=session, code=code)
+            assert (released.uses, released.activated_by) == (0, None)
+
+    async def test_create_batch_replaces_colliding_codes(self, test_db):
+        """Test that bulk creation fills codes that collide with existing ones."""
+        async with test_db.session() as session:
+            existing = await Promocode.create(session=session, duration=7)
+            codes = iter([existing.code, "BATCH001", "BATCH001", "BATCH002", "BATCH003"])
+
+            with patch("app.db.models.promocode.generate_code", side_effect=lambda: next(codes)):
+                created = await Promocode.create_batch(session=session, count=3, duration=30)
+
+            assert sorted(created) == ["BATCH001", "BATCH002", "BATCH003"]
+            assert (await Promocode.get(session=session, code="BATCH003")).duration == 30
+            assert len(await Promocode.create_batch(session=session, count=500, duration=1)) == 500
+
+
 class TestInviteModel:
     """Tests for Invite model."""
     
@@ -355,4 +468,38 @@ class TestReferrerRewardModel:
             unprocessed = await ReferrerReward.get_unprocessed_rewards(session=session)
             
             assert len(unprocessed) >= 1
-            assert all(not reward.is_processed for reward in unprocessed)
\ No newline at end of file
+            assert all(not reward.is_processed for reward in unprocessed)
+
+class TestDatabaseEngine:
+    """Tests for the database engine profile."""
+
+    async def test_sqlite_engine_profile(self, temp_dir):
+        """Test that new SQLite connections get the configured pragmas and pool."""
+        config = DatabaseConfig(
+            HOST=None, PORT=None, NAME="profile", USERNAME=None, PASSWORD=None, POOL_SIZE=3
+        )
+        with patch("app.config.DEFAULT_DATA_DIR", temp_dir):
+            db = Database(config)
+
+        async with db.session() as session:
+            assert (await session.execute(text("PRAGMA journal_mode"))).scalar() == "wal"
+            assert (await session.execute(text("PRAGMA busy_timeout"))).scalar() == 5000
+            assert db.pool_status()["checkedout"] == 1
+        assert db.pool_status()["size"] == 3
+        await db.close()
+
+    async def test_read_session_is_read_only(self, temp_dir):
+        """Test that the analytics session sees committed rows but cannot write."""
+        config = DatabaseConfig(HOST=None, PORT=None, NAME="replica", USERNAME=None, PASSWORD=None)
+        with patch("app.config.DEFAULT_DATA_DIR", temp_dir):
+            db = await Database(config).initialize()
+
+        async with db.session() as session:
+            await User.create(session=session, tg_id=42, first_name="Reader", language_code="en")
+
+        async with db.read_session() as session:
+            assert (await User.get(session=session, tg_id=42)).first_name == "Reader"
+            with pytest.raises(OperationalError):
+                await User.create(session=session, tg_id=43, first_name="Writer", language_code="en")
+        assert db.pool_status(read_only=True)["size"] == config.READ_POOL_SIZE
+        await db.close()
@@ -1,19 +1,45 @@
 """
 Tests for bot services.
 """
+import asyncio
+from contextlib import contextmanager
 import pytest
 import json
-from unittest.mock import Mock, AsyncMock, patch, mock_open
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock, MagicMock, AsyncMock, patch, mock_open
 from pathlib import Path
 
+import fakeredis
+
 from app.bot.services.plan import PlanService
+from decimal import Decimal
+
+from app.bot.models import CatalogPageData
+from app.bot.models.catalog import CatalogSnapshot, cursor_key
+from app.bot.models.plan import Plan
+from app.bot.models.price_matrix import PriceMatrix
+from app.bot.services.catalog import DatabaseCatalog, ProductCatalog, iter_catalog_products
+from app.bot.services.catalog_binary import compile_snapshot, load_snapshot
+from app.bot.services.catalog_sync import CatalogSync
+from app.bot.services.delivery import DeliveryQueue
+from app.bot.services.expiry import ExpiryScheduler
+from app.bot.services.invite_tracker import InviteTracker
+from app.bot.services import initialize, search as search_module
+from app.bot.services.price import PriceService
 from app.bot.services.product import ProductService
+from app.bot.services.promocode_filter import BloomFilter, PromocodeFilter
+from app.bot.services.product_card import ProductCard, ProductCardCache, stock_bucket
 from app.bot.services.notification import NotificationService
+from app.bot.services.license_key import LicenseKeyService
 from app.bot.services.referral import ReferralService
+from app.bot.services.stock import StockService
 from app.bot.services.subscription import SubscriptionService
+from app.bot.services.user_cache import UserCache
+from app.bot.services.write_buffer import WriteBuffer
 from app.bot.services.payment_stats import PaymentStatsService
 from app.bot.services.invite_stats import InviteStatsService
-from app.bot.utils.constants import Currency
+from app.bot.utils.constants import Currency, DeliveryStatus
+from app.db.models import Invite, ProductSubscription, Promocode, User
 
 
 class TestPlanService:
@@ -188,6 +214,1061 @@ class TestProductService:
             assert info['product_id'] == 'test_product'
 
 
+class TestProductCatalog:
+    """Tests for the hot-reloading ProductCatalog snapshot."""
+
+    @staticmethod
+    def _write_catalog(path, products):
+        path.write_text(json.dumps({"products": products}))
+
+    def test_snapshot_loaded_once(self, temp_dir):
+        """Test that an unchanged file is not parsed again."""
+        catalog_file = temp_dir / "products.json"
+        self._write_catalog(catalog_file, [{"id": "p1", "name": "Product 1"}])
+        catalog = ProductCatalog(catalog_file)
+
+        first = catalog.get_snapshot()
+        with patch("app.bot.services.catalog.json.loads") as loads:
+            second = catalog.get_snapshot()
+            loads.assert_not_called()
+
+        assert first is second
+        assert [p["id"] for p in first.products] == ["p1"]
+
+    def test_snapshot_swapped_on_change(self, temp_dir):
+        """Test that a modified file produces a new snapshot version."""
+        catalog_file = temp_dir / "products.json"
+        self._write_catalog(catalog_file, [{"id": "p1"}])
+        catalog = ProductCatalog(catalog_file)
+        first = catalog.get_snapshot()
+
+        self._write_catalog(catalog_file, [{"id": "p1"}, {"id": "p2"}])
+        second = catalog.get_snapshot()
+
+        assert second.version != first.version
+        assert len(second) == 2
+
+    def test_invalid_file_keeps_last_snapshot(self, temp_dir):
+        """Test that a broken catalog file does not drop the loaded products."""
+        catalog_file = temp_dir / "products.json"
+        self._write_catalog(catalog_file, [{"id": "p1"}])
+        catalog = ProductCatalog(catalog_file)
+        first = catalog.get_snapshot()
+
+        catalog_file.write_text("{ invalid json")
+        second = catalog.get_snapshot()
+
+        assert second.version == first.version
+        assert [p["id"] for p in second.products] == ["p1"]
+
+    def test_missing_file(self, temp_dir):
+        """Test that a missing catalog file yields an empty snapshot."""
+        catalog = ProductCatalog(temp_dir / "missing.json")
+        assert len(catalog.get_snapshot()) == 0
+
+    def test_snapshot_indexes(self, temp_dir):
+        """Test id, category and price lookups on both catalog formats."""
+        catalog_file = temp_dir / "products.json"
+        self._write_catalog(catalog_file, [
+            {
+                "id": "p1",
+                "category": "Software",
+                "duration_days": 30,
+                "price": {"amount": 9.99, "currency": "usd"},
+            },
+            {
+                "id": 2,
+                "category": "software",
+                "prices": {"RUB": {"30": 500, "90": 1200}},
+            },
+            {
+                "id": "any-duration",
+                "category": "software",
+                "price": {"amount": 300, "currency": "RUB"},
+            },
+        ])
+        snapshot = ProductCatalog(catalog_file).get_snapshot()
+
+        assert snapshot.get("p1")["id"] == "p1"
+        assert snapshot.get("2")["id"] == 2
+        assert snapshot.get("missing") is None
+        assert [p["id"] for p in snapshot.in_category("SOFTWARE")] == ["p1", 2, "any-duration"]
+        assert snapshot.find_by_price(30, 9.99, "USD")["id"] == "p1"
+        assert snapshot.find_by_price(60, 9.99, "USD") is None
+        assert snapshot.find_by_price(60, 300, "RUB")["id"] == "any-duration"
+        assert snapshot.find_by_price(365, 300)["id"] == "any-duration"
+        assert snapshot.find_by_price(90, 1200)["id"] == 2
+        assert snapshot.find_by_price(90, 1200, "USD") is None
+
+    def test_search_ranked_prefix_and_localized(self, temp_dir):
+        """Test search over localized fields with prefix matching and ranking."""
+        catalog_file = temp_dir / "products.json"
+        self._write_catalog(catalog_file, [
+            {"id": 1, "name_en": "Office Suite", "name_ru": "Офисный пакет",
+             "description_en": "Documents and spreadsheets"},
+            {"id": 2, "name_en": "Photo Editor", "description_en": "Edit office photos",
+             "features": ["Layers", "Filters"]},
+            {"id": 3, "name_zh": "游戏会员", "description_en": "Gaming pass"},
+        ])
+        catalog = ProductCatalog(catalog_file)
+
+        assert [p["id"] for p in catalog.search("office")] == [1, 2]
+        assert [p["id"] for p in catalog.search("офис")] == [1]
+        assert [p["id"] for p in catalog.search("edit lay")] == [2]
+        assert [p["id"] for p in catalog.search("会员")] == [3]
+        assert catalog.search("office games") == []
+
+    def test_search_index_rebuilds_incrementally(self, temp_dir):
+        """Test that only changed products are re-tokenized on catalog change."""
+        catalog_file = temp_dir / "products.json"
+        products = [{"id": 1, "name": "Alpha"}, {"id": 2, "name": "Beta"}]
+        self._write_catalog(catalog_file, products)
+        catalog = ProductCatalog(catalog_file)
+        assert [p["id"] for p in catalog.search("alp")] == [1]
+
+        self._write_catalog(catalog_file, [{"id": 1, "name": "Alpha"}, {"id": 3, "name": "Gamma"}])
+        with patch(
+            "app.bot.services.search._document_terms",
+            wraps=search_module._document_terms,
+        ) as document_terms:
+            assert [p["id"] for p in catalog.search("gam")] == [3]
+            document_terms.assert_called_once()
+
+        assert catalog.search("beta") == []
+
+    def test_category_pages_follow_cursor(self):
+        """Test that category pages are sliced from the precomputed sort orders."""
+        products = tuple(
+            {"id": f"p{n}", "name": name, "category": "games", "price": {"amount": price},
+             "popularity": popularity}
+            for n, (name, price, popularity) in enumerate(
+                [("delta", 30, 1), ("alpha", 10, 5), ("charlie", 20, 3), ("bravo", 40, 2)]
+            )
+        )
+        snapshot = CatalogSnapshot.build("v1", products)
+
+        first = snapshot.page("Games", "name", size=3)
+        second = snapshot.page("games", "name", first.next_cursor, size=3)
+
+        assert [p["name"] for p in first.items] == ["alpha", "bravo", "charlie"]
+        assert (first.number, first.total_pages, first.prev_cursor) == (1, 2, None)
+        assert [p["name"] for p in second.items] == ["delta"]
+        assert (second.number, second.next_cursor, second.prev_cursor) == (2, None, cursor_key("p1"))
+        assert [p["id"] for p in snapshot.page("games", "price", size=4).items] == ["p1", "p2", "p0", "p3"]
+        assert [p["id"] for p in snapshot.page("games", "popularity", "gone", size=2).items] == ["p1", "p2"]
+
+    def test_page_callback_fits_long_product_ids(self):
+        """Test that page buttons stay within Telegram's callback data limit."""
+        products = tuple({"id": f"{n}-" + "x" * 62, "category": "games"} for n in range(3))
+        snapshot = CatalogSnapshot.build("v1", products)
+        page = snapshot.page("games", "name", size=1)
+
+        packed = CatalogPageData(category=page.category, sort=page.sort, cursor=page.next_cursor)
+        assert len(packed.pack().encode()) <= 64
+        next_page = snapshot.page("games", "name", page.next_cursor, size=1)
+        assert next_page.items[0]["id"] == products[1]["id"]
+
+    def test_misaligned_cursor_page_number(self):
+        """Test that a cursor off a page boundary still reports a consistent page number."""
+        products = tuple({"id": f"p{n:02d}", "name": f"P{n:02d}", "category": "games"} for n in range(17))
+        snapshot = CatalogSnapshot.build("v1", products)
+
+        last = snapshot.page("games", "name", cursor_key("p09"), size=8)
+        assert (last.number, last.total_pages, last.next_cursor) == (3, 3, None)
+        middle = snapshot.page("games", "name", cursor_key("p03"), size=8)
+        assert (middle.number, middle.total_pages) == (2, 3)
+        assert middle.next_cursor == cursor_key("p11")
+
+
+class TestDatabaseCatalog:
+    """Tests for the products table backed catalog."""
+
+    @staticmethod
+    def _write_catalog(path, products):
+        path.write_text(json.dumps({"categories": [{"id": "games"}], "products": products}))
+
+    def test_stream_products(self, temp_dir):
+        """Test that streamed products match a full JSON parse across chunk borders."""
+        catalog_file = temp_dir / "products.json"
+        products = [{"id": n, "name": f"Product {n}", "features": ["x" * 40]} for n in range(20)]
+        self._write_catalog(catalog_file, products)
+
+        assert list(iter_catalog_products(catalog_file, chunk_size=16)) == products
+
+    async def test_import_and_refresh(self, test_db, temp_dir):
+        """Test that imports upsert products and refresh only rebuilds on changes."""
+        catalog_file = temp_dir / "products.json"
+        self._write_catalog(catalog_file, [
+            {"id": 1, "name": "Game", "category": "Games", "stock": 3,
+             "prices": {"USD": {"30": 5}}, "features": ["Key"]},
+            {"id": 2, "name": "Tool", "category": "software"},
+        ])
+        catalog = DatabaseCatalog(session_factory=test_db.session)
+
+        first = await catalog.initialize(seed_file=catalog_file)
+        assert len(first) == 2
+        assert first.get(1) == {
+            "id": "1", "name": "Game", "description": "", "category": "games",
+            "is_active": True, "delivery_type": "digital", "stock": 3,
+            "prices": {"USD": {"30": 5}}, "features": ["Key"],
+        }
+        assert await catalog.refresh() is first
+
+        self._write_catalog(catalog_file, [{"id": 2, "name": "Tool v2", "category": "software"}])
+        result = await catalog.import_file(catalog_file)
+
+        assert (result.added, result.updated) == (0, 1)
+        assert catalog.get_snapshot().get(2)["name"] == "Tool v2"
+        assert [p["name"] for p in catalog.search("tool")] == ["Tool v2"]
+
+    async def test_restart_from_compiled_snapshot(self, test_db, temp_dir):
+        """Test that an unchanged table is served from the mapped snapshot after restart."""
+        catalog_file = temp_dir / "products.json"
+        snapshot_file = temp_dir / "catalog.snapshot"
+        self._write_catalog(catalog_file, [
+            {"id": n, "name": f"Игра {n}", "category": "games", "stock": n} for n in range(5)
+        ])
+        first = await DatabaseCatalog(test_db.session, snapshot_file).initialize(catalog_file)
+
+        restarted = DatabaseCatalog(test_db.session, snapshot_file)
+        with patch("app.bot.services.catalog.Product.get_all") as get_all:
+            snapshot = await restarted.initialize(catalog_file)
+            get_all.assert_not_called()
+
+        assert snapshot.version == first.version
+        assert snapshot.products.materialized == 0
+        assert snapshot.get(3)["name"] == "Игра 3"
+        assert len(snapshot.in_category("games")) == 5
+        assert snapshot.products.materialized == 5
+        assert [p["id"] for p in snapshot.products[1:3]] == ["1", "2"]
+
+    async def test_reimport_products_file(self, test_config, test_db, temp_dir):
+        """Test that the products file is re-imported into a seeded database catalog."""
+        catalog_file = temp_dir / "products.json"
+        self._write_catalog(catalog_file, [{"id": "p1", "name": "Game", "category": "games"}])
+        test_config.product.PRODUCTS_FILE = str(catalog_file)
+        test_config.product.CATALOG_SOURCE = "database"
+        test_config.product.CATALOG_SNAPSHOT_FILE = str(temp_dir / "catalog.snapshot")
+        product_service = ProductService(test_config, test_db.session)
+        await product_service.initialize_catalog()
+        listener = AsyncMock()
+        product_service.catalog.on_updated.append(listener)
+
+        self._write_catalog(catalog_file, [
+            {"id": "p1", "name": "Game v2", "category": "games"},
+            {"id": "p2", "name": "Tool", "category": "games"},
+        ])
+        result = await product_service.import_catalog()
+
+        assert (result.added, result.updated) == (1, 1)
+        assert product_service.catalog.get_snapshot().get("p1")["name"] == "Game v2"
+        listener.assert_awaited_once()
+
+    async def test_reimport_needs_database_catalog(self, test_config, test_db):
+        """Test that the file catalog refuses an explicit import."""
+        product_service = ProductService(test_config, test_db.session)
+
+        with pytest.raises(ValueError):
+            await product_service.import_catalog()
+
+    def test_incompatible_snapshot_is_ignored(self, temp_dir):
+        """Test that a foreign or truncated snapshot file is not loaded."""
+        snapshot_file = temp_dir / "catalog.snapshot"
+        compile_snapshot(CatalogSnapshot.build("ab" * 32, ({"id": "p1"},)), snapshot_file)
+        assert load_snapshot(snapshot_file)[0].get("p1") == {"id": "p1"}
+
+        snapshot_file.write_bytes(b"garbage" * 20)
+        assert load_snapshot(snapshot_file) is None
+
+
+class TestCatalogSync:
+    """Tests for catalog change propagation over Redis."""
+
+    @staticmethod
+    async def _eventually(predicate):
+        for _ in range(200):
+            if predicate():
+                return
+            await asyncio.sleep(0.01)
+
+    async def test_change_reaches_other_replica(self, test_db, temp_dir):
+        """Test that an import on one replica refreshes the catalog of another."""
+        server = fakeredis.FakeServer()
+        writer = DatabaseCatalog(test_db.session)
+        replica = DatabaseCatalog(test_db.session)
+        writer.on_updated.append(
+            CatalogSync(fakeredis.FakeAsyncRedis(server=server), writer).publish
+        )
+        replica_sync = CatalogSync(fakeredis.FakeAsyncRedis(server=server), replica)
+        await replica_sync.start()
+
+        catalog_file = temp_dir / "products.json"
+        catalog_file.write_text(json.dumps({"products": [{"id": "p1", "name": "Product"}]}))
+        try:
+            await writer.import_file(catalog_file)
+            await self._eventually(lambda: replica.get_snapshot().get("p1"))
+        finally:
+            await replica_sync.stop()
+
+        assert replica.get_snapshot().get("p1")["name"] == "Product"
+        assert replica_sync.version == 1
+
+    async def test_admin_import_reaches_other_replica(
+        self, test_config, test_db, mock_bot, temp_dir
+    ):
+        """Test that product imports through the services refresh every replica."""
+        catalog_file = temp_dir / "products.json"
+        catalog_file.write_text(json.dumps({"products": [{"id": "p1", "name": "Product"}]}))
+        test_config.product.PRODUCTS_FILE = str(catalog_file)
+        test_config.product.CATALOG_SOURCE = "database"
+        test_config.product.CATALOG_SNAPSHOT_FILE = str(temp_dir / "catalog.snapshot")
+        server = fakeredis.FakeServer()
+        with patch("app.bot.services.plan.DEFAULT_PLANS_DIR", str(temp_dir / "plans.json")):
+            writer, replica = [
+                await initialize(
+                    test_config, test_db.session, mock_bot,
+                    redis=fakeredis.FakeAsyncRedis(server=server),
+                )
+                for _ in range(2)
+            ]
+        for services in (writer, replica):
+            await services.product.initialize_catalog()
+            await services.catalog_sync.start()
+
+        def replica_name():
+            return replica.product.catalog.get_snapshot().get("p1")["name"]
+
+        # Seeding the empty table on the writer is already announced as a change.
+        seeded = replica.catalog_sync.version
+        try:
+            for version, name in enumerate(("Product v2", "Product v3"), start=seeded + 1):
+                catalog_file.write_text(json.dumps({"products": [{"id": "p1", "name": name}]}))
+                await writer.product.import_catalog()
+                await self._eventually(lambda: replica_name() == name)
+
+                assert replica_name() == name
+                assert replica.catalog_sync.version == version
+        finally:
+            for services in (writer, replica):
+                await services.catalog_sync.stop()
+
+    async def test_stale_versions_ignored(self, test_db):
+        """Test that repeated or malformed announcements do not refresh again."""
+        catalog = Mock(refresh=AsyncMock())
+        sync = CatalogSync(fakeredis.FakeAsyncRedis(), catalog)
+
+        assert await sync.handle(b"2") is True
+        assert await sync.handle(b"2") is False
+        assert await sync.handle(b"1") is False
+        assert await sync.handle(b"oops") is False
+        catalog.refresh.assert_awaited_once()
+
+
+class TestProductCardCache:
+    """Tests for the rendered product card cache."""
+
+    def test_miss_on_version_or_bucket_change(self):
+        """Test that cards are reused only for the same catalog version and stock bucket."""
+        cache = ProductCardCache()
+        card = ProductCard(version="v1", bucket="available", text="card", reply_markup=Mock())
+        cache.put("p1", "en", card)
+
+        assert cache.get("p1", "en", "v1", "available") is card
+        assert cache.get("p1", "ru", "v1", "available") is None
+        assert cache.get("p1", "en", "v2", "available") is None
+        assert cache.get("p1", "en", "v1", 3) is None
+
+        cache.invalidate("p1")
+        assert cache.get("p1", "en", "v1", "available") is None
+
+    def test_stock_bucket_and_eviction(self):
+        """Test stock bucketing and that the oldest card is evicted at capacity."""
+        assert [stock_bucket(stock) for stock in (None, 50, 11, 10, 1, 0)] == [
+            "available", "available", "available", 10, 1, "out_of_stock"
+        ]
+
+        cache = ProductCardCache(maxsize=2)
+        for product_id in ("a", "b", "c"):
+            cache.put(product_id, "en", ProductCard("v1", "available", product_id, Mock()))
+
+        assert cache.get("a", "en", "v1", "available") is None
+        assert cache.get("c", "en", "v1", "available").text == "c"
+
+
+class TestPriceMatrix:
+    """Tests for precomputed plan and product prices."""
+
+    def test_plan_prices(self):
+        """Test plan prices are looked up by device count, currency and duration."""
+        matrix = PriceMatrix.from_plans([
+            Plan(devices=1, prices={"USD": {30: 2.99, 90: 7.5}, "XTR": {30: 150}}),
+            Plan(devices=3, prices={"USD": {30: 5}}),
+        ])
+
+        assert matrix.get(1, Currency.USD, 30) == Decimal("2.99")
+        assert matrix.get(1, "usd", 90) == Decimal("7.5")
+        assert matrix.get(3, "USD", 30) == Decimal("5")
+        assert matrix.get(3, "XTR", 30) is None
+        assert matrix.cheapest(1, "XTR").amount == Decimal("150")
+
+    def test_product_prices_follow_snapshot(self):
+        """Test both price forms resolve and product prices are rebuilt per snapshot."""
+        products = (
+            {"id": "p1", "price": {"amount": 10, "currency": "usd"}, "duration_days": 30},
+            {"id": "p2", "prices": {"RUB": {"30": 300, "90": 800}, "USD": {"30": 4}}},
+            {"id": "p3"},
+        )
+        catalog = Mock(get_snapshot=Mock(return_value=CatalogSnapshot.build("v1", products)))
+        plan_service = Mock(prices=PriceMatrix(), get_durations=Mock(return_value=[30]))
+        prices = PriceService(plan_service=plan_service, catalog=catalog, currency="RUB")
+
+        p1 = prices.product_price(products[0])
+        assert (p1.amount, p1.currency, p1.duration, p1.symbol) == (Decimal("10"), "USD", 30, "$")
+        assert prices.product_price(products[1]).amount == Decimal("300")
+        assert prices.product_price(products[1], Currency.USD).amount == Decimal("4")
+        assert len(prices.product_offers(products[1])) == 3
+        assert prices.product_price(products[2]) is None
+        assert prices.products is prices.products
+
+        changed = ({"id": "p1", "price": {"amount": 12, "currency": "USD"}},)
+        catalog.get_snapshot.return_value = CatalogSnapshot.build("v2", changed)
+        assert prices.product_price(changed[0]).amount == Decimal("12")
+
+
+class TestProductSubscriptionStore:
+    """Tests for database-backed product subscriptions in ProductService."""
+
+    @pytest.fixture
+    def product_service(self, test_config, test_db):
+        """Create ProductService bound to the test database."""
+        return ProductService(config=test_config, session_factory=test_db.session)
+
+    async def test_gift_survives_new_service(self, product_service, test_config, test_db, test_user):
+        """Test that a gifted subscription is read back by a fresh service instance."""
+        assert await product_service.gift_product(test_user, duration=7)
+
+        restarted = ProductService(config=test_config, session_factory=test_db.session)
+        info = await restarted.get_user_subscription_info(test_user)
+
+        assert info["status"] == "active"
+        assert info["is_gift"] is True
+        assert info["days_remaining"] in (6, 7)
+
+    async def test_bonus_days_extend_and_invalidate_cache(self, product_service, test_user):
+        """Test that bonus days extend the stored subscription and refresh the cache."""
+        assert (await product_service.get_user_subscription_info(test_user))["status"] == "none"
+
+        assert await product_service.process_bonus_days(test_user, duration=5)
+        first = await product_service.get_user_subscription_info(test_user)
+        assert first["is_bonus"] is True
+
+        assert await product_service.process_bonus_days(test_user, duration=10)
+        second = await product_service.get_user_subscription_info(test_user)
+        assert second["bonus_days_added"] == 15
+        assert second["days_remaining"] - first["days_remaining"] == 10
+
+    async def test_lookup_is_cached(self, product_service, test_user):
+        """Test that repeated lookups are served from the read-through cache."""
+        await product_service.gift_product(test_user, duration=3)
+        await product_service.get_user_subscription_info(test_user)
+
+        with patch(
+            "app.bot.services.product.ProductSubscription.get_current", new=AsyncMock()
+        ) as get_current:
+            await product_service.get_user_subscription_info(test_user)
+            get_current.assert_not_called()
+
+
+class TestUserCache:
+    """Tests for the user profile cache."""
+
+    async def test_profile_shared_through_redis(self, test_db, test_user):
+        """Test that a profile loaded by one replica is served to another until invalidated."""
+        redis = fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer())
+        first, second = UserCache(redis=redis), UserCache(redis=redis)
+
+        async with test_db.session() as session:
+            profile = await first.load(session, test_user.tg_id)
+        assert profile.language_code == test_user.language_code
+
+        with patch("app.bot.services.user_cache.User.get", new=AsyncMock()) as get:
+            assert await second.load(Mock(), test_user.tg_id) == profile
+            get.assert_not_called()
+
+        await first.invalidate(test_user.tg_id)
+        assert await first.get(test_user.tg_id) is None
+        assert await UserCache(redis=redis).get(test_user.tg_id) is None
+
+
+class TestWriteBuffer:
+    """Tests for the write-behind buffer."""
+
+    async def test_coalesces_writes_into_one_flush(self, test_db, test_user):
+        """Test that buffered increments add up and the last field update wins."""
+        async with test_db.session() as session:
+            invite = await Invite.create(session=session, name="Buffered")
+
+        writes = WriteBuffer(session_factory=test_db.session)
+        for _ in range(3):
+            writes.increment(Invite, invite.id, clicks=1)
+        writes.update(User, test_user.tg_id, key_column="tg_id", source_invite_name="first")
+        writes.update(User, test_user.tg_id, key_column="tg_id", source_invite_name="Buffered")
+        assert len(writes) == 2
+
+        assert await writes.flush() == 2
+        assert len(writes) == 0
+        async with test_db.session() as session:
+            assert (await session.get(Invite, invite.id)).clicks == 3
+            user = await User.get(session=session, tg_id=test_user.tg_id)
+            assert user.source_invite_name == "Buffered"
+
+    async def test_failed_flush_keeps_writes(self, test_db):
+        """Test that writes survive a failed flush and merge with newer ones."""
+        async with test_db.session() as session:
+            invite = await Invite.create(session=session, name="Retried")
+
+        writes = WriteBuffer(session_factory=Mock(side_effect=RuntimeError("locked")))
+        writes.increment(Invite, invite.id, clicks=2)
+        assert await writes.flush() == 0
+
+        writes.increment(Invite, invite.id, clicks=1)
+        writes.session_factory = test_db.session
+        await writes.stop()
+        async with test_db.session() as session:
+            assert (await session.get(Invite, invite.id)).clicks == 3
+
+
+class TestInviteTracker:
+    """Tests for cached invite resolution and Redis click counting."""
+
+    async def test_resolve_caches_hits_and_misses(self, test_db):
+        """Test that repeated lookups of a hash do not query the database."""
+        async with test_db.session() as session:
+            invite = await Invite.create(session=session, name="Campaign")
+
+        invites = InviteTracker(session_factory=test_db.session, writes=Mock())
+        link = await invites.resolve(invite.hash_code)
+        assert link.id == invite.id and link.name == "Campaign" and link.is_active
+        assert await invites.resolve("missing") is None
+
+        invites.session_factory = Mock(side_effect=RuntimeError("no database"))
+        assert await invites.resolve(invite.hash_code) == link
+        assert await invites.resolve("missing") is None
+
+        invites.invalidate(invite.hash_code)
+        with pytest.raises(RuntimeError):
+            await invites.resolve(invite.hash_code)
+
+    async def test_clicks_are_counted_in_redis_and_flushed(self, test_db):
+        """Test that clicks accumulate in Redis and are added to the invite on flush."""
+        async with test_db.session() as session:
+            invite = await Invite.create(session=session, name="Viral")
+
+        redis = fakeredis.FakeAsyncRedis()
+        writes = WriteBuffer(session_factory=test_db.session)
+        invites = InviteTracker(session_factory=test_db.session, writes=writes, redis=redis)
+        for _ in range(5):
+            await invites.count_click(invite.id)
+        assert len(writes) == 0
+
+        assert await invites.flush() == 1
+        await invites.count_click(invite.id)
+        async with test_db.session() as session:
+            assert (await session.get(Invite, invite.id)).clicks == 5
+        assert int(await redis.hget("invite:clicks", str(invite.id))) == 1
+
+        await invites.flush()
+        assert await invites.flush() == 0
+        async with test_db.session() as session:
+            assert (await session.get(Invite, invite.id)).clicks == 6
+
+    async def test_clicks_fall_back_to_write_buffer(self, test_db):
+        """Test that without Redis clicks are buffered for the database."""
+        writes = WriteBuffer(session_factory=test_db.session)
+        invites = InviteTracker(session_factory=test_db.session, writes=writes)
+
+        await invites.count_click(1)
+        assert len(writes) == 1
+        assert await invites.flush() == 0
+
+
+class TestPromocodeFilter:
+    """Tests for the promocode negative-lookup cache."""
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        """Test that added codes are always found and unknown ones rarely are."""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        codes = [f"CODE{index:04d}" for index in range(1000)]
+        for code in codes:
+            bloom.add(code)
+
+        assert all(code in bloom for code in codes)
+        false_positives = sum(f"GUESS{index:04d}" in bloom for index in range(10_000))
+        assert false_positives < 300
+
+    async def test_rejects_unknown_codes_once_loaded(self, test_db):
+        """Test that the filter lets everything through until loaded, then only known codes."""
+        async with test_db.session() as session:
+            promocode = await Promocode.create(session=session, duration=7)
+
+        promocodes = PromocodeFilter(session_factory=test_db.session, capacity=10)
+        assert promocodes.might_exist("NOTACODE")
+
+        await promocodes.refresh()
+        assert promocodes.might_exist(promocode.code)
+        assert not promocodes.might_exist("NOTACODE")
+
+        await promocodes.add(["ADDED001"])
+        assert promocodes.might_exist("ADDED001")
+
+        async with test_db.session() as session:
+            created = await Promocode.create_batch(session=session, count=20, duration=1)
+        await promocodes.refresh()
+        assert all(promocodes.might_exist(code) for code in created)
+
+    async def test_created_codes_reach_other_replica(self, test_db):
+        """Test that codes created on one replica are accepted at once by another."""
+        server = fakeredis.FakeServer()
+        writer, replica = [
+            PromocodeFilter(
+                session_factory=test_db.session, redis=fakeredis.FakeAsyncRedis(server=server)
+            )
+            for _ in range(2)
+        ]
+        await replica.start()
+        try:
+            await writer.refresh()
+            await writer.add(["REMOTE01", "REMOTE02"])
+            for _ in range(200):
+                if replica.might_exist("REMOTE02"):
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await replica.stop()
+
+        assert replica.might_exist("REMOTE01") and replica.might_exist("REMOTE02")
+        assert not replica.might_exist("NOTACODE")
+        replica.handle(b"oops")
+
+    async def test_refresh_picks_up_late_committed_codes(self, test_db):
+        """Test that a code committed below the last seen id is found, and rebuilds drop deletes."""
+        async with test_db.session() as session:
+            await Promocode.create_batch(session=session, count=3, duration=7)
+            (late_id, late_code), (_, deleted_code), _ = await Promocode.get_all_codes(session)
+            await Promocode.delete(session=session, code=late_code)
+
+        promocodes = PromocodeFilter(session_factory=test_db.session, capacity=10)
+        await promocodes.refresh()
+        assert not promocodes.might_exist("LATE0001")
+
+        async with test_db.session() as session:
+            session.add(Promocode(id=late_id, code="LATE0001", duration=7))
+            await session.commit()
+            await Promocode.delete(session=session, code=deleted_code)
+        await promocodes.refresh()
+        assert promocodes.might_exist("LATE0001")
+        assert promocodes.might_exist(deleted_code)
+
+        promocodes.rebuild_interval = 0
+        await promocodes.refresh()
+        assert not promocodes.might_exist(deleted_code)
+
+
+class TestStockService:
+    """Tests for reservation-based stock accounting."""
+
+    @pytest.fixture
+    def catalog_file(self, temp_dir):
+        catalog_file = temp_dir / "stock_products.json"
+        catalog_file.write_text(json.dumps({"products": [
+            {"id": "limited", "name": "Limited", "stock": 2},
+            {"id": "unlimited", "name": "Unlimited", "stock": -1},
+        ]}))
+        return catalog_file
+
+    @pytest.fixture
+    def stock_service(self, test_db, catalog_file):
+        """Create StockService bound to the test database."""
+        return StockService(session_factory=test_db.session, catalog=ProductCatalog(catalog_file))
+
+    def _product(self, stock_service, product_id):
+        return stock_service.catalog.get_snapshot().get(product_id)
+
+    async def test_reserve_does_not_oversell(self, stock_service):
+        """Test that reservations stop at the available quantity."""
+        product = self._product(stock_service, "limited")
+
+        results = [await stock_service.reserve(user_id, product) for user_id in (1, 2, 3)]
+
+        assert results == [True, True, False]
+        assert await stock_service.get_available(product) == 0
+        # Reserving again for the same user reuses the existing hold.
+        assert await stock_service.reserve(1, product)
+
+    async def test_unlimited_product_is_not_tracked(self, stock_service):
+        """Test that products without a stock limit always reserve."""
+        product = self._product(stock_service, "unlimited")
+
+        assert await stock_service.reserve(1, product)
+        assert await stock_service.get_available(product) is None
+
+    async def test_release_and_commit(self, stock_service):
+        """Test that released units return to stock and committed ones do not."""
+        product = self._product(stock_service, "limited")
+        await stock_service.reserve(1, product)
+        await stock_service.reserve(2, product)
+        assert not await stock_service.attach_payment(1, "payment-0", product_id="unlimited")
+        assert await stock_service.attach_payment(1, "payment-1", product_id="limited")
+        assert not await stock_service.attach_payment(1, "payment-2", product_id="limited")
+
+        assert await stock_service.commit(payment_id="payment-1")
+        assert await stock_service.release(user_id=2, product_id="limited")
+        assert not await stock_service.release(user_id=2, product_id="limited")
+        assert not await stock_service.release(payment_id="payment-1")
+
+        assert await stock_service.get_available(product) == 1
+
+    @staticmethod
+    def _gateway(test_db, stock_service, products):
+        import app.bot.routers  # noqa: F401  # resolves the payment gateway import cycle
+        from app.bot.payment_gateways import PaymentGateway
+
+        class Gateway(PaymentGateway):
+            currency = Currency.USD
+            create_payment = handle_payment_succeeded = handle_payment_canceled = AsyncMock()
+
+        services = Mock(
+            stock=stock_service,
+            product=Mock(get_checkout_product=AsyncMock(side_effect=products)),
+            notification=AsyncMock(),
+            plan=AsyncMock(),
+            subscription=AsyncMock(),
+        )
+        config = Mock()
+        config.shop.REFERRER_REWARD_ENABLED = False
+        return Gateway(Mock(), config, test_db.session, Mock(), Mock(), MagicMock(), services)
+
+    @staticmethod
+    async def _pay(test_db, gateway, user_id, payment_id):
+        from app.bot.models import SubscriptionData
+        from app.bot.utils.constants import TransactionStatus
+        from app.bot.utils.navigation import NavSubscription
+        from app.db.models import Transaction
+
+        data = SubscriptionData(
+            state=NavSubscription.PAY, user_id=user_id, devices=1, duration=30, price=1
+        )
+        async with test_db.session() as session:
+            if not await User.get(session=session, tg_id=user_id):
+                await User.create(session=session, tg_id=user_id, first_name=f"Buyer {user_id}")
+            await Transaction.create(
+                session=session,
+                tg_id=user_id,
+                subscription=data.pack(),
+                payment_id=payment_id,
+                status=TransactionStatus.PENDING,
+            )
+        return data
+
+    @staticmethod
+    @contextmanager
+    def _settling():
+        module = "app.bot.payment_gateways._gateway"
+        with (
+            patch(f"{module}._", side_effect=lambda text: text),
+            patch(f"{module}.format_device_count", str),
+            patch(f"{module}.format_subscription_period", str),
+            patch(f"{module}.redirect_to_main_menu", AsyncMock()),
+        ):
+            yield
+
+    async def test_payment_outcome_settles_reservation(self, test_db, stock_service):
+        """Test that a paid invoice keeps its unit and a canceled one returns it."""
+        product = self._product(stock_service, "limited")
+        # Each buyer first opens an invoice for a plan, then one for the product.
+        gateway = self._gateway(test_db, stock_service, [None, product] * 2 + [product])
+
+        for user_id in (1, 2):
+            data = await self._pay(test_db, gateway, user_id, f"plan-{user_id}")
+            assert await stock_service.reserve(user_id, product)
+            await gateway.handle_payment_created(data=data, payment_id=f"plan-{user_id}")
+            await self._pay(test_db, gateway, user_id, f"payment-{user_id}")
+            await gateway.handle_payment_created(data=data, payment_id=f"payment-{user_id}")
+        assert await stock_service.get_available(product) == 0
+        assert not await stock_service.commit(payment_id="plan-1")
+
+        with self._settling():
+            await gateway._on_payment_succeeded("payment-1")
+            await gateway._on_payment_canceled("payment-2")
+
+        assert await stock_service.get_available(product) == 1
+        assert not await stock_service.release(payment_id="payment-1")
+        # Neither reservation is left for the expiry sweep to hand back again.
+        stock_service.reservation_ttl = -stock_service.reservation_ttl
+        assert await stock_service.release_expired() == 0
+
+    async def test_payment_without_reservation_takes_stock(self, test_db, stock_service):
+        """Test that a payment with no held unit takes one, or is flagged for refund."""
+        from app.bot.utils.constants import TransactionStatus
+        from app.db.models import Transaction
+
+        product = self._product(stock_service, "limited")
+        gateway = self._gateway(test_db, stock_service, [product] * 3)
+        services = gateway.services
+
+        # The reservation expired and the sweep handed the unit back before payment.
+        stock_service.reservation_ttl = -stock_service.reservation_ttl
+        assert await stock_service.reserve(1, product)
+        assert await stock_service.release_expired() == 1
+        stock_service.reservation_ttl = -stock_service.reservation_ttl
+
+        await self._pay(test_db, gateway, 1, "payment-1")
+        await self._pay(test_db, gateway, 2, "payment-2")
+        assert await stock_service.reserve(3, product)
+
+        with self._settling():
+            await gateway._on_payment_succeeded("payment-1")
+            assert await stock_service.get_available(product) == 0
+            assert services.subscription.create_subscription.await_args.kwargs["product"] == product
+
+            await gateway._on_payment_succeeded("payment-2")
+
+        services.subscription.create_subscription.assert_awaited_once()
+        assert services.notification.notify_by_id.await_args.kwargs["chat_id"] == 2
+        async with test_db.session() as session:
+            transaction = await Transaction.get_by_id(session=session, payment_id="payment-2")
+        assert transaction.status == TransactionStatus.REFUND_PENDING
+
+    async def test_release_expired(self, stock_service):
+        """Test that expired reservations are handed back."""
+        product = self._product(stock_service, "limited")
+        stock_service.reservation_ttl = -stock_service.reservation_ttl
+        await stock_service.reserve(1, product)
+
+        assert await stock_service.release_expired() == 1
+        assert await stock_service.get_available(product) == 2
+
+    async def test_restock_keeps_reserved_units(self, stock_service, catalog_file):
+        """Test that a catalog stock change shifts availability by the delta."""
+        product = self._product(stock_service, "limited")
+        await stock_service.reserve(1, product)
+
+        catalog_file.write_text(json.dumps({"products": [
+            {"id": "limited", "name": "Limited", "stock": 5},
+        ]}))
+        product = self._product(stock_service, "limited")
+
+        assert await stock_service.get_available(product) == 4
+
+
+class TestLicenseKeyService:
+    """Tests for the license key pool."""
+
+    @pytest.fixture
+    def license_key_service(self, test_db):
+        """Create LicenseKeyService bound to the test database."""
+        return LicenseKeyService(session_factory=test_db.session)
+
+    async def test_import_deduplicates(self, license_key_service, temp_dir):
+        """Test that repeated keys in the file and in stock are skipped."""
+        keys_file = temp_dir / "keys.txt"
+        keys_file.write_text("AAA-1\nBBB-2\n\n# comment\nAAA-1\nCCC-3\n")
+
+        first = await license_key_service.import_file("office", keys_file, batch_size=2)
+        second = await license_key_service.import_file("office", keys_file)
+
+        assert (first.added, first.duplicates, first.available) == (3, 1, 3)
+        assert (second.added, second.duplicates, second.available) == (0, 4, 3)
+
+    async def test_import_csv_key_column(self, license_key_service, temp_dir):
+        """Test that CSV imports use the key column when present."""
+        keys_file = temp_dir / "keys.csv"
+        keys_file.write_text("order,key\n1,KEY-A\n2,KEY-B\n")
+
+        result = await license_key_service.import_file("office", keys_file)
+
+        assert result.added == 2
+        assert {await license_key_service.claim("office", 1) for _ in range(2)} == {"KEY-A", "KEY-B"}
+
+    async def test_claim_until_exhausted(self, license_key_service, temp_dir):
+        """Test that every key is claimed exactly once."""
+        keys_file = temp_dir / "keys.txt"
+        keys_file.write_text("K1\nK2\n")
+        await license_key_service.import_file("game", keys_file)
+
+        claimed = [await license_key_service.claim("game", user_id) for user_id in (1, 2, 3)]
+
+        assert sorted(claimed[:2]) == ["K1", "K2"]
+        assert claimed[2] is None
+        assert await license_key_service.count_available("game") == 0
+        assert await license_key_service.has_pool("game")
+        assert not await license_key_service.has_pool("other")
+
+    async def test_retried_delivery_reuses_key(self, test_config, test_db, test_user, temp_dir):
+        """Test that a retried delivery gets its key back and a failed one frees it."""
+        keys_file = temp_dir / "keys.txt"
+        keys_file.write_text("K1\nK2\n")
+        product_service = ProductService(config=test_config, session_factory=test_db.session)
+        await product_service.license_keys.import_file("game", keys_file)
+        product = {
+            "id": "game",
+            "name": "Game",
+            "delivery_type": "license_key",
+            "delivery_config": {"template": "Key for {product_name}: {license_key}"},
+        }
+        subscription_data = Mock(expire_date=datetime.now(timezone.utc))
+
+        first = await product_service._deliver_product(test_user, product, subscription_data, 7)
+        retry = await product_service._deliver_product(test_user, product, subscription_data, 7)
+        assert first["delivery_info"]["license_key"] == retry["delivery_info"]["license_key"]
+        assert await product_service.license_keys.count_available("game") == 1
+
+        product["delivery_config"]["template"] = "{unknown_placeholder}"
+        failed = await product_service._deliver_product(test_user, product, subscription_data, 8)
+        assert not failed["success"]
+        assert await product_service.license_keys.count_available("game") == 1
+
+
+class TestDeliveryQueue:
+    """Tests for the persistent delivery queue."""
+
+    @pytest.fixture
+    def handler(self):
+        """Delivery handler returning a license key."""
+        return AsyncMock(return_value={"license_key": "KEY-1"})
+
+    @pytest.fixture
+    def delivery_queue(self, test_db, handler):
+        """Create DeliveryQueue bound to the test database without backoff delay."""
+        return DeliveryQueue(
+            session_factory=test_db.session, handler=handler, max_attempts=2, base_delay=0
+        )
+
+    async def test_process_completes_job(self, delivery_queue, handler):
+        """Test that a queued job is delivered once and listeners are notified."""
+        listener = AsyncMock()
+        delivery_queue.on_completed.append(listener)
+        job = await delivery_queue.enqueue(tg_id=1, payload={"product": "x"}, transaction_id=10)
+
+        assert await delivery_queue.process_next() is True
+        assert await delivery_queue.process_next() is False
+
+        handler.assert_awaited_once()
+        assert listener.await_args.args[0].id == job.id
+        assert listener.await_args.args[1] == {"license_key": "KEY-1"}
+        stats = await delivery_queue.stats()
+        assert (stats.pending, stats.completed) == (0, 1)
+        assert stats.average_latency_seconds is not None
+
+    async def test_enqueue_is_idempotent_per_transaction(self, delivery_queue):
+        """Test that a transaction can only be queued once."""
+        assert await delivery_queue.enqueue(tg_id=1, payload={}, transaction_id=11)
+        assert await delivery_queue.enqueue(tg_id=1, payload={}, transaction_id=11) is None
+
+    async def test_retries_then_dead_letters(self, delivery_queue, handler):
+        """Test that failing jobs are retried and dead-lettered after max attempts."""
+        handler.side_effect = Exception("backend down")
+        dead_listener = AsyncMock()
+        delivery_queue.on_dead.append(dead_listener)
+        await delivery_queue.enqueue(tg_id=1, payload={}, transaction_id=12)
+
+        assert await delivery_queue.process_next() is True
+        stats = await delivery_queue.stats()
+        assert (stats.pending, stats.dead) == (1, 0)
+
+        assert await delivery_queue.process_next() is True
+        stats = await delivery_queue.stats()
+        assert (stats.pending, stats.dead) == (0, 1)
+        assert dead_listener.await_args.args[1] == {"error": "backend down"}
+        assert handler.await_count == 2
+
+    async def test_admin_statistics_show_queue_stats(self, delivery_queue):
+        """Test that the admin statistics popup reports queue depth and latency."""
+        from app.bot.routers.admin_tools.statistics_handler import callback_statistics
+
+        await delivery_queue.enqueue(tg_id=1, payload={}, transaction_id=13)
+        await delivery_queue.process_next()
+        await delivery_queue.enqueue(tg_id=1, payload={}, transaction_id=14)
+        callback = AsyncMock()
+        template = "{pending} {processing} {completed} {dead} {oldest} {latency}"
+
+        with patch("app.bot.routers.admin_tools.statistics_handler._", return_value=template):
+            await callback_statistics(callback, Mock(tg_id=1), Mock(delivery=delivery_queue))
+
+        text = callback.answer.await_args.kwargs["text"]
+        assert text.split()[:4] == ["1", "0", "1", "0"]
+        assert text.split()[5] != "—"
+
+    def test_backoff_grows_exponentially(self, test_db, handler):
+        """Test that retry delays double per attempt up to the cap."""
+        queue = DeliveryQueue(
+            session_factory=test_db.session, handler=handler, base_delay=10, max_delay=60
+        )
+
+        with patch("app.bot.services.delivery.random.uniform", return_value=1.0):
+            assert [queue.backoff(attempt) for attempt in (1, 2, 3, 4)] == [10, 20, 40, 60]
+
+
+class TestExpiryScheduler:
+    """Tests for subscription expiry reminders and expiration."""
+
+    @pytest.fixture
+    def scheduler(self, test_db):
+        """Create ExpiryScheduler bound to the test database with a reminder listener."""
+        scheduler = ExpiryScheduler(session_factory=test_db.session, reminder_days=(3, 1))
+        scheduler.on_reminder.append(AsyncMock())
+        return scheduler
+
+    @staticmethod
+    async def _subscribe(test_db, tg_id, start, expire):
+        async with test_db.session() as session:
+            return await ProductSubscription.create(
+                session, tg_id, product_id="p1", product_name="Product",
+                start_date=start, expire_date=expire,
+            )
+
+    async def test_reminders_then_expiry(self, scheduler, test_db, test_user):
+        """Test that each reminder fires once and the expiry marks the subscription."""
+        now = datetime.now(timezone.utc)
+        subscription = await self._subscribe(
+            test_db, test_user.tg_id, now - timedelta(days=20), now + timedelta(days=2, hours=12)
+        )
+        listener = scheduler.on_reminder[0]
+
+        # The 3 day window is already due, the 1 day window and the expiry are not.
+        assert await scheduler.rehydrate(now) == 3
+        assert (await scheduler.run_due(now)).reminded == 1
+        assert listener.await_args.args[1:] == (3, test_user.language_code)
+        assert await scheduler.rehydrate(now) == 0
+
+        result = await scheduler.run_due(now + timedelta(days=1, hours=13))
+        assert (result.reminded, result.expired) == (1, 0)
+        assert await scheduler.run_due(now + timedelta(days=3)) == type(result)(expired=1)
+        assert listener.await_count == 2
+        assert len(scheduler) == 0
+
+        async with test_db.session() as session:
+            assert await ProductSubscription.get_expiring(session, now + timedelta(days=30)) == []
+            stored = await session.get(ProductSubscription, subscription.id)
+            assert (stored.reminded_days, stored.expired_at is not None) == (1, True)
+
+    async def test_extension_drops_old_events(self, scheduler, test_db, test_user):
+        """Test that events of an extended subscription are dropped when they fire."""
+        now = datetime.now(timezone.utc)
+        subscription = await self._subscribe(
+            test_db, test_user.tg_id, now - timedelta(hours=6), now + timedelta(hours=12)
+        )
+        # Too short for any reminder window, only the expiry is scheduled.
+        assert await scheduler.rehydrate(now) == 1
+
+        async with test_db.session() as session:
+            await ProductSubscription.extend(session, subscription.id, now + timedelta(days=30))
+
+        result = await scheduler.run_due(now + timedelta(days=1))
+        assert (result.expired, result.stale) == (0, 1)
+        scheduler.on_reminder[0].assert_not_awaited()
+
+
 class TestNotificationService:
     """Tests for NotificationService."""
     